@@ -31,9 +31,21 @@ class Settings(BaseSettings):
     # MLI Configuration
     mli_base_url: str = "https://euw1-devprol50-mlinference.3dx-staging.3ds.com"
 
+    # MLI auth token cache (in seconds): lifetime when the token response has
+    # no expiry, and how long before expiry to refresh
+    mli_token_default_ttl: int = 300
+    mli_token_refresh_margin: int = 30
+
     # AIAI API Configuration
     aiai_base_url: str = "http://localhost:8000"
 
+    # AIAI fleet: comma-separated sandbox URLs checked by /api/health/fleet
+    aiai_fleet_urls: str = ""
+    fleet_max_concurrency: int = 20
+    fleet_check_deadline: float = 5.0
+    fleet_cache_ttl: int = 30
+    fleet_cache_size: int = 1000
+
     # MCP Proxy Configuration
     mcp_proxy_url: Optional[str] = None
 
@@ -45,6 +57,92 @@ class Settings(BaseSettings):
     health_check_timeout: int = 10
     trace_fetch_timeout: int = 30
 
+    # Health check registry: enabled checks, per-check timeouts
+    # ("name=seconds,..."; health_check_timeout otherwise), checks whose
+    # DOWN status marks the whole system DOWN, and the deadline for a full run
+    # (longer than every per-check timeout; longer timeouts are clamped)
+    health_checks: str = "aiai_api,mli,mcp_proxy,jaeger"
+    health_check_timeouts: str = ""
+    health_critical_checks: str = "aiai_api,mli,mcp_proxy,jaeger"
+    health_check_deadline: float = 12.0
+
+    # Per-upstream circuit breakers: consecutive failures before opening, and
+    # open period in seconds (doubled after each failed probe, up to the max)
+    circuit_failure_threshold: int = 3
+    circuit_backoff_base: float = 30.0
+    circuit_backoff_max: float = 600.0
+
+    # Background health polling (in seconds, 0 disables polling)
+    health_poll_interval: int = 15
+    health_stale_after: int = 30
+
+    # Health event stream: latency bucket bounds (ms) that count as a change,
+    # and keep-alive interval (seconds)
+    health_stream_latency_buckets: str = "100,300,1000,3000"
+    health_stream_keepalive: int = 15
+
+    # Health history samples kept in memory per service (24h at 15s polling)
+    health_history_size: int = 5760
+
+    # Latency anomaly detection: EWMA smoothing factor, z-score threshold,
+    # consecutive anomalous samples before a service is DEGRADED, samples to
+    # learn the baseline first, and a floor (ms) for the deviation
+    anomaly_alpha: float = 0.1
+    anomaly_threshold: float = 4.0
+    anomaly_sustain: int = 3
+    anomaly_warmup: int = 20
+    anomaly_min_deviation_ms: float = 50.0
+
+    # Durable health history (SQLite, WAL): database path (empty disables),
+    # flush/rollup interval in seconds, retention in seconds for raw samples
+    # and the 1m/5m/1h rollups ("tier=seconds,..."; raw must cover at least
+    # an hour), and the max buckets returned by a range query
+    health_store_path: str = "data/health_history.db"
+    health_store_flush_interval: int = 60
+    health_store_retention: str = "raw=172800,1m=604800,5m=2592000,1h=31536000"
+    health_store_max_points: int = 500
+
+    # Upstream HTTP connection pool (one pool per upstream)
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    http2_enabled: bool = True
+
+    # Trace search: Jaeger calls allowed per search, max traces per call, and
+    # over-fetch factor when a filter cannot be pushed down as Jaeger tags
+    trace_search_max_fetches: int = 5
+    trace_search_fetch_limit: int = 500
+    trace_search_overfetch: int = 3
+
+    # Trace parsing: worker processes (0 parses on the event loop), and the
+    # Jaeger response size in bytes below which parsing stays inline
+    trace_parse_workers: int = 2
+    trace_parse_inline_bytes: int = 1_000_000
+
+    # Parsed trace cache: memory budget in bytes (estimated memory of the
+    # parsed traces, about 4x their Jaeger JSON size), and how long after a
+    # trace ends before it counts as complete
+    trace_cache_max_bytes: int = 64 * 1024 * 1024
+    trace_cache_min_age: int = 120
+
+    # Response caches behind ETag/304 support (in seconds)
+    operations_cache_ttl: int = 60
+    assistants_cache_ttl: int = 30
+
+    # Trace analytics: windows end on multiples of this many seconds and
+    # results are cached per bucket
+    trace_analytics_bucket: int = 60
+
+    # Local trace index (SQLite) for lookups by request, conversation, user,
+    # operation, status and error; empty path disables it. Pending entries
+    # are written every flush interval, the ingester indexes new Jaeger
+    # traces every ingest interval (0 disables it) and entries are kept for
+    # the retention (seconds)
+    trace_index_path: str = "data/trace_index.db"
+    trace_index_flush_interval: int = 5
+    trace_index_ingest_interval: int = 60
+    trace_index_retention: int = 604800
+
     class Config:
         env_file = ".env"
         env_prefix = "DASHBOARD_"
@@ -5,16 +5,32 @@ FastAPI application that provides:
 - Health check aggregation for all monitored services
 - Trace lookup and search via Jaeger API
 - Unified API for the frontend dashboard widget
+- Prometheus metrics at /metrics
 """
 
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+import httpx
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .config import get_settings
-from .routers import health_router, traces_router, aiai_router, supervision_router
+from .routers import (
+    health_router,
+    traces_router,
+    aiai_router,
+    supervision_router,
+    metrics_router,
+)
+from .routers.health import health_poller
+from .routers.traces import trace_ingester
+from .services.circuit_breaker import CircuitOpenError
+from .services.health_store import get_health_store
+from .services.http_clients import get_http_clients
+from .services.parse_pool import get_parse_pool
+from .services.trace_index import get_trace_index
 
 # Configure logging
 logging.basicConfig(
@@ -31,8 +47,36 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
     logger.info(f"Jaeger URL: {settings.jaeger_base_url}")
     logger.info(f"MLI URL: {settings.mli_base_url}")
+
+    # Shared upstream connection pools, injected into all services
+    http_clients = get_http_clients()
+    http_clients.open()
+
+    # Durable health history with rollups (SQLite)
+    health_store = get_health_store()
+    await health_store.start()
+
+    # Worker processes for parsing large traces off the event loop
+    parse_pool = get_parse_pool()
+    parse_pool.start()
+
+    # Local trace index (SQLite), kept current with new Jaeger traces
+    trace_index = get_trace_index()
+    await trace_index.start()
+    trace_ingester.start()
+
+    # Keep a fresh health snapshot so /api/health/all never waits on upstreams
+    health_poller.start()
+
     yield
+
     logger.info("Shutting down dashboard backend")
+    await health_poller.stop()
+    await trace_ingester.stop()
+    await trace_index.stop()
+    await health_store.stop()
+    parse_pool.stop()
+    await http_clients.aclose()
 
 
 def create_app() -> FastAPI:
@@ -70,11 +114,26 @@ def create_app() -> FastAPI:
             allow_headers=["*"],
         )
 
+    @app.exception_handler(CircuitOpenError)
+    async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+        """Fail fast with 503 while an upstream's circuit is open."""
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc), "circuit_breaker": exc.breaker.snapshot()},
+            headers={"Retry-After": str(max(1, int(exc.breaker.retry_in)))},
+        )
+
+    @app.exception_handler(httpx.HTTPError)
+    async def upstream_error_handler(request: Request, exc: httpx.HTTPError):
+        """Report upstream failures (errors, timeouts, 5xx) as 502 Bad Gateway."""
+        return JSONResponse(status_code=502, content={"detail": f"Upstream error: {exc}"})
+
     # Include routers
     app.include_router(health_router)
     app.include_router(traces_router)
     app.include_router(aiai_router)
     app.include_router(supervision_router)
+    app.include_router(metrics_router)
 
     @app.get("/", tags=["root"])
     async def root():
@@ -86,6 +145,7 @@ def create_app() -> FastAPI:
             "health": "/api/health/",
             "traces": "/api/traces/",
             "supervision": "/api/supervision/",
+            "metrics": "/metrics",
         }
 
     return app
@@ -4,20 +4,36 @@ from .health import (
     ServiceStatus,
     ServiceHealth,
     HealthCheckResponse,
+    FleetHealthRequest,
 )
 from .traces import (
+    TraceShape,
+    TraceView,
     TraceStep,
     TraceResponse,
+    TraceSummary,
     TraceSearchParams,
     TraceSearchResult,
+    LatencyStats,
+    TraceAnalytics,
+    TraceIndexEntry,
+    TraceIndexResult,
 )
 
 __all__ = [
     "ServiceStatus",
     "ServiceHealth",
     "HealthCheckResponse",
+    "FleetHealthRequest",
+    "TraceShape",
+    "TraceView",
     "TraceStep",
     "TraceResponse",
+    "TraceSummary",
     "TraceSearchParams",
     "TraceSearchResult",
+    "LatencyStats",
+    "TraceAnalytics",
+    "TraceIndexEntry",
+    "TraceIndexResult",
 ]
@@ -6,7 +6,7 @@ Defines the structure for service health responses.
 
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set
 from pydantic import BaseModel, Field
 
 
@@ -25,6 +25,9 @@ class ServiceHealth(BaseModel):
     message: Optional[str] = Field(None, description="Additional status message")
     details: Optional[Dict[str, Any]] = Field(None, description="Additional details")
     last_checked: datetime = Field(default_factory=datetime.utcnow)
+    timed_out: bool = Field(
+        False, exclude=True, description="Whether the check hit a timeout (internal)"
+    )
 
 
 class HealthCheckResponse(BaseModel):
@@ -35,9 +38,21 @@ class HealthCheckResponse(BaseModel):
         description="Health status for each monitored service"
     )
 
-    def calculate_overall(self) -> ServiceStatus:
-        """Calculate overall status based on individual services."""
-        statuses = [s.status for s in self.services.values()]
+    def calculate_overall(self, critical: Optional[Set[str]] = None) -> ServiceStatus:
+        """
+        Calculate overall status based on individual services.
+
+        Args:
+            critical: Names of critical services. A non-critical service that
+                is DOWN only degrades the overall status. All services are
+                critical if omitted.
+        """
+        statuses = [
+            ServiceStatus.DEGRADED
+            if critical is not None and name not in critical and s.status == ServiceStatus.DOWN
+            else s.status
+            for name, s in self.services.items()
+        ]
 
         if all(s == ServiceStatus.OK for s in statuses):
             return ServiceStatus.OK
@@ -46,3 +61,11 @@ class HealthCheckResponse(BaseModel):
         if any(s == ServiceStatus.DEGRADED for s in statuses):
             return ServiceStatus.DEGRADED
         return ServiceStatus.UNKNOWN
+
+
+class FleetHealthRequest(BaseModel):
+    """Request body for checking a fleet of AIAI servers."""
+    aiai_urls: List[str] = Field(
+        default_factory=list,
+        description="AIAI server URLs to check (configured inventory if empty)",
+    )
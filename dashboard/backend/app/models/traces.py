@@ -6,7 +6,7 @@ Defines the structure for request traces from Jaeger/OpenTelemetry.
 
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from pydantic import BaseModel, Field
 
 
@@ -18,6 +18,18 @@ class StepStatus(str, Enum):
     IN_PROGRESS = "in_progress"
 
 
+class TraceShape(str, Enum):
+    """How trace steps are returned."""
+    FLAT = "flat"  # All steps, ordered by start time
+    TREE = "tree"  # Root steps, with descendants nested in children
+
+
+class TraceView(str, Enum):
+    """How much of each trace search results include."""
+    FULL = "full"  # Every step with its tags
+    SUMMARY = "summary"  # Root-level fields and the failing step only
+
+
 class TraceStep(BaseModel):
     """A single step in a request trace (represents a span)."""
     name: str = Field(description="Step name (e.g., classifier, llm_call, mcp_tool)")
@@ -28,6 +40,15 @@ class TraceStep(BaseModel):
     error: Optional[str] = Field(None, description="Error message if failed")
     data: Optional[Dict[str, Any]] = Field(None, description="Step-specific data")
     span_id: Optional[str] = Field(None, description="Jaeger span ID")
+    parent_span_id: Optional[str] = Field(
+        None, description="Span ID of the parent step (None for roots and orphans)"
+    )
+    self_time_ms: Optional[int] = Field(
+        None, description="Time not covered by child steps (with critical_path)"
+    )
+    on_critical_path: Optional[bool] = Field(
+        None, description="Whether the step determines the total duration (with critical_path)"
+    )
     children: Optional[List["TraceStep"]] = Field(None, description="Child spans")
 
 
@@ -38,11 +59,77 @@ class TraceResponse(BaseModel):
     timestamp: datetime = Field(description="Request start timestamp")
     status: StepStatus = Field(description="Overall request status")
     user_id: Optional[str] = Field(None, description="User who made the request")
+    conversation_id: Optional[str] = Field(None, description="Conversation the request belongs to")
     duration_ms: int = Field(description="Total request duration in milliseconds")
     steps: List[TraceStep] = Field(description="Ordered list of trace steps")
     service: str = Field(description="Service name")
     operation: Optional[str] = Field(None, description="Operation name")
 
+    def as_tree(self) -> "TraceResponse":
+        """
+        Copy of the trace with steps nested by parent span.
+
+        Steps are linked through a single span ID index, so this is O(n).
+        Steps without a parent in the trace (roots and orphans) become
+        top-level steps; siblings keep start-time order.
+        """
+        nodes = {
+            step.span_id: step.model_copy(update={"children": []})
+            for step in self.steps
+        }
+        roots = []
+        for step in self.steps:
+            node = nodes[step.span_id]
+            parent = nodes.get(step.parent_span_id)
+            if parent is None:
+                roots.append(node)
+            else:
+                parent.children.append(node)
+        return self.model_copy(update={"steps": roots})
+
+
+class TraceSummary(BaseModel):
+    """Root-level view of a trace for result lists."""
+    request_id: str = Field(description="Unique request identifier")
+    trace_id: str = Field(description="Jaeger trace ID")
+    timestamp: datetime = Field(description="Request start timestamp")
+    status: StepStatus = Field(description="Overall request status")
+    user_id: Optional[str] = Field(None, description="User who made the request")
+    conversation_id: Optional[str] = Field(None, description="Conversation the request belongs to")
+    duration_ms: int = Field(description="Total request duration in milliseconds")
+    service: str = Field(description="Service name")
+    operation: Optional[str] = Field(None, description="Operation name")
+    span_count: int = Field(description="Number of steps in the trace")
+    failed_step: Optional[str] = Field(None, description="Name of the first failed step")
+    error: Optional[str] = Field(None, description="Error message of the first failed step")
+
+
+class LatencyStats(BaseModel):
+    """Count, failure rate and duration percentiles for a group of spans."""
+    count: int = Field(description="Number of spans (or traces)")
+    failures: int = Field(description="Number that failed")
+    failure_rate: float = Field(description="Failures / count")
+    p50_ms: float = Field(description="Median duration in milliseconds")
+    p95_ms: float = Field(description="95th percentile duration in milliseconds")
+    p99_ms: float = Field(description="99th percentile duration in milliseconds")
+
+
+class TraceAnalytics(BaseModel):
+    """Latency and failure statistics over a time window."""
+    start_time: datetime = Field(description="Window start")
+    end_time: datetime = Field(description="Window end")
+    traces: int = Field(description="Traces analysed")
+    spans: int = Field(description="Spans analysed")
+    complete: bool = Field(
+        description="False if the Jaeger fetch budget ran out before the window was fully read"
+    )
+    operations: Dict[str, LatencyStats] = Field(
+        description="Whole-request stats per root operation, most frequent first"
+    )
+    steps: Dict[str, LatencyStats] = Field(
+        description="Per step name (span operation), most frequent first"
+    )
+
 
 class TraceSearchParams(BaseModel):
     """Parameters for searching traces."""
@@ -52,10 +139,43 @@ class TraceSearchParams(BaseModel):
     user_id: Optional[str] = Field(None, description="Filter by user")
     limit: int = Field(20, ge=1, le=100, description="Maximum results to return")
     operation: Optional[str] = Field(None, description="Filter by operation name")
+    cursor: Optional[str] = Field(
+        None,
+        pattern=r"^\d+$",
+        description="Continue from a previous result's next_cursor",
+    )
+    view: TraceView = Field(TraceView.FULL, description="Full traces or summaries")
 
 
 class TraceSearchResult(BaseModel):
     """Search results for traces."""
     total: int = Field(description="Total matching traces")
-    traces: List[TraceResponse] = Field(description="Matching traces")
+    traces: List[Union[TraceResponse, TraceSummary]] = Field(
+        description="Matching traces (summaries for view=summary)"
+    )
     has_more: bool = Field(description="Whether more results exist")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next (older) page, if has_more"
+    )
+
+
+class TraceIndexEntry(BaseModel):
+    """A trace as recorded in the local trace index."""
+    trace_id: str = Field(description="Jaeger trace ID")
+    request_id: str = Field(description="Unique request identifier")
+    timestamp: datetime = Field(description="Request start timestamp")
+    status: StepStatus = Field(description="Overall request status")
+    user_id: Optional[str] = Field(None, description="User who made the request")
+    conversation_id: Optional[str] = Field(None, description="Conversation the request belongs to")
+    operation: Optional[str] = Field(None, description="Operation name")
+    duration_ms: int = Field(description="Total request duration in milliseconds")
+    error_fingerprint: Optional[str] = Field(
+        None, description="Hash of the first failed step and its normalized error"
+    )
+    error: Optional[str] = Field(None, description="Error message of the first failed step")
+
+
+class TraceIndexResult(BaseModel):
+    """Trace index lookup results."""
+    total: int = Field(description="Number of traces returned")
+    traces: List[TraceIndexEntry] = Field(description="Matching traces, newest first")
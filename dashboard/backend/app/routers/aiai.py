@@ -9,15 +9,23 @@ import logging
 from typing import Any, Dict, List, Optional
 
 import httpx
-from fastapi import APIRouter, HTTPException, Query
+from cachetools import TTLCache
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 
 from ..config import get_settings
+from ..services.etag import CachedBody
+from ..services.http_clients import get_http_clients
 from ..services.passport_auth import get_auth_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/aiai", tags=["aiai"])
 
+# Encoded assistant lists by (AIAI URL, namespace)
+_assistants_cache: TTLCache = TTLCache(
+    maxsize=32, ttl=get_settings().assistants_cache_ttl
+)
+
 
 async def _get_client(aiai_url: str) -> httpx.AsyncClient:
     """
@@ -42,7 +50,7 @@ async def _get_client(aiai_url: str) -> httpx.AsyncClient:
             logger.info(f"Using authenticated session for {settings.passport_username}")
         return client
 
-    return httpx.AsyncClient(timeout=30, follow_redirects=False)
+    return get_http_clients().get("aiai")
 
 
 @router.get(
@@ -51,6 +59,7 @@ async def _get_client(aiai_url: str) -> httpx.AsyncClient:
     description="Fetches the list of assistants from the AIAI API server.",
 )
 async def get_assistants(
+    request: Request,
     assistant_namespace: str = Query(
         default="",
         description="Filter assistants by namespace"
@@ -59,14 +68,15 @@ async def get_assistants(
         default=None,
         description="Override AIAI server URL (for local development)"
     ),
-) -> List[Dict[str, Any]]:
+) -> Response:
     """
     Fetch assistants from the AIAI API server.
 
     This endpoint proxies the request to avoid CORS issues when
     the browser tries to call the AIAI server directly.
 
-    Note: AIAI uses POST for listing assistants (GET is deprecated).
+    The list is cached for assistants_cache_ttl seconds and served with an
+    ETag; If-None-Match hits get 304 Not Modified.
 
     Args:
         assistant_namespace: Optional namespace filter
@@ -77,6 +87,21 @@ async def get_assistants(
     """
     settings = get_settings()
     base_url = aiai_url or settings.aiai_base_url
+
+    key = (base_url, assistant_namespace)
+    cached = _assistants_cache.get(key)
+    if cached is None:
+        cached = CachedBody.from_data(await _fetch_assistants(base_url, assistant_namespace))
+        _assistants_cache[key] = cached
+    return cached.response(request)
+
+
+async def _fetch_assistants(base_url: str, assistant_namespace: str) -> List[Dict[str, Any]]:
+    """
+    Fetch the assistants list from an AIAI server.
+
+    Note: AIAI uses POST for listing assistants (GET is deprecated).
+    """
     url = f"{base_url}/api/v1/assistants"
 
     params = {
@@ -89,43 +114,39 @@ async def get_assistants(
 
     try:
         client = await _get_client(base_url)
-        try:
-            # AIAI uses POST for listing assistants (GET is deprecated)
-            response = await client.post(
-                url,
-                params=params,
-                json={},  # Empty body required by API
-                headers={
-                    "Content-Type": "application/json",
-                    "Accept": "application/json"
-                }
+        # AIAI uses POST for listing assistants (GET is deprecated)
+        response = await client.post(
+            url,
+            params=params,
+            json={},  # Empty body required by API
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json"
+            },
+            timeout=30,
+        )
+
+        # Handle SSO redirect
+        if response.status_code in (301, 302, 303, 307, 308):
+            logger.warning("AIAI requires SSO authentication")
+            raise HTTPException(
+                status_code=503,
+                detail="AIAI server requires authentication. Configure DASHBOARD_PASSPORT_USERNAME and DASHBOARD_PASSPORT_PASSWORD in .env"
             )
 
-            # Handle SSO redirect
-            if response.status_code in (301, 302, 303, 307, 308):
-                logger.warning("AIAI requires SSO authentication")
-                raise HTTPException(
-                    status_code=503,
-                    detail="AIAI server requires authentication. Configure DASHBOARD_PASSPORT_USERNAME and DASHBOARD_PASSPORT_PASSWORD in .env"
-                )
-
-            response.raise_for_status()
-            data = response.json()
-            logger.info(f"Received {len(data) if isinstance(data, list) else 'non-list'} assistants")
-
-            # Return the assistants list
-            if isinstance(data, list):
-                return data
-            elif isinstance(data, dict) and "assistants" in data:
-                return data["assistants"]
-            elif isinstance(data, dict) and "data" in data:
-                return data["data"]
-            else:
-                return [data] if data else []
-        finally:
-            # Don't close authenticated clients (they're cached)
-            if not (settings.passport_username and settings.passport_password):
-                await client.aclose()
+        response.raise_for_status()
+        data = response.json()
+        logger.info(f"Received {len(data) if isinstance(data, list) else 'non-list'} assistants")
+
+        # Return the assistants list
+        if isinstance(data, list):
+            return data
+        elif isinstance(data, dict) and "assistants" in data:
+            return data["assistants"]
+        elif isinstance(data, dict) and "data" in data:
+            return data["data"]
+        else:
+            return [data] if data else []
 
     except httpx.TimeoutException:
         logger.error("Timeout fetching assistants from AIAI")
@@ -189,29 +210,24 @@ async def submit_to_assistant(
 
     try:
         client = await _get_client(base_url)
-        try:
-            response = await client.post(
-                url,
-                json=request_body,
-                params=params,
-                headers={"Content-Type": "application/json"},
-                timeout=60,  # Longer timeout for AI processing
+        response = await client.post(
+            url,
+            json=request_body,
+            params=params,
+            headers={"Content-Type": "application/json"},
+            timeout=60,  # Longer timeout for AI processing
+        )
+
+        # Handle SSO redirect
+        if response.status_code in (301, 302, 303, 307, 308):
+            logger.warning("AIAI requires SSO authentication")
+            raise HTTPException(
+                status_code=503,
+                detail="AIAI server requires authentication. Configure DASHBOARD_PASSPORT_USERNAME and DASHBOARD_PASSPORT_PASSWORD in .env"
             )
 
-            # Handle SSO redirect
-            if response.status_code in (301, 302, 303, 307, 308):
-                logger.warning("AIAI requires SSO authentication")
-                raise HTTPException(
-                    status_code=503,
-                    detail="AIAI server requires authentication. Configure DASHBOARD_PASSPORT_USERNAME and DASHBOARD_PASSPORT_PASSWORD in .env"
-                )
-
-            response.raise_for_status()
-            return response.json()
-        finally:
-            # Don't close authenticated clients (they're cached)
-            if not (settings.passport_username and settings.passport_password):
-                await client.aclose()
+        response.raise_for_status()
+        return response.json()
 
     except httpx.TimeoutException:
         logger.error("Timeout submitting to assistant")
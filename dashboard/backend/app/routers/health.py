@@ -4,16 +4,39 @@ Health Check API Router
 Provides endpoints for checking service health status.
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import Optional
+import asyncio
+import json
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from ..models.health import HealthCheckResponse, ServiceHealth, ServiceStatus
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from ..models.health import (
+    FleetHealthRequest,
+    HealthCheckResponse,
+    ServiceHealth,
+    ServiceStatus,
+)
+from ..services.etag import CachedBody
 from ..services.health_aggregator import HealthAggregator
+from ..services.health_poller import HealthPoller
+from ..services.supervision import derive_supervision_url
 
 router = APIRouter(prefix="/api/health", tags=["health"])
 
-# Service instance
+# Service instances
 health_aggregator = HealthAggregator()
+health_poller = HealthPoller(health_aggregator)
+
+# Latency bucket bounds (ms); moving between buckets is streamed as a change
+_LATENCY_BUCKETS = [
+    int(bound)
+    for bound in health_aggregator.settings.health_stream_latency_buckets.split(",")
+    if bound.strip()
+]
 
 
 def _map_status_to_frontend(status) -> str:
@@ -24,16 +47,123 @@ def _map_status_to_frontend(status) -> str:
         "down": "unhealthy",
         "unknown": "unknown"
     }
-    status_str = str(status).lower() if hasattr(status, 'value') else str(status).lower()
+    status_str = status.value if hasattr(status, 'value') else str(status).lower()
     return mapping.get(status_str, "unknown")
 
 
+def _format_snapshot(result: HealthCheckResponse) -> Dict[str, Any]:
+    """Transform a health snapshot to the frontend-expected format."""
+    # Get AIAI service or create unknown fallback
+    aiai_service = result.services.get("aiai_api")
+    if not aiai_service:
+        aiai_service = ServiceHealth(status=ServiceStatus.UNKNOWN)
+
+    return {
+        "overall": _map_status_to_frontend(result.overall),
+        "timestamp": result.timestamp.isoformat(),
+        "services": {
+            "aiai": {
+                "status": _map_status_to_frontend(aiai_service.status),
+                "response_time_ms": aiai_service.latency_ms,
+                "endpoint": str(health_aggregator.settings.aiai_base_url),
+                "last_check": aiai_service.last_checked.isoformat(),
+                "details": aiai_service.details or {}
+            }
+        }
+    }
+
+
+def _change_key(service: Dict[str, Any]) -> Tuple[str, int]:
+    """Key that changes only when status or latency bucket changes."""
+    latency = service.get("response_time_ms")
+    bucket = -1 if latency is None else bisect_right(_LATENCY_BUCKETS, latency)
+    return service["status"], bucket
+
+
+# Encoded /all body of the latest snapshot, built once per snapshot
+_snapshot_body: Tuple[Optional[HealthCheckResponse], Optional[CachedBody]] = (None, None)
+
+
+def _get_snapshot_body(result: HealthCheckResponse) -> CachedBody:
+    """
+    The /all body for a snapshot, encoded and hashed once.
+
+    The ETag covers exactly the bytes served, so a 304 means the client's
+    copy is current; every new snapshot (new timestamps and latencies)
+    gets a new tag. The snapshot age differs per request, so it is sent
+    in the Age header rather than the body.
+    """
+    global _snapshot_body
+    if _snapshot_body[0] is not result:
+        _snapshot_body = (result, CachedBody.from_data(_format_snapshot(result)))
+    return _snapshot_body[1]
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes from query parameters as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _format_fleet_member(aiai_url: str, health: ServiceHealth) -> Dict[str, Any]:
+    """Transform one AIAI fleet result to the frontend-expected format."""
+    details = health.details or {}
+    info = derive_supervision_url(aiai_url)
+
+    return {
+        "status": _map_status_to_frontend(health.status),
+        "response_time_ms": health.latency_ms,
+        "endpoint": aiai_url,
+        "last_check": health.last_checked.isoformat(),
+        "message": health.message,
+        "service_instance_id": details.get("serviceInstanceId") or (
+            info.service_instance_id if info else None
+        ),
+        "sandbox_id": info.sandbox_id if info else None,
+        "details": details,
+    }
+
+
+async def _check_fleet(aiai_urls: List[str]) -> Dict[str, Any]:
+    """Check a list of AIAI URLs (or the configured inventory) concurrently."""
+    if not aiai_urls:
+        inventory = health_aggregator.settings.aiai_fleet_urls
+        aiai_urls = [url.strip() for url in inventory.split(",") if url.strip()]
+    if not aiai_urls:
+        raise HTTPException(
+            status_code=400,
+            detail="No AIAI URLs given and DASHBOARD_AIAI_FLEET_URLS is not configured"
+        )
+
+    results = await health_aggregator.check_fleet(aiai_urls)
+    fleet = HealthCheckResponse(overall=ServiceStatus.UNKNOWN, services=results)
+
+    counts: Dict[str, int] = {}
+    for health in results.values():
+        status = _map_status_to_frontend(health.status)
+        counts[status] = counts.get(status, 0) + 1
+
+    return {
+        "overall": _map_status_to_frontend(fleet.calculate_overall()),
+        "timestamp": fleet.timestamp.isoformat(),
+        "total": len(results),
+        "counts": counts,
+        "services": {
+            url: _format_fleet_member(url, health) for url, health in results.items()
+        },
+    }
+
+
 @router.get(
     "/all",
     summary="Check all services",
     description="Returns health status of all monitored services in frontend-compatible format.",
 )
-async def check_all_health():
+async def check_all_health(request: Request) -> Response:
     """
     Check health of all monitored services.
 
@@ -47,27 +177,284 @@ async def check_all_health():
     - Keys: "aiai" instead of "aiai_api"
     - Fields: "response_time_ms" instead of "latency_ms"
     - Status: "healthy/unhealthy/degraded/unknown" instead of "ok/down/..."
+
+    The response is served from the background poller's latest snapshot;
+    the Age header reports how old it is (seconds). A stale snapshot
+    triggers a refresh without delaying the response.
+
+    Responses carry an ETag of the exact body; If-None-Match hits get 304
+    Not Modified until the next snapshot.
     """
-    result = await health_aggregator.check_all()
+    result, snapshot_age = await health_poller.get_snapshot()
+    return _get_snapshot_body(result).response(request, headers={"Age": str(int(snapshot_age))})
 
-    # Get AIAI service or create unknown fallback
-    aiai_service = result.services.get("aiai_api")
-    if not aiai_service:
-        aiai_service = ServiceHealth(status=ServiceStatus.UNKNOWN)
 
-    # Transform to frontend-expected format
+@router.get(
+    "/stream",
+    summary="Stream health updates",
+    description="Server-Sent Events stream of health changes in frontend-compatible format.",
+)
+async def stream_health(request: Request) -> StreamingResponse:
+    """
+    Stream health status as Server-Sent Events.
+
+    Emits a "snapshot" event with the same payload as /all on connect, then
+    an "update" event containing only the services whose status or latency
+    bucket changed (plus the overall status). Comment lines are sent as
+    keep-alives while nothing changes.
+    """
+    keepalive = health_aggregator.settings.health_stream_keepalive
+
+    async def events() -> AsyncIterator[str]:
+        queue = health_poller.subscribe()
+        try:
+            result, _ = await health_poller.get_snapshot()
+            current = _format_snapshot(result)
+            keys = {name: _change_key(svc) for name, svc in current["services"].items()}
+            overall = current["overall"]
+            yield _sse_event("snapshot", current)
+            last_sent = time.monotonic()
+
+            while not await request.is_disconnected():
+                wait = max(0.0, keepalive - (time.monotonic() - last_sent))
+                try:
+                    result = await asyncio.wait_for(queue.get(), timeout=wait)
+                except asyncio.TimeoutError:
+                    # Also revalidates the snapshot if background polling is off
+                    await health_poller.get_snapshot()
+                    yield ": keep-alive\n\n"
+                    last_sent = time.monotonic()
+                    continue
+
+                current = _format_snapshot(result)
+                changed = {}
+                for name, svc in current["services"].items():
+                    key = _change_key(svc)
+                    if keys.get(name) != key:
+                        keys[name] = key
+                        changed[name] = svc
+
+                if changed or current["overall"] != overall:
+                    overall = current["overall"]
+                    yield _sse_event("update", {
+                        "overall": overall,
+                        "timestamp": current["timestamp"],
+                        "services": changed,
+                    })
+                    last_sent = time.monotonic()
+        finally:
+            health_poller.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/fleet",
+    summary="Check AIAI fleet",
+    description="Checks many AIAI sandboxes concurrently (query URLs or configured inventory).",
+)
+async def check_fleet_health(
+    aiai_url: List[str] = Query(
+        [],
+        description="AIAI server URL (repeat for several); configured inventory if omitted"
+    ),
+) -> Dict[str, Any]:
+    """
+    Check health of a fleet of AIAI sandboxes.
+
+    Each sandbox is probed concurrently with a bounded number of probes in
+    flight and a per-target deadline. Results are cached per URL, so
+    repeated refreshes of a large fleet do not re-probe every sandbox.
+    Each entry includes the serviceInstanceId derived from the URL.
+    """
+    return await _check_fleet(aiai_url)
+
+
+@router.post(
+    "/fleet",
+    summary="Check AIAI fleet",
+    description="Checks many AIAI sandboxes concurrently (URLs in the request body).",
+)
+async def check_fleet_health_post(request: FleetHealthRequest) -> Dict[str, Any]:
+    """
+    Check health of a fleet of AIAI sandboxes.
+
+    Same as GET /fleet, for URL lists too long for a query string.
+    """
+    return await _check_fleet(request.aiai_urls)
+
+
+@router.get(
+    "/aiai",
+    summary="Check an AIAI server",
+    description="Checks a single AIAI server by URL (defaults to the configured server).",
+)
+async def check_aiai_health(
+    aiai_url: Optional[str] = Query(
+        None,
+        description="AIAI server URL; configured DASHBOARD_AIAI_BASE_URL if omitted"
+    ),
+) -> Dict[str, Any]:
+    """
+    Check health of one AIAI server.
+
+    Uses the same cached fleet check as /fleet.
+    """
+    url = (aiai_url or health_aggregator.settings.aiai_base_url).rstrip("/")
+    results = await health_aggregator.check_fleet([url])
+    return _format_fleet_member(url, results[url])
+
+
+@router.get(
+    "/history",
+    summary="Health check history",
+    description="Returns recorded health samples per service over a time window.",
+)
+async def get_health_history(
+    service: Optional[str] = Query(
+        None,
+        description="Service name (aiai_api, mli, mcp_proxy, jaeger); all if omitted"
+    ),
+    window: int = Query(
+        3600,
+        ge=60,
+        le=7 * 24 * 3600,
+        description="Time window in seconds"
+    ),
+) -> Dict[str, Any]:
+    """
+    Get health check history recorded by the backend.
+
+    Samples are kept in a bounded in-memory ring buffer per service, so
+    history older than the buffer capacity is not available.
+    """
+    history = health_aggregator.history
+    services = [service] if service else history.services()
+
+    return {
+        "window_s": window,
+        "services": {name: history.history(name, window) for name in services},
+    }
+
+
+@router.get(
+    "/history/range",
+    summary="Long-range health history",
+    description="Returns rolled-up health history (1m/5m/1h buckets) from the durable store.",
+)
+async def get_health_history_range(
+    service: str = Query(
+        ...,
+        description="Service name (aiai_api, mli, mcp_proxy, jaeger)"
+    ),
+    start: Optional[datetime] = Query(
+        None,
+        description="Start of time range (ISO format); 7 days ago if omitted"
+    ),
+    end: Optional[datetime] = Query(
+        None,
+        description="End of time range (ISO format); now if omitted"
+    ),
+    max_points: Optional[int] = Query(
+        None,
+        ge=1,
+        le=10000,
+        description="Maximum number of buckets; DASHBOARD_HEALTH_STORE_MAX_POINTS if omitted"
+    ),
+) -> Dict[str, Any]:
+    """
+    Get rolled-up health history over an arbitrary range.
+
+    The coarsest resolution needed to stay within max_points buckets is
+    used (1-minute, 5-minute or 1-hour), limited to tiers whose retention
+    still covers the start of the range. Each bucket has the check count,
+    failures, uptime % and min/avg/max/p95 latency.
+    """
+    store = health_aggregator.store
+    if not store.enabled:
+        raise HTTPException(
+            status_code=404,
+            detail="Durable health history is disabled (DASHBOARD_HEALTH_STORE_PATH)"
+        )
+
+    end_ts = _as_utc(end).timestamp() if end else time.time()
+    start_ts = _as_utc(start).timestamp() if start else end_ts - 7 * 86400
+    if start_ts >= end_ts:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    result = await store.query(
+        service,
+        start_ts,
+        end_ts,
+        max_points or health_aggregator.settings.health_store_max_points,
+    )
+    return {
+        "service": service,
+        "start": datetime.fromtimestamp(start_ts, tz=timezone.utc).isoformat(),
+        "end": datetime.fromtimestamp(end_ts, tz=timezone.utc).isoformat(),
+        **result,
+    }
+
+
+@router.get(
+    "/stats",
+    summary="Health statistics",
+    description="Returns uptime % and latency percentiles per service over time windows.",
+)
+async def get_health_stats(
+    service: Optional[str] = Query(
+        None,
+        description="Service name (aiai_api, mli, mcp_proxy, jaeger); all if omitted"
+    ),
+    windows: List[int] = Query(
+        [3600, 86400],
+        description="Time windows in seconds (repeat the parameter for several)"
+    ),
+) -> Dict[str, Any]:
+    """
+    Get uptime and latency statistics computed from the health history.
+
+    For each service and window returns the sample count, uptime percentage,
+    incident count and p50/p95/p99 latency.
+    """
+    history = health_aggregator.history
+    services = [service] if service else history.services()
+
     return {
-        "overall": _map_status_to_frontend(result.overall),
-        "timestamp": result.timestamp.isoformat(),
         "services": {
-            "aiai": {
-                "status": _map_status_to_frontend(aiai_service.status),
-                "response_time_ms": aiai_service.latency_ms,
-                "endpoint": str(health_aggregator.settings.aiai_base_url),
-                "last_check": aiai_service.last_checked.isoformat(),
-                "details": aiai_service.details or {}
-            }
-        }
+            name: [history.stats(name, w) for w in windows]
+            for name in services
+        },
+    }
+
+
+@router.get(
+    "/anomalies",
+    summary="Latency baselines",
+    description="Returns the learned latency baseline and current deviation per service.",
+)
+async def get_latency_anomalies(
+    service: Optional[str] = Query(
+        None,
+        description="Service name or fleet AIAI URL; all tracked if omitted"
+    ),
+) -> Dict[str, Any]:
+    """
+    Get the latency anomaly detector state.
+
+    For each service: the EWMA latency baseline, deviation, the latest
+    sample's z-score, the run of consecutive outliers and whether the
+    service is currently marked degraded because of it.
+    """
+    anomalies = health_aggregator.anomalies
+    keys = [service] if service else anomalies.keys()
+
+    return {
+        "services": {key: anomalies.snapshot(key) for key in keys},
     }
 
 
@@ -93,7 +480,7 @@ async def check_service_health(service_name: str) -> ServiceHealth:
         raise HTTPException(
             status_code=404,
             detail=f"Unknown service: {service_name}. "
-                   f"Valid services: aiai_api, mli, mcp_proxy, jaeger"
+                   f"Valid services: {', '.join(health_aggregator.checks)}"
         )
 
     return result
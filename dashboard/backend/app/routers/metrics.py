@@ -0,0 +1,26 @@
+"""
+Metrics API Router
+
+Exposes backend and upstream metrics in the Prometheus text format.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..services.metrics import REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description="Probe latency, upstream status, Jaeger query and 3DPassport metrics.",
+)
+async def get_metrics() -> PlainTextResponse:
+    """Render all metrics for a Prometheus scrape."""
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -5,23 +5,233 @@ Provides endpoints for fetching and searching request traces.
 This powers the Failure Locator feature.
 """
 
-from datetime import datetime, timedelta
-from typing import Optional, List
+import json
+import time
+from contextlib import aclosing
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional, List, Union
 
-from fastapi import APIRouter, HTTPException, Query
+from cachetools import TTLCache
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from ..models.traces import (
+    TraceAnalytics,
+    TraceIndexResult,
     TraceResponse,
     TraceSearchParams,
     TraceSearchResult,
+    TraceShape,
+    TraceView,
     StepStatus,
 )
-from ..services.jaeger_service import JaegerService
+from ..services.etag import CachedBody
+from ..services.jaeger_service import JaegerService, SearchPage
+from ..services.trace_ingester import TraceIngester
 
 router = APIRouter(prefix="/api/traces", tags=["traces"])
 
-# Service instance
+# Service instances
 jaeger_service = JaegerService()
+trace_ingester = TraceIngester(jaeger_service)
+
+# Encoded operation lists by Jaeger service name
+_operations_cache: TTLCache = TTLCache(
+    maxsize=8, ttl=jaeger_service.settings.operations_cache_ttl
+)
+
+# Encoded analytics by (window end, minutes, operation); a bucket's window
+# never changes, so entries only need to outlive their bucket
+_analytics_cache: TTLCache = TTLCache(
+    maxsize=64, ttl=2 * jaeger_service.settings.trace_analytics_bucket
+)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes from query parameters as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def _search_response(
+    params: TraceSearchParams, stream: bool
+) -> Union[StreamingResponse, TraceSearchResult]:
+    """
+    Run a search, either buffered or streamed as NDJSON.
+
+    A stream is only started once its first trace (or the end of the
+    walk) is in, so a failing first Jaeger call gets the same error
+    status as a buffered search. Failures after that end the stream with
+    an {"error": ...} line instead of the pagination line.
+    """
+    if not stream:
+        return await jaeger_service.search_traces(params)
+
+    page = SearchPage()
+    traces = jaeger_service.iter_search_traces(params, page)
+    try:
+        first = await anext(traces)
+    except StopAsyncIteration:
+        first = None
+
+    async def lines() -> AsyncIterator[str]:
+        async with aclosing(traces):
+            try:
+                if first is not None:
+                    yield first.model_dump_json() + "\n"
+                    async for trace in traces:
+                        yield trace.model_dump_json() + "\n"
+            except Exception as e:
+                yield json.dumps({"error": str(e)}) + "\n"
+                return
+        yield json.dumps({
+            "has_more": page.next_cursor is not None,
+            "next_cursor": page.next_cursor,
+        }) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/operations",
+    response_model=List[str],
+    summary="Get available operations",
+    description="List all operation names that can be filtered.",
+)
+async def get_operations(request: Request) -> Response:
+    """
+    Get list of available operations.
+
+    Operations correspond to API endpoints or entry points
+    that can be used to filter trace searches.
+
+    The list is cached for operations_cache_ttl seconds and served with an
+    ETag; If-None-Match hits get 304 Not Modified.
+    """
+    cached = _operations_cache.get(jaeger_service.service_name)
+    if cached is None:
+        cached = CachedBody.from_data(await jaeger_service.get_operations())
+        _operations_cache[jaeger_service.service_name] = cached
+    return cached.response(request)
+
+
+@router.get(
+    "/analytics",
+    response_model=TraceAnalytics,
+    summary="Get latency and failure analytics",
+    description="Per-operation and per-step counts, failure rates and p50/p95/p99 durations.",
+)
+async def get_analytics(
+    request: Request,
+    minutes: int = Query(
+        60,
+        ge=1,
+        le=1440,
+        description="How many minutes back to analyse"
+    ),
+    operation: Optional[str] = Query(
+        None,
+        description="Only requests with this root operation"
+    ),
+) -> Response:
+    """
+    Get latency percentiles and failure rates for recent traces.
+
+    Answers questions like "what is p95 of llm_call over the last hour"
+    and "which step fails most". The window ends on the last
+    trace_analytics_bucket boundary, so every request within a bucket
+    gets the same cached result (with an ETag) instead of re-querying
+    Jaeger.
+    """
+    bucket = jaeger_service.settings.trace_analytics_bucket
+    window_end = int(time.time() // bucket) * bucket
+    key = (window_end, minutes, operation)
+
+    cached = _analytics_cache.get(key)
+    if cached is None:
+        end_time = datetime.fromtimestamp(window_end, tz=timezone.utc)
+        analytics = await jaeger_service.get_analytics(
+            end_time - timedelta(minutes=minutes), end_time, operation
+        )
+        cached = CachedBody.from_data(analytics.model_dump(mode="json"))
+        _analytics_cache[key] = cached
+    return cached.response(request)
+
+
+@router.get(
+    "/search",
+    response_model=TraceIndexResult,
+    summary="Look up traces by request, conversation or user",
+    description="Indexed lookup in the local trace index; all given filters must match.",
+)
+async def lookup_traces(
+    request_id: Optional[str] = Query(None, description="Request ID"),
+    conversation_id: Optional[str] = Query(None, description="Conversation ID"),
+    user_id: Optional[str] = Query(None, description="User ID"),
+    operation: Optional[str] = Query(None, description="Root operation name"),
+    status: Optional[StepStatus] = Query(None, description="Overall status"),
+    error_fingerprint: Optional[str] = Query(
+        None,
+        description="Error fingerprint from a previous result"
+    ),
+    start_time: Optional[datetime] = Query(
+        None,
+        description="Only traces that started at or after (ISO format)"
+    ),
+    end_time: Optional[datetime] = Query(
+        None,
+        description="Only traces that started before (ISO format)"
+    ),
+    limit: int = Query(
+        20,
+        ge=1,
+        le=1000,
+        description="Maximum number of results"
+    ),
+) -> TraceIndexResult:
+    """
+    Look up traces by request ID, conversation ID, user and other keys.
+
+    Answered from the local trace index, which holds every trace the
+    backend has parsed or ingested, with a point query per lookup instead
+    of a Jaeger time-window scan. Fetch full traces with /{trace_id}.
+    """
+    index = jaeger_service.trace_index
+    if not index.enabled:
+        raise HTTPException(
+            status_code=404,
+            detail="Trace index is disabled (DASHBOARD_TRACE_INDEX_PATH)"
+        )
+
+    filters = {
+        key: value
+        for key, value in (
+            ("request_id", request_id),
+            ("conversation_id", conversation_id),
+            ("user_id", user_id),
+            ("operation", operation),
+            ("status", status.value if status else None),
+            ("error_fingerprint", error_fingerprint),
+        )
+        if value is not None
+    }
+    if not filters:
+        raise HTTPException(
+            status_code=400,
+            detail="Give at least one of request_id, conversation_id, user_id, "
+                   "operation, status or error_fingerprint"
+        )
+
+    traces = await index.lookup(
+        filters,
+        limit,
+        start=_as_utc(start_time).timestamp() if start_time else None,
+        end=_as_utc(end_time).timestamp() if end_time else None,
+    )
+    return TraceIndexResult(total=len(traces), traces=traces)
 
 
 @router.get(
@@ -30,7 +240,17 @@ jaeger_service = JaegerService()
     summary="Get trace by ID",
     description="Fetch a complete trace by its trace ID or request ID.",
 )
-async def get_trace(trace_id: str) -> TraceResponse:
+async def get_trace(
+    trace_id: str,
+    shape: TraceShape = Query(
+        TraceShape.FLAT,
+        description="flat: all steps by start time; tree: steps nested under their parents"
+    ),
+    critical_path: bool = Query(
+        False,
+        description="Add each step's self time and whether it is on the critical path"
+    ),
+) -> TraceResponse:
     """
     Get a single trace by ID.
 
@@ -39,11 +259,13 @@ async def get_trace(trace_id: str) -> TraceResponse:
 
     Args:
         trace_id: The Jaeger trace ID or request ID
+        shape: Return steps flat (each with parent_span_id) or as a span tree
+        critical_path: Mark self time and critical path steps
 
     Returns:
         Complete trace with all steps
     """
-    trace = await jaeger_service.get_trace(trace_id)
+    trace = await jaeger_service.get_trace(trace_id, critical_path=critical_path)
 
     if trace is None:
         raise HTTPException(
@@ -51,6 +273,8 @@ async def get_trace(trace_id: str) -> TraceResponse:
             detail=f"Trace not found: {trace_id}"
         )
 
+    if shape == TraceShape.TREE:
+        return trace.as_tree()
     return trace
 
 
@@ -87,6 +311,19 @@ async def search_traces(
         le=100,
         description="Maximum number of results"
     ),
+    cursor: Optional[str] = Query(
+        None,
+        pattern=r"^\d+$",
+        description="next_cursor from the previous page"
+    ),
+    stream: bool = Query(
+        False,
+        description="Stream results as NDJSON: one trace per line, then a pagination line"
+    ),
+    view: TraceView = Query(
+        TraceView.FULL,
+        description="full: every step; summary: root fields and the failing step only"
+    ),
 ) -> TraceSearchResult:
     """
     Search for traces matching the given criteria.
@@ -97,6 +334,17 @@ async def search_traces(
     - Find requests from a specific user
     - Find recent requests to investigate
 
+    Results are newest first. When has_more is set, pass next_cursor
+    back as cursor (with the same filters) to get the next older page.
+
+    With stream=true the response is NDJSON: each trace is written as soon
+    as it is parsed from Jaeger's response, and the last line holds
+    has_more and next_cursor. If Jaeger fails once traces have been sent,
+    the last line is {"error": ...} instead.
+
+    view=summary returns TraceSummary entries (no steps), which are much
+    cheaper to build and transfer for result lists.
+
     Returns:
         List of matching traces with basic info
     """
@@ -107,9 +355,11 @@ async def search_traces(
         user_id=user_id,
         operation=operation,
         limit=limit,
+        cursor=cursor,
+        view=view,
     )
 
-    return await jaeger_service.search_traces(params)
+    return await _search_response(params, stream)
 
 
 @router.get(
@@ -131,6 +381,19 @@ async def get_failed_traces(
         le=100,
         description="Maximum number of results"
     ),
+    cursor: Optional[str] = Query(
+        None,
+        pattern=r"^\d+$",
+        description="next_cursor from the previous page"
+    ),
+    stream: bool = Query(
+        False,
+        description="Stream results as NDJSON: one trace per line, then a pagination line"
+    ),
+    view: TraceView = Query(
+        TraceView.FULL,
+        description="full: every step; summary: root fields and the failing step only"
+    ),
 ) -> TraceSearchResult:
     """
     Get recently failed traces.
@@ -143,9 +406,11 @@ async def get_failed_traces(
         end_time=datetime.utcnow(),
         status=StepStatus.FAILED,
         limit=limit,
+        cursor=cursor,
+        view=view,
     )
 
-    return await jaeger_service.search_traces(params)
+    return await _search_response(params, stream)
 
 
 @router.get(
@@ -167,6 +432,19 @@ async def get_recent_traces(
         le=100,
         description="Maximum number of results"
     ),
+    cursor: Optional[str] = Query(
+        None,
+        pattern=r"^\d+$",
+        description="next_cursor from the previous page"
+    ),
+    stream: bool = Query(
+        False,
+        description="Stream results as NDJSON: one trace per line, then a pagination line"
+    ),
+    view: TraceView = Query(
+        TraceView.FULL,
+        description="full: every step; summary: root fields and the failing step only"
+    ),
 ) -> TraceSearchResult:
     """
     Get the most recent traces.
@@ -178,22 +456,8 @@ async def get_recent_traces(
         start_time=datetime.utcnow() - timedelta(minutes=minutes),
         end_time=datetime.utcnow(),
         limit=limit,
+        cursor=cursor,
+        view=view,
     )
 
-    return await jaeger_service.search_traces(params)
-
-
-@router.get(
-    "/operations",
-    response_model=List[str],
-    summary="Get available operations",
-    description="List all operation names that can be filtered.",
-)
-async def get_operations() -> List[str]:
-    """
-    Get list of available operations.
-
-    Operations correspond to API endpoints or entry points
-    that can be used to filter trace searches.
-    """
-    return await jaeger_service.get_operations()
+    return await _search_response(params, stream)
@@ -3,9 +3,24 @@
 from .jaeger_service import JaegerService
 from .mli_service import MLIService
 from .health_aggregator import HealthAggregator
+from .health_history import HealthHistory
+from .health_poller import HealthPoller
+from .health_store import HealthStore
+from .http_clients import HTTPClientRegistry, get_http_clients
+from .parse_pool import ParsePool
+from .trace_index import TraceIndex
+from .trace_ingester import TraceIngester
 
 __all__ = [
     "JaegerService",
     "MLIService",
     "HealthAggregator",
+    "HealthHistory",
+    "HealthPoller",
+    "HealthStore",
+    "HTTPClientRegistry",
+    "get_http_clients",
+    "ParsePool",
+    "TraceIndex",
+    "TraceIngester",
 ]
@@ -0,0 +1,161 @@
+"""
+Latency Anomaly Detection
+
+Online per-service latency baselines (exponentially weighted mean and
+variance). Each sample is scored against the baseline in O(1) time and
+constant memory, and a sustained run of outliers marks the service
+degraded even though its probes still succeed.
+"""
+
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+from cachetools import LRUCache
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyDetector:
+    """EWMA latency baseline with a sustained-deviation rule."""
+
+    __slots__ = (
+        "alpha", "threshold", "sustain", "warmup", "min_deviation_ms",
+        "mean", "var", "samples", "streak", "last_z",
+    )
+
+    def __init__(
+        self,
+        alpha: float,
+        threshold: float,
+        sustain: int,
+        warmup: int,
+        min_deviation_ms: float,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            alpha: EWMA smoothing factor (weight of the newest sample)
+            threshold: Deviations (z-score) above the baseline that count as anomalous
+            sustain: Consecutive anomalous samples before the service is degraded
+            warmup: Samples used to learn the baseline before scoring
+            min_deviation_ms: Floor for the deviation, so jitter on a very
+                stable baseline is not flagged
+        """
+        self.alpha = alpha
+        self.threshold = threshold
+        self.sustain = sustain
+        self.warmup = warmup
+        self.min_deviation_ms = min_deviation_ms
+
+        self.mean = 0.0
+        self.var = 0.0
+        self.samples = 0
+        self.streak = 0
+        self.last_z = 0.0
+
+    @property
+    def deviation_ms(self) -> float:
+        """Current standard deviation estimate, with the configured floor."""
+        return max(math.sqrt(self.var), self.min_deviation_ms)
+
+    @property
+    def anomalous(self) -> bool:
+        """Whether the latest samples form a sustained anomaly."""
+        return self.streak >= self.sustain
+
+    def update(self, latency_ms: float) -> bool:
+        """
+        Score a sample and fold it into the baseline.
+
+        Outliers only move the mean, at a tenth of the normal rate, so a
+        brief spike barely moves the baseline (and never widens the
+        deviation) while a permanent shift is eventually learned as the
+        new normal.
+
+        Returns:
+            Whether the service is in a sustained anomaly
+        """
+        if self.samples == 0:
+            self.mean = float(latency_ms)
+            self.samples = 1
+            return False
+
+        self.last_z = (latency_ms - self.mean) / self.deviation_ms
+        outlier = self.samples >= self.warmup and self.last_z > self.threshold
+        self.streak = self.streak + 1 if outlier else 0
+
+        # Incremental EWMA mean and variance
+        diff = latency_ms - self.mean
+        if outlier:
+            self.mean += self.alpha / 10 * diff
+        else:
+            increment = self.alpha * diff
+            self.mean += increment
+            self.var = (1 - self.alpha) * (self.var + diff * increment)
+        self.samples += 1
+
+        return self.anomalous
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Baseline and current deviation for API responses."""
+        return {
+            "baseline_ms": round(self.mean, 1),
+            "deviation_ms": round(self.deviation_ms, 1),
+            "z_score": round(self.last_z, 2),
+            "streak": self.streak,
+            "samples": self.samples,
+            "warming_up": self.samples < self.warmup,
+            "anomalous": self.anomalous,
+        }
+
+
+class AnomalyDetectors:
+    """Latency detectors keyed by service (or fleet URL), LRU-bounded."""
+
+    def __init__(self, maxsize: Optional[int] = None):
+        """
+        Initialize the detector set.
+
+        Args:
+            maxsize: Maximum number of tracked keys (defaults to fleet cache size)
+        """
+        self.settings = get_settings()
+        self._detectors: LRUCache = LRUCache(maxsize=maxsize or self.settings.fleet_cache_size)
+
+    def get(self, key: str) -> LatencyDetector:
+        """Get the detector for a key, creating it on first use."""
+        detector = self._detectors.get(key)
+        if detector is None:
+            detector = LatencyDetector(
+                alpha=self.settings.anomaly_alpha,
+                threshold=self.settings.anomaly_threshold,
+                sustain=self.settings.anomaly_sustain,
+                warmup=self.settings.anomaly_warmup,
+                min_deviation_ms=self.settings.anomaly_min_deviation_ms,
+            )
+            self._detectors[key] = detector
+        return detector
+
+    def observe(self, key: str, latency_ms: float) -> LatencyDetector:
+        """Feed one latency sample and return the updated detector."""
+        detector = self.get(key)
+        was_anomalous = detector.anomalous
+        if detector.update(latency_ms) and not was_anomalous:
+            logger.warning(
+                f"Latency anomaly for {key}: {latency_ms}ms vs baseline "
+                f"{detector.mean:.0f}ms (z={detector.last_z:.1f})"
+            )
+        return detector
+
+    def keys(self) -> List[str]:
+        """Tracked keys."""
+        return list(self._detectors.keys())
+
+    def snapshot(self, key: str) -> Optional[Dict[str, Any]]:
+        """Detector state for a key, or None if it has no samples."""
+        detector = self._detectors.get(key)
+        return detector.snapshot() if detector else None
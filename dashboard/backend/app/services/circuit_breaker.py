@@ -0,0 +1,154 @@
+"""
+Circuit Breaker
+
+Per-upstream circuit breakers that stop calling an upstream after repeated
+failures and probe it again with exponential backoff.
+"""
+
+import logging
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"        # Calls flow normally
+    OPEN = "open"            # Calls fail fast until the backoff elapses
+    HALF_OPEN = "half_open"  # One probe call decides whether to close again
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open."""
+
+    def __init__(self, breaker: "CircuitBreaker"):
+        self.breaker = breaker
+        super().__init__(
+            f"{breaker.name} unavailable (circuit open, retry in {breaker.retry_in:.0f}s)"
+        )
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker with exponential backoff."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        backoff_base: float,
+        backoff_max: float,
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Upstream name (for logs and API output)
+            failure_threshold: Consecutive failures that open the circuit
+            backoff_base: Seconds the circuit stays open after first opening
+            backoff_max: Upper bound for the doubled open period
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._backoff = backoff_base
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 unless open)."""
+        if self.state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self._backoff - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may go to the upstream.
+
+        When the open period has elapsed, the breaker goes half-open and
+        lets exactly one probe through.
+        """
+        now = time.monotonic()
+
+        if self.state == CircuitState.CLOSED:
+            return True
+
+        if self.state == CircuitState.OPEN:
+            if now < self._opened_at + self._backoff:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._probe_started_at = now
+            logger.info(f"Circuit for {self.name} half-open, probing")
+            return True
+
+        # Half-open: only one probe at a time, unless it never reported back
+        if self._probe_started_at is None or now - self._probe_started_at > self.backoff_base:
+            self._probe_started_at = now
+            return True
+        return False
+
+    def record_success(self):
+        """Record a successful call, closing the circuit."""
+        if self.state != CircuitState.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._backoff = self.backoff_base
+        self._probe_started_at = None
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit when needed."""
+        self.failures += 1
+
+        if self.state == CircuitState.HALF_OPEN:
+            # Probe failed: stay away twice as long as last time
+            self._backoff = min(self._backoff * 2, self.backoff_max)
+            self._open()
+        elif self.state == CircuitState.CLOSED and self.failures >= self.failure_threshold:
+            self._backoff = self.backoff_base
+            self._open()
+
+    def _open(self):
+        """Open the circuit for the current backoff period."""
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_started_at = None
+        logger.warning(
+            f"Circuit for {self.name} open after {self.failures} failures, "
+            f"next probe in {self._backoff:.0f}s"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current breaker state for API responses."""
+        return {
+            "state": self.state.value,
+            "failures": self.failures,
+            "retry_in_s": round(self.retry_in, 1),
+        }
+
+
+# Global breakers, one per upstream
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the shared circuit breaker for an upstream."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        settings = get_settings()
+        breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.circuit_failure_threshold,
+            backoff_base=settings.circuit_backoff_base,
+            backoff_max=settings.circuit_backoff_max,
+        )
+        _breakers[name] = breaker
+    return breaker
@@ -0,0 +1,117 @@
+"""
+Critical Path
+
+Self time and critical path for the steps of a trace. The critical path
+is the chain of steps that determined the total duration: starting from
+the root, repeatedly follow the child that finished last before the
+current point in time, the way Jaeger's trace view computes it. Parallel
+children that finished earlier are off the path.
+"""
+
+from datetime import timedelta
+from typing import List
+
+from ..models.traces import TraceResponse
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def annotate_critical_path(trace: TraceResponse) -> TraceResponse:
+    """
+    Copy of a trace with self_time_ms and on_critical_path on every step.
+
+    Child intervals are clipped to their parent's. A step's self time is
+    its duration minus the union of its children's intervals. Sorting
+    children (by start for self time, by end for the path) dominates, so
+    the whole computation is O(n log n). The trace itself is not changed,
+    so shared (cached) traces stay intact.
+
+    Args:
+        trace: Trace with flat steps (parent_span_id links)
+
+    Returns:
+        Annotated copy of the trace
+    """
+    steps = trace.steps
+    count = len(steps)
+    if not count:
+        return trace
+
+    base = trace.timestamp
+    start = [(s.start_time - base) // _MICROSECOND for s in steps]
+    end = [
+        (s.end_time - base) // _MICROSECOND if s.end_time is not None
+        else start[i] + (s.duration_ms or 0) * 1000
+        for i, s in enumerate(steps)
+    ]
+    index = {s.span_id: i for i, s in enumerate(steps)}
+    parent = [index.get(s.parent_span_id, -1) if s.parent_span_id else -1 for s in steps]
+    children: List[List[int]] = [[] for _ in range(count)]
+    roots = []
+    for i, p in enumerate(parent):
+        if p < 0:
+            roots.append(i)
+        else:
+            children[p].append(i)
+
+    # Clip every child to its parent, parents first
+    queue = list(roots)
+    for node in queue:
+        for child in children[node]:
+            start[child] = min(max(start[child], start[node]), end[node])
+            end[child] = max(min(end[child], end[node]), start[child])
+            queue.append(child)
+
+    self_us = [0] * count
+    for node in range(count):
+        covered = 0
+        run_start = run_end = None
+        for child in sorted(children[node], key=start.__getitem__):
+            if run_end is None or start[child] > run_end:
+                if run_end is not None:
+                    covered += run_end - run_start
+                run_start, run_end = start[child], end[child]
+            elif end[child] > run_end:
+                run_end = end[child]
+        if run_end is not None:
+            covered += run_end - run_start
+        self_us[node] = end[node] - start[node] - covered
+
+    # Walk from the root that finished last, always into the child that
+    # finished last before the current point; each child list is scanned
+    # once because that point only moves backwards
+    on_path = [False] * count
+    by_end = [
+        sorted((c for c in kids if end[c] > start[c]), key=end.__getitem__, reverse=True)
+        for kids in children
+    ]
+    cursor = [0] * count
+    root = max(roots, key=end.__getitem__)
+    node, limit, returning = root, end[root], False
+    while True:
+        on_path[node] = True
+        kids = by_end[node]
+        position = cursor[node]
+        while position < len(kids) and (
+            end[kids[position]] > limit or (returning and end[kids[position]] == limit)
+        ):
+            position += 1
+        if position < len(kids):
+            cursor[node] = position + 1
+            node = kids[position]
+            limit, returning = end[node], False
+        elif node == root:
+            break
+        else:
+            cursor[node] = position
+            node, limit, returning = parent[node], start[node], True
+
+    return trace.model_copy(update={
+        "steps": [
+            step.model_copy(update={
+                "self_time_ms": self_us[i] // 1000,
+                "on_critical_path": on_path[i],
+            })
+            for i, step in enumerate(steps)
+        ],
+    })
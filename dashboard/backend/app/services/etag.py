@@ -0,0 +1,77 @@
+"""
+ETag Helpers
+
+Conditional GET support: JSON bodies are encoded and hashed once per cache
+entry, and requests whose If-None-Match matches are answered with 304
+without touching the body.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+# Clients may cache, but must revalidate with If-None-Match every time
+CACHE_CONTROL = "no-cache"
+
+
+def compute_etag(content: bytes, weak: bool = False) -> str:
+    """
+    Compute a quoted ETag for some content.
+
+    Args:
+        content: Bytes to hash
+        weak: Mark the tag weak (semantically, not byte-for-byte, equal)
+
+    Returns:
+        ETag header value
+    """
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match matches the ETag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def etag_headers(etag: str, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Response headers carrying an ETag."""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL, **(extra or {})}
+
+
+def not_modified(etag: str) -> Response:
+    """A 304 Not Modified response for an ETag."""
+    return Response(status_code=304, headers=etag_headers(etag))
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A JSON response body, encoded once, with its ETag."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_data(cls, data: Any) -> "CachedBody":
+        """Encode data as JSON and hash it."""
+        body = json.dumps(data, separators=(",", ":"), default=str).encode()
+        return cls(body=body, etag=compute_etag(body))
+
+    def response(self, request: Request, headers: Optional[Dict[str, str]] = None) -> Response:
+        """The cached body, or 304 if the client already has it."""
+        if etag_matches(request, self.etag):
+            return not_modified(self.etag)
+        return Response(
+            content=self.body,
+            media_type="application/json",
+            headers=etag_headers(self.etag, headers),
+        )
@@ -7,121 +7,345 @@ Aggregates health checks from all monitored services into a unified response.
 import asyncio
 import logging
 import time
-from typing import Dict, Optional
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
 
 import httpx
+from cachetools import TTLCache
 
 from ..config import get_settings
 from ..models.health import ServiceHealth, ServiceStatus, HealthCheckResponse
+from .anomaly import AnomalyDetectors
+from .circuit_breaker import CircuitState, get_circuit_breaker
+from .health_history import HealthHistory
+from .health_store import HealthStore, get_health_store
+from .http_clients import HTTPClientRegistry, get_http_clients
+from .metrics import PROBE_LATENCY, PROBE_PHASE, PROBES, UPSTREAM_STATUS
 from .mli_service import MLIService
+from .probe_timing import PHASE_NAMES, ProbeTimer, probe_extensions, probe_timer
+from .single_flight import SingleFlight
 from .supervision import derive_supervision_url
 
 logger = logging.getLogger(__name__)
 
+# Per-check timeouts are capped at this share of the run's deadline, so a
+# slow check times out (and counts against its breaker) before the
+# deadline cancels it
+_DEADLINE_SHARE = 0.9
+
+
+@dataclass
+class HealthCheck:
+    """A registered health check."""
+
+    name: str
+    check: Callable[[], Awaitable[ServiceHealth]]
+    timeout: float  # seconds before the check is reported as timed out
+    critical: bool = True  # a critical check that is DOWN marks the system DOWN
+
+
+def _parse_timeouts(value: str) -> Dict[str, float]:
+    """Parse "name=seconds,name=seconds" into a dict."""
+    timeouts = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+def _is_upstream_failure(result: ServiceHealth) -> bool:
+    """Whether a check result means the upstream is unreachable or hanging."""
+    return result.status == ServiceStatus.DOWN or result.timed_out
+
+
+def _attach_timing(result: ServiceHealth, timer: ProbeTimer):
+    """Add the probe's connection-phase breakdown to the result details."""
+    timing = timer.phases()
+    if timing:
+        result.details = {**(result.details or {}), "timing": timing}
+
 
 class HealthAggregator:
     """Aggregates health status from all monitored services."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        clients: Optional[HTTPClientRegistry] = None,
+        history: Optional[HealthHistory] = None,
+        store: Optional[HealthStore] = None,
+    ):
         self.settings = get_settings()
-        self.mli_service = MLIService()
+        self.clients = clients or get_http_clients()
+        self.history = history or HealthHistory()
+        self.store = store or get_health_store()
+        self.mli_service = MLIService(clients=self.clients)
         self.timeout = self.settings.health_check_timeout
+        self._single_flight = SingleFlight()
+        self.anomalies = AnomalyDetectors()
+
+        # Fleet checks: cached per AIAI URL, bounded concurrency
+        self._fleet_cache: TTLCache = TTLCache(
+            maxsize=self.settings.fleet_cache_size,
+            ttl=self.settings.fleet_cache_ttl,
+        )
+        self._fleet_semaphore = asyncio.Semaphore(self.settings.fleet_max_concurrency)
+
+        self._checks: Dict[str, HealthCheck] = {}
+        self._register_configured_checks()
+
+    def _register_configured_checks(self):
+        """Register the built-in checks enabled in settings."""
+        builtin = {
+            "aiai_api": self._check_aiai_api,
+            "mli": self._check_mli,
+            "mcp_proxy": self._check_mcp_proxy,
+            "jaeger": self._check_jaeger,
+        }
+        timeouts = _parse_timeouts(self.settings.health_check_timeouts)
+        critical = {n.strip() for n in self.settings.health_critical_checks.split(",")}
+
+        for name in (n.strip() for n in self.settings.health_checks.split(",")):
+            if not name:
+                continue
+            if name not in builtin:
+                logger.warning(f"Unknown health check in settings: {name}")
+                continue
+            self.register(
+                name,
+                builtin[name],
+                timeout=timeouts.get(name),
+                critical=name in critical,
+            )
+
+    def register(
+        self,
+        name: str,
+        check: Callable[[], Awaitable[ServiceHealth]],
+        timeout: Optional[float] = None,
+        critical: bool = True,
+    ):
+        """
+        Register a health check.
+
+        Args:
+            name: Service name used in responses (e.g., "mli")
+            check: Coroutine function returning ServiceHealth
+            timeout: Seconds before the check is reported as timed out
+                (defaults to health_check_timeout; capped below
+                health_check_deadline)
+            critical: Whether the check being DOWN marks the system DOWN
+        """
+        timeout = timeout or self.timeout
+        limit = self.settings.health_check_deadline * _DEADLINE_SHARE
+        if timeout > limit:
+            logger.warning(
+                f"Health check {name} timeout {timeout}s clamped to {limit:g}s "
+                f"(deadline {self.settings.health_check_deadline}s)"
+            )
+            timeout = limit
+        self._checks[name] = HealthCheck(
+            name=name,
+            check=check,
+            timeout=timeout,
+            critical=critical,
+        )
+
+    @property
+    def checks(self) -> Dict[str, HealthCheck]:
+        """Registered health checks by name."""
+        return dict(self._checks)
 
     async def check_all(self) -> HealthCheckResponse:
         """
-        Check health of all monitored services concurrently.
+        Check health of all registered services concurrently.
+
+        Each check is bounded by its own timeout, and the whole run by
+        health_check_deadline: checks still running at the deadline are
+        cancelled and reported as UNKNOWN, so one hanging upstream cannot
+        delay the response.
 
         Returns:
             HealthCheckResponse with status of all services
         """
         logger.info("Starting health check for all services")
+        deadline = self.settings.health_check_deadline
 
-        # Run all health checks concurrently
-        results = await asyncio.gather(
-            self._check_aiai_api(),
-            self._check_mli(),
-            self._check_mcp_proxy(),
-            self._check_jaeger(),
-            return_exceptions=True,
-        )
+        # Run all health checks concurrently under the global deadline
+        tasks = {
+            name: asyncio.create_task(self._run_check(check))
+            for name, check in self._checks.items()
+        }
+        try:
+            if tasks:
+                await asyncio.wait(tasks.values(), timeout=deadline)
+        except asyncio.CancelledError:
+            for task in tasks.values():
+                task.cancel()
+            raise
 
         services: Dict[str, ServiceHealth] = {}
 
         # Process results
-        check_names = ["aiai_api", "mli", "mcp_proxy", "jaeger"]
-        for name, result in zip(check_names, results):
-            if isinstance(result, Exception):
-                logger.error(f"Health check failed for {name}: {result}")
+        for name, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                logger.warning(f"Health check for {name} exceeded the {deadline}s deadline")
+                services[name] = ServiceHealth(
+                    status=ServiceStatus.UNKNOWN,
+                    message=f"Health check timed out (deadline {deadline}s)",
+                )
+            elif task.exception():
+                logger.error(f"Health check failed for {name}: {task.exception()}")
                 services[name] = ServiceHealth(
                     status=ServiceStatus.UNKNOWN,
-                    message=f"Health check error: {str(result)}",
+                    message=f"Health check error: {str(task.exception())}",
                 )
             else:
-                services[name] = result
+                services[name] = task.result()
+            self._record(name, services[name])
 
         # Build response and calculate overall status
         response = HealthCheckResponse(
             overall=ServiceStatus.UNKNOWN,
             services=services,
         )
-        response.overall = response.calculate_overall()
+        response.overall = response.calculate_overall(
+            critical={name for name, check in self._checks.items() if check.critical}
+        )
 
         logger.info(f"Health check complete. Overall status: {response.overall}")
         return response
 
+    async def _run_check(self, check: HealthCheck) -> ServiceHealth:
+        """
+        Run a registered check, bounded by its timeout and circuit breaker.
+
+        While the upstream's circuit is open the check fails fast as DOWN
+        without touching the network; probes resume with exponential backoff.
+        """
+        breaker = get_circuit_breaker(check.name)
+        if not breaker.allow_request():
+            return ServiceHealth(
+                status=ServiceStatus.DOWN,
+                message=f"Circuit open, next probe in {breaker.retry_in:.0f}s",
+                details={"circuit_breaker": breaker.snapshot()},
+            )
+
+        try:
+            with probe_timer() as timer:
+                result = await asyncio.wait_for(check.check(), timeout=check.timeout)
+        except asyncio.TimeoutError:
+            result = ServiceHealth(
+                status=ServiceStatus.DEGRADED,
+                latency_ms=int(check.timeout * 1000),
+                message=f"Timed out after {check.timeout}s",
+                timed_out=True,
+            )
+        except asyncio.CancelledError:
+            # Cancelled by the run's deadline (or shutdown), not the upstream's
+            # fault; an unreported half-open probe is retried after backoff
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        _attach_timing(result, timer)
+
+        if _is_upstream_failure(result):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if breaker.state != CircuitState.CLOSED:
+            result.details = {**(result.details or {}), "circuit_breaker": breaker.snapshot()}
+        self._detect_anomaly(check.name, result)
+        return result
+
+    def _detect_anomaly(self, key: str, result: ServiceHealth):
+        """
+        Feed a successful probe's latency to the key's anomaly detector.
+
+        A sustained latency anomaly downgrades an OK result to DEGRADED.
+        The baseline and current deviation are added to the details.
+        """
+        if result.status != ServiceStatus.OK or result.latency_ms is None:
+            return
+
+        detector = self.anomalies.observe(key, result.latency_ms)
+        result.details = {**(result.details or {}), "anomaly": detector.snapshot()}
+        if detector.anomalous:
+            result.status = ServiceStatus.DEGRADED
+            result.message = (
+                f"Latency {result.latency_ms}ms above baseline "
+                f"{detector.mean:.0f}ms ({detector.last_z:.1f} deviations)"
+            )
+
     async def _check_aiai_api(self) -> ServiceHealth:
         """Check AIAI API Server health."""
-        url = f"{self.settings.aiai_base_url}/health"
-        start_time = time.time()
+        return await self.check_aiai_url(self.settings.aiai_base_url)
 
-        try:
-            # Don't follow redirects - 302 means server is up but requires auth
-            async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=False) as client:
-                response = await client.get(url)
-                latency_ms = int((time.time() - start_time) * 1000)
+    async def check_aiai_url(self, aiai_url: str) -> ServiceHealth:
+        """
+        Check health of an AIAI API Server by URL.
 
-                if response.status_code == 200:
-                    data = response.json() if response.content else {}
+        Args:
+            aiai_url: Base URL of the AIAI server (e.g., a sandbox URL)
 
-                    # Ensure serviceInstanceId is present
-                    if "serviceInstanceId" not in data:
-                        supervision_info = derive_supervision_url(self.settings.aiai_base_url)
-                        if supervision_info:
-                            data["serviceInstanceId"] = supervision_info.service_instance_id
+        Returns:
+            ServiceHealth, with serviceInstanceId in details when derivable
+        """
+        url = f"{aiai_url}/health"
+        start_time = time.perf_counter()
 
-                    return ServiceHealth(
-                        status=ServiceStatus.OK,
-                        latency_ms=latency_ms,
-                        details=data,
-                    )
-                elif response.status_code in (301, 302, 303, 307, 308):
-                    # Redirect means server is reachable but requires authentication
-                    # This is expected for services behind 3DPassport SSO
-                    # Derive serviceInstanceId from URL pattern
-                    details = {"auth_required": True}
-                    supervision_info = derive_supervision_url(self.settings.aiai_base_url)
+        try:
+            # Pooled client doesn't follow redirects - 302 means server is up but requires auth
+            client = self.clients.get("aiai")
+            response = await client.get(url, timeout=self.timeout, extensions=probe_extensions())
+            latency_ms = int((time.perf_counter() - start_time) * 1000)
+
+            if response.status_code == 200:
+                data = response.json() if response.content else {}
+
+                # Ensure serviceInstanceId is present
+                if "serviceInstanceId" not in data:
+                    supervision_info = derive_supervision_url(aiai_url)
                     if supervision_info:
-                        details["serviceInstanceId"] = supervision_info.service_instance_id
+                        data["serviceInstanceId"] = supervision_info.service_instance_id
 
-                    return ServiceHealth(
-                        status=ServiceStatus.OK,
-                        latency_ms=latency_ms,
-                        message="Reachable (requires auth)",
-                        details=details,
-                    )
-                else:
-                    return ServiceHealth(
-                        status=ServiceStatus.DEGRADED,
-                        latency_ms=latency_ms,
-                        message=f"HTTP {response.status_code}",
-                    )
+                return ServiceHealth(
+                    status=ServiceStatus.OK,
+                    latency_ms=latency_ms,
+                    details=data,
+                )
+            elif response.status_code in (301, 302, 303, 307, 308):
+                # Redirect means server is reachable but requires authentication
+                # This is expected for services behind 3DPassport SSO
+                # Derive serviceInstanceId from URL pattern
+                details = {"auth_required": True}
+                supervision_info = derive_supervision_url(aiai_url)
+                if supervision_info:
+                    details["serviceInstanceId"] = supervision_info.service_instance_id
+
+                return ServiceHealth(
+                    status=ServiceStatus.OK,
+                    latency_ms=latency_ms,
+                    message="Reachable (requires auth)",
+                    details=details,
+                )
+            else:
+                return ServiceHealth(
+                    status=ServiceStatus.DEGRADED,
+                    latency_ms=latency_ms,
+                    message=f"HTTP {response.status_code}",
+                )
 
         except httpx.TimeoutException:
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = int((time.perf_counter() - start_time) * 1000)
             return ServiceHealth(
                 status=ServiceStatus.DEGRADED,
                 latency_ms=latency_ms,
                 message="Request timed out",
+                timed_out=True,
             )
         except httpx.ConnectError:
             return ServiceHealth(
@@ -148,47 +372,48 @@ class HealthAggregator:
             )
 
         url = f"{self.settings.mcp_proxy_url}/health"
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
-                latency_ms = int((time.time() - start_time) * 1000)
-
-                if response.status_code == 200:
-                    data = response.json() if response.content else {}
-
-                    # Check tool availability if provided
-                    tools = data.get("tools", {})
-                    available = tools.get("available", 0)
-                    total = tools.get("total", 0)
-
-                    if total > 0 and available < total:
-                        return ServiceHealth(
-                            status=ServiceStatus.DEGRADED,
-                            latency_ms=latency_ms,
-                            message=f"{available}/{total} tools available",
-                            details=data,
-                        )
+            client = self.clients.get("mcp_proxy")
+            response = await client.get(url, timeout=self.timeout, extensions=probe_extensions())
+            latency_ms = int((time.perf_counter() - start_time) * 1000)
 
-                    return ServiceHealth(
-                        status=ServiceStatus.OK,
-                        latency_ms=latency_ms,
-                        details=data,
-                    )
-                else:
+            if response.status_code == 200:
+                data = response.json() if response.content else {}
+
+                # Check tool availability if provided
+                tools = data.get("tools", {})
+                available = tools.get("available", 0)
+                total = tools.get("total", 0)
+
+                if total > 0 and available < total:
                     return ServiceHealth(
                         status=ServiceStatus.DEGRADED,
                         latency_ms=latency_ms,
-                        message=f"HTTP {response.status_code}",
+                        message=f"{available}/{total} tools available",
+                        details=data,
                     )
 
+                return ServiceHealth(
+                    status=ServiceStatus.OK,
+                    latency_ms=latency_ms,
+                    details=data,
+                )
+            else:
+                return ServiceHealth(
+                    status=ServiceStatus.DEGRADED,
+                    latency_ms=latency_ms,
+                    message=f"HTTP {response.status_code}",
+                )
+
         except httpx.TimeoutException:
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = int((time.perf_counter() - start_time) * 1000)
             return ServiceHealth(
                 status=ServiceStatus.DEGRADED,
                 latency_ms=latency_ms,
                 message="Request timed out",
+                timed_out=True,
             )
         except httpx.ConnectError:
             return ServiceHealth(
@@ -205,43 +430,44 @@ class HealthAggregator:
     async def _check_jaeger(self) -> ServiceHealth:
         """Check Jaeger availability (for trace queries)."""
         url = f"{self.settings.jaeger_base_url}/api/services"
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
-            # Don't follow redirects - 302 means server is up but requires auth
-            async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=False) as client:
-                response = await client.get(url)
-                latency_ms = int((time.time() - start_time) * 1000)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    services = data.get("data", [])
-                    return ServiceHealth(
-                        status=ServiceStatus.OK,
-                        latency_ms=latency_ms,
-                        details={"services_count": len(services)},
-                    )
-                elif response.status_code in (301, 302, 303, 307, 308):
-                    # Redirect means server is reachable but requires authentication
-                    return ServiceHealth(
-                        status=ServiceStatus.OK,
-                        latency_ms=latency_ms,
-                        message="Reachable (requires auth)",
-                        details={"auth_required": True},
-                    )
-                else:
-                    return ServiceHealth(
-                        status=ServiceStatus.DEGRADED,
-                        latency_ms=latency_ms,
-                        message=f"HTTP {response.status_code}",
-                    )
+            # Pooled client doesn't follow redirects - 302 means server is up but requires auth
+            client = self.clients.get("jaeger")
+            response = await client.get(url, timeout=self.timeout, extensions=probe_extensions())
+            latency_ms = int((time.perf_counter() - start_time) * 1000)
+
+            if response.status_code == 200:
+                data = response.json()
+                services = data.get("data", [])
+                return ServiceHealth(
+                    status=ServiceStatus.OK,
+                    latency_ms=latency_ms,
+                    details={"services_count": len(services)},
+                )
+            elif response.status_code in (301, 302, 303, 307, 308):
+                # Redirect means server is reachable but requires authentication
+                return ServiceHealth(
+                    status=ServiceStatus.OK,
+                    latency_ms=latency_ms,
+                    message="Reachable (requires auth)",
+                    details={"auth_required": True},
+                )
+            else:
+                return ServiceHealth(
+                    status=ServiceStatus.DEGRADED,
+                    latency_ms=latency_ms,
+                    message=f"HTTP {response.status_code}",
+                )
 
         except httpx.TimeoutException:
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = int((time.perf_counter() - start_time) * 1000)
             return ServiceHealth(
                 status=ServiceStatus.DEGRADED,
                 latency_ms=latency_ms,
                 message="Request timed out",
+                timed_out=True,
             )
         except httpx.ConnectError:
             return ServiceHealth(
@@ -255,6 +481,53 @@ class HealthAggregator:
                 message=str(e),
             )
 
+    async def check_fleet(self, aiai_urls: List[str]) -> Dict[str, ServiceHealth]:
+        """
+        Check many AIAI servers concurrently.
+
+        At most fleet_max_concurrency probes run at once, each bounded by
+        fleet_check_deadline. Results are cached per URL for fleet_cache_ttl
+        seconds, and concurrent requests for the same URL share one probe.
+
+        Args:
+            aiai_urls: AIAI server base URLs
+
+        Returns:
+            Dict mapping each URL to its ServiceHealth
+        """
+        unique_urls = list(dict.fromkeys(url.rstrip("/") for url in aiai_urls))
+        logger.info(f"Checking fleet health for {len(unique_urls)} AIAI servers")
+
+        results = await asyncio.gather(*(
+            self._single_flight.do(("check_fleet", url), lambda url=url: self._check_fleet_member(url))
+            for url in unique_urls
+        ))
+        return dict(zip(unique_urls, results))
+
+    async def _check_fleet_member(self, aiai_url: str) -> ServiceHealth:
+        """Check one fleet member, using the per-URL cache."""
+        cached = self._fleet_cache.get(aiai_url)
+        if cached is not None:
+            return cached
+
+        deadline = self.settings.fleet_check_deadline
+        async with self._fleet_semaphore:
+            try:
+                with probe_timer() as timer:
+                    result = await asyncio.wait_for(self.check_aiai_url(aiai_url), timeout=deadline)
+            except asyncio.TimeoutError:
+                result = ServiceHealth(
+                    status=ServiceStatus.DEGRADED,
+                    latency_ms=int(deadline * 1000),
+                    message=f"Timed out after {deadline}s",
+                    timed_out=True,
+                )
+        _attach_timing(result, timer)
+        self._detect_anomaly(aiai_url, result)
+
+        self._fleet_cache[aiai_url] = result
+        return result
+
     async def check_single(self, service_name: str) -> Optional[ServiceHealth]:
         """
         Check health of a single service.
@@ -265,22 +538,40 @@ class HealthAggregator:
         Returns:
             ServiceHealth or None if service not found
         """
-        check_methods = {
-            "aiai_api": self._check_aiai_api,
-            "mli": self._check_mli,
-            "mcp_proxy": self._check_mcp_proxy,
-            "jaeger": self._check_jaeger,
-        }
-
-        method = check_methods.get(service_name)
-        if not method:
+        check = self._checks.get(service_name)
+        if not check:
             return None
 
         try:
-            return await method()
+            # Concurrent requests for the same service share one upstream probe
+            return await self._single_flight.do(
+                ("check_single", service_name),
+                lambda: self._run_and_record(check),
+            )
         except Exception as e:
             logger.error(f"Health check failed for {service_name}: {e}")
             return ServiceHealth(
                 status=ServiceStatus.UNKNOWN,
                 message=str(e),
             )
+
+    async def _run_and_record(self, check: HealthCheck) -> ServiceHealth:
+        """Run a single check and record its result in the history."""
+        result = await self._run_check(check)
+        self._record(check.name, result)
+        return result
+
+    def _record(self, name: str, result: ServiceHealth):
+        """Record a check result in the history, durable store and metrics."""
+        self.history.record(name, result)
+        self.store.add(name, result)
+
+        PROBES.inc(upstream=name, status=result.status.value)
+        for status in ServiceStatus:
+            UPSTREAM_STATUS.set(int(status == result.status), upstream=name, status=status.value)
+        if result.latency_ms is not None:
+            PROBE_LATENCY.observe(result.latency_ms / 1000, upstream=name)
+        timing = (result.details or {}).get("timing") or {}
+        for phase in PHASE_NAMES:
+            if phase in timing:
+                PROBE_PHASE.observe(timing[phase] / 1000, upstream=name, phase=phase[:-3])
@@ -0,0 +1,220 @@
+"""
+Health History Service
+
+Records every health check result into fixed-size, array-backed ring
+buffers (one per service) and computes uptime and latency percentiles
+over time windows with vectorized NumPy operations. Connection-phase
+timings (see probe_timing) are kept alongside each sample.
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import get_settings
+from ..models.health import ServiceHealth, ServiceStatus
+from .probe_timing import PHASE_NAMES
+
+logger = logging.getLogger(__name__)
+
+# Compact status encoding for the ring buffers
+STATUS_CODES = {
+    ServiceStatus.OK: 0,
+    ServiceStatus.DEGRADED: 1,
+    ServiceStatus.DOWN: 2,
+    ServiceStatus.UNKNOWN: 3,
+}
+STATUS_BY_CODE = {code: status for status, code in STATUS_CODES.items()}
+
+# Sentinel stored when a check has no latency (e.g., connection refused)
+NO_LATENCY = -1
+
+
+class HealthRingBuffer:
+    """Fixed-capacity ring buffer of (timestamp, status, latency, phases) samples."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.statuses = np.zeros(capacity, dtype=np.int8)
+        self.latencies = np.full(capacity, NO_LATENCY, dtype=np.int32)
+        # One column per timing phase, NaN when the phase did not happen
+        self.phases = np.full((capacity, len(PHASE_NAMES)), np.nan, dtype=np.float32)
+        self._next = 0
+        self._size = 0
+        self._last_timestamp = float("-inf")
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self,
+        timestamp: float,
+        status: int,
+        latency_ms: Optional[int],
+        timing: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Append a sample, overwriting the oldest once full.
+
+        Timestamps are clamped to never go below the previous one. Samples
+        carry the wall-clock time their result was built and are recorded
+        later, so overlapping runs (check_single during check_all) or a
+        clock step back can deliver them out of order, and window()
+        relies on each segment being sorted.
+        """
+        timestamp = max(timestamp, self._last_timestamp)
+        self._last_timestamp = timestamp
+        i = self._next
+        self.timestamps[i] = timestamp
+        self.statuses[i] = status
+        self.latencies[i] = NO_LATENCY if latency_ms is None else latency_ms
+        timing = timing or {}
+        self.phases[i] = [timing.get(name, np.nan) for name in PHASE_NAMES]
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _segments(self) -> List[slice]:
+        """Buffer slices in chronological order (each one sorted by time)."""
+        if self._size < self.capacity:
+            return [slice(0, self._size)]
+        return [slice(self._next, self.capacity), slice(0, self._next)]
+
+    def window(self, since: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the samples recorded at or after `since`, oldest first.
+
+        Each chronological segment is binary-searched, so only the samples
+        inside the window are copied.
+
+        Returns:
+            Tuple of (timestamps, statuses, latencies, phases) arrays
+        """
+        parts = []
+        for seg in self._segments():
+            ts = self.timestamps[seg]
+            start = int(np.searchsorted(ts, since, side="left"))
+            if start < len(ts):
+                parts.append(slice(seg.start + start, seg.stop))
+
+        columns = (self.timestamps, self.statuses, self.latencies, self.phases)
+        if not parts:
+            return tuple(column[0:0] for column in columns)
+        if len(parts) == 1:
+            return tuple(column[parts[0]] for column in columns)
+        return tuple(np.concatenate([column[s] for s in parts]) for column in columns)
+
+
+class HealthHistory:
+    """Bounded in-memory health history for all monitored services."""
+
+    def __init__(self, capacity: Optional[int] = None):
+        """
+        Initialize the history store.
+
+        Args:
+            capacity: Samples kept per service (defaults to settings)
+        """
+        self.capacity = capacity or get_settings().health_history_size
+        self._buffers: Dict[str, HealthRingBuffer] = {}
+
+    def record(self, service: str, health: ServiceHealth):
+        """Record a single health check result."""
+        buffer = self._buffers.get(service)
+        if buffer is None:
+            buffer = HealthRingBuffer(self.capacity)
+            self._buffers[service] = buffer
+        # last_checked is naive UTC (datetime.utcnow)
+        checked = health.last_checked
+        if checked.tzinfo is None:
+            checked = checked.replace(tzinfo=timezone.utc)
+        buffer.append(
+            checked.timestamp(),
+            STATUS_CODES.get(health.status, STATUS_CODES[ServiceStatus.UNKNOWN]),
+            health.latency_ms,
+            (health.details or {}).get("timing"),
+        )
+
+    def services(self) -> List[str]:
+        """Names of services with recorded history."""
+        return list(self._buffers)
+
+    def history(self, service: str, window_s: int) -> List[Dict[str, Any]]:
+        """
+        Get raw samples for a service over the last window_s seconds.
+
+        Returns:
+            List of samples, oldest first
+        """
+        buffer = self._buffers.get(service)
+        if buffer is None:
+            return []
+
+        timestamps, statuses, latencies, phases = buffer.window(time.time() - window_s)
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(),
+                "status": STATUS_BY_CODE[int(code)].value,
+                "latency_ms": None if lat == NO_LATENCY else int(lat),
+                "timing": {
+                    name: round(value, 1)
+                    for name, value in zip(PHASE_NAMES, row)
+                    if value == value  # skip NaN
+                },
+            }
+            for ts, code, lat, row in zip(
+                timestamps.tolist(), statuses.tolist(), latencies.tolist(), phases.tolist()
+            )
+        ]
+
+    def stats(self, service: str, window_s: int) -> Dict[str, Any]:
+        """
+        Compute uptime and latency percentiles over the last window_s seconds.
+
+        Uptime is the share of checks that returned OK; incidents count
+        transitions from OK to any other status.
+
+        Returns:
+            Dict with sample count, uptime %, incidents, p50/p95/p99 latency
+            and the p95 of each timing phase
+        """
+        result: Dict[str, Any] = {
+            "window_s": window_s,
+            "samples": 0,
+            "uptime_pct": None,
+            "incidents": 0,
+            "latency_p50_ms": None,
+            "latency_p95_ms": None,
+            "latency_p99_ms": None,
+            "phase_p95_ms": {},
+        }
+
+        buffer = self._buffers.get(service)
+        if buffer is None:
+            return result
+
+        _, statuses, latencies, phases = buffer.window(time.time() - window_s)
+        if len(statuses) == 0:
+            return result
+
+        ok = statuses == STATUS_CODES[ServiceStatus.OK]
+        result["samples"] = int(len(statuses))
+        result["uptime_pct"] = round(float(ok.mean()) * 100, 2)
+        result["incidents"] = int(np.count_nonzero(ok[:-1] & ~ok[1:]))
+
+        measured = latencies[latencies != NO_LATENCY]
+        if len(measured):
+            p50, p95, p99 = np.percentile(measured, [50, 95, 99])
+            result["latency_p50_ms"] = int(round(p50))
+            result["latency_p95_ms"] = int(round(p95))
+            result["latency_p99_ms"] = int(round(p99))
+
+        for name, column in zip(PHASE_NAMES, phases.T):
+            measured = column[~np.isnan(column)]
+            if len(measured):
+                result["phase_p95_ms"][name] = round(float(np.percentile(measured, 95)), 1)
+
+        return result
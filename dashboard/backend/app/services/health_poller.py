@@ -0,0 +1,153 @@
+"""
+Health Poller Service
+
+Runs the health aggregator in the background and keeps the latest snapshot
+in memory so API requests never wait on upstream checks.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional, Set, Tuple
+
+from ..config import get_settings
+from ..models.health import HealthCheckResponse
+from .health_aggregator import HealthAggregator
+
+logger = logging.getLogger(__name__)
+
+
+class HealthPoller:
+    """Background poller serving a stale-while-revalidate health snapshot."""
+
+    def __init__(
+        self,
+        aggregator: HealthAggregator,
+        interval: Optional[int] = None,
+        stale_after: Optional[int] = None,
+    ):
+        """
+        Initialize the poller.
+
+        Args:
+            aggregator: Health aggregator used to run the checks
+            interval: Seconds between background polls (0 disables polling)
+            stale_after: Age in seconds after which a request triggers a refresh
+        """
+        settings = get_settings()
+        self.aggregator = aggregator
+        self.interval = settings.health_poll_interval if interval is None else interval
+        self.stale_after = settings.health_stale_after if stale_after is None else stale_after
+
+        self._snapshot: Optional[HealthCheckResponse] = None
+        self._snapshot_at: Optional[float] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def snapshot(self) -> Optional[HealthCheckResponse]:
+        """Latest health snapshot, or None before the first check completes."""
+        return self._snapshot
+
+    @property
+    def snapshot_age(self) -> Optional[float]:
+        """Age of the latest snapshot in seconds."""
+        if self._snapshot_at is None:
+            return None
+        return time.monotonic() - self._snapshot_at
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the snapshot is missing or older than the staleness threshold."""
+        age = self.snapshot_age
+        return age is None or age > self.stale_after
+
+    async def get_snapshot(self) -> Tuple[HealthCheckResponse, float]:
+        """
+        Get the latest snapshot and its age.
+
+        Waits for a check only if no snapshot exists yet. A stale snapshot is
+        returned immediately while a refresh runs in the background.
+
+        Returns:
+            Tuple of (snapshot, age in seconds)
+        """
+        if self._snapshot is None:
+            await self.refresh()
+        elif self.is_stale:
+            self._start_refresh()
+        return self._snapshot, self.snapshot_age
+
+    async def refresh(self) -> HealthCheckResponse:
+        """Run a health check now, joining one already in progress."""
+        return await asyncio.shield(self._start_refresh())
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Start a refresh unless one is already running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._run_check())
+        return self._refresh_task
+
+    async def _run_check(self) -> HealthCheckResponse:
+        """Run all health checks and store the result as the new snapshot."""
+        result = await self.aggregator.check_all()
+        self._snapshot = result
+        self._snapshot_at = time.monotonic()
+        self._publish(result)
+        return result
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Subscribe to new snapshots.
+
+        Returns:
+            Queue receiving each new HealthCheckResponse. Only the latest
+            snapshot matters, so a slow subscriber loses older ones.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Stop delivering snapshots to a queue."""
+        self._subscribers.discard(queue)
+
+    def _publish(self, result: HealthCheckResponse):
+        """Deliver a snapshot to every subscriber, replacing any undelivered one."""
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(result)
+
+    async def _poll_loop(self):
+        """Refresh the snapshot every interval until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Background health poll failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start background polling."""
+        if self.interval <= 0:
+            logger.info("Background health polling disabled")
+            return
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = asyncio.create_task(self._poll_loop())
+            logger.info(f"Background health polling every {self.interval}s")
+
+    async def stop(self):
+        """Stop background polling and any in-flight refresh."""
+        for task in (self._poll_task, self._refresh_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._poll_task = None
+        self._refresh_task = None
@@ -0,0 +1,355 @@
+"""
+Health Store Service
+
+Durable health history in a local SQLite database (WAL mode). Raw samples
+are rolled up into 1-minute, 5-minute and 1-hour buckets (count, failures,
+min/avg/max/p95 latency), and every tier is pruned to its own retention so
+disk usage stays bounded. All SQLite work runs in a worker thread.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import get_settings
+from ..models.health import ServiceHealth, ServiceStatus
+from .health_history import NO_LATENCY, STATUS_CODES
+
+logger = logging.getLogger(__name__)
+
+OK_CODE = STATUS_CODES[ServiceStatus.OK]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    service TEXT NOT NULL,
+    ts REAL NOT NULL,
+    status INTEGER NOT NULL,
+    latency_ms INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE TABLE IF NOT EXISTS rollups (
+    tier TEXT NOT NULL,
+    service TEXT NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    latency_min INTEGER,
+    latency_avg REAL,
+    latency_max INTEGER,
+    latency_p95 INTEGER,
+    PRIMARY KEY (tier, service, bucket_start)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_state (
+    tier TEXT PRIMARY KEY,
+    rolled_until INTEGER NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class RollupTier:
+    """A rollup resolution and how long its buckets are kept."""
+    name: str
+    bucket_s: int
+    retention_s: int
+
+
+# Rollup resolutions, finest first
+TIER_BUCKETS = (("1m", 60), ("5m", 300), ("1h", 3600))
+
+# Retention (seconds) for raw samples and each tier unless configured
+DEFAULT_RETENTION = {"raw": 2 * 86400, "1m": 7 * 86400, "5m": 30 * 86400, "1h": 365 * 86400}
+
+
+def _parse_retention(value: str) -> Dict[str, int]:
+    """Parse "tier=seconds,..." retention settings."""
+    retention = {}
+    for item in value.split(","):
+        name, sep, seconds = item.partition("=")
+        if not sep:
+            continue
+        try:
+            retention[name.strip()] = int(seconds)
+        except ValueError:
+            logger.warning(f"Invalid health store retention: {item}")
+    return retention
+
+
+class HealthStore:
+    """SQLite-backed health history with downsampled rollups."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite database path (defaults to settings; empty disables)
+        """
+        settings = get_settings()
+        self.path = settings.health_store_path if path is None else path
+        self.flush_interval = settings.health_store_flush_interval
+        # A sample can reach the database this long after its timestamp: its
+        # check may run until the deadline, then wait for the next flush
+        self.rollup_delay = settings.health_check_deadline + self.flush_interval
+
+        retention = {**DEFAULT_RETENTION, **_parse_retention(settings.health_store_retention)}
+        self.raw_retention = retention["raw"]
+        self.tiers = [
+            RollupTier(name, bucket_s, retention[name]) for name, bucket_s in TIER_BUCKETS
+        ]
+
+        self._pending: List[Tuple[str, float, int, int]] = []
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a database path is configured."""
+        return bool(self.path)
+
+    def add(self, service: str, health: ServiceHealth):
+        """Queue a health check result for the next flush (once opened)."""
+        if self._conn is None:
+            return
+        # last_checked is naive UTC (datetime.utcnow)
+        checked = health.last_checked
+        if checked.tzinfo is None:
+            checked = checked.replace(tzinfo=timezone.utc)
+        self._pending.append((
+            service,
+            checked.timestamp(),
+            STATUS_CODES.get(health.status, STATUS_CODES[ServiceStatus.UNKNOWN]),
+            NO_LATENCY if health.latency_ms is None else health.latency_ms,
+        ))
+
+    async def flush(self):
+        """Write queued samples, then update rollups and apply retention."""
+        if self._conn is None:
+            return
+        rows, self._pending = self._pending, []
+        await asyncio.to_thread(self._flush_sync, rows, time.time())
+
+    async def query(
+        self,
+        service: str,
+        start: float,
+        end: float,
+        max_points: int,
+    ) -> Dict[str, Any]:
+        """
+        Get rolled-up history for a service over [start, end).
+
+        Uses the finest tier that keeps the range within max_points buckets,
+        among the tiers whose retention reaches back to start, so ranges
+        over weeks read a few hundred hourly rows instead of raw samples.
+
+        Args:
+            service: Service name
+            start: Range start (Unix seconds)
+            end: Range end (Unix seconds)
+            max_points: Upper bound on the number of buckets returned
+
+        Returns:
+            Dict with the chosen tier and its buckets, oldest first
+        """
+        tier = self.select_tier(start, end, max_points)
+        if self._conn is None:
+            return {"tier": tier.name, "bucket_s": tier.bucket_s, "points": []}
+
+        rows = await asyncio.to_thread(self._query_sync, tier, service, start, end)
+        return {
+            "tier": tier.name,
+            "bucket_s": tier.bucket_s,
+            "points": [
+                {
+                    "timestamp": datetime.fromtimestamp(bucket, tz=timezone.utc).isoformat(),
+                    "count": count,
+                    "failures": failures,
+                    "uptime_pct": round((count - failures) / count * 100, 2),
+                    "latency_min_ms": lat_min,
+                    "latency_avg_ms": None if lat_avg is None else round(lat_avg, 1),
+                    "latency_max_ms": lat_max,
+                    "latency_p95_ms": lat_p95,
+                }
+                for bucket, count, failures, lat_min, lat_avg, lat_max, lat_p95 in rows
+            ],
+        }
+
+    def select_tier(self, start: float, end: float, max_points: int) -> RollupTier:
+        """Pick the rollup tier for a range (see query)."""
+        now = time.time()
+        covering = [t for t in self.tiers if now - t.retention_s <= start] or self.tiers[-1:]
+        for tier in covering:
+            if (end - start) / tier.bucket_s <= max_points:
+                return tier
+        # Even the coarsest tier exceeds max_points; it is the cheapest read
+        return covering[-1]
+
+    def _open_sync(self):
+        """Open the database and create the schema."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        self._conn = conn
+
+    def _close_sync(self, conn: sqlite3.Connection):
+        """Close the connection once no flush or query is using it."""
+        with self._lock:
+            conn.close()
+
+    def _flush_sync(self, rows: List[Tuple[str, float, int, int]], now: float):
+        """Insert samples, roll up finished buckets and prune old data."""
+        with self._lock:
+            conn = self._conn
+            if conn is None:
+                return
+            with conn:
+                if rows:
+                    conn.executemany("INSERT INTO samples VALUES (?, ?, ?, ?)", rows)
+
+                for tier in self.tiers:
+                    self._rollup_sync(conn, tier, now)
+                    conn.execute(
+                        "DELETE FROM rollups WHERE tier = ? AND bucket_start < ?",
+                        (tier.name, now - tier.retention_s),
+                    )
+                conn.execute("DELETE FROM samples WHERE ts < ?", (now - self.raw_retention,))
+
+    def _rollup_sync(self, conn: sqlite3.Connection, tier: RollupTier, now: float):
+        """
+        Aggregate raw samples of the tier's finished buckets.
+
+        Only buckets that ended at least rollup_delay ago are rolled up, so
+        late samples are still in raw storage when their bucket is built.
+        """
+        until = int((now - self.rollup_delay) // tier.bucket_s) * tier.bucket_s
+        row = conn.execute(
+            "SELECT rolled_until FROM rollup_state WHERE tier = ?", (tier.name,)
+        ).fetchone()
+        if row is not None:
+            since = row[0]
+        else:
+            first = conn.execute("SELECT MIN(ts) FROM samples").fetchone()[0]
+            if first is None:
+                return
+            since = int(first // tier.bucket_s) * tier.bucket_s
+        if since >= until:
+            return
+
+        samples = conn.execute(
+            "SELECT service, ts, status, latency_ms FROM samples "
+            "WHERE ts >= ? AND ts < ? ORDER BY service, ts",
+            (since, until),
+        ).fetchall()
+
+        buckets = []
+        for (service, bucket), group in groupby(
+            samples, key=lambda s: (s[0], int(s[1] // tier.bucket_s) * tier.bucket_s)
+        ):
+            group = list(group)
+            statuses = np.fromiter((s[2] for s in group), dtype=np.int8, count=len(group))
+            latencies = np.fromiter((s[3] for s in group), dtype=np.int32, count=len(group))
+            measured = latencies[latencies != NO_LATENCY]
+            has_latency = len(measured) > 0
+            buckets.append((
+                tier.name,
+                service,
+                bucket,
+                len(group),
+                int(np.count_nonzero(statuses != OK_CODE)),
+                int(measured.min()) if has_latency else None,
+                float(measured.mean()) if has_latency else None,
+                int(measured.max()) if has_latency else None,
+                int(round(np.percentile(measured, 95))) if has_latency else None,
+            ))
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", buckets
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO rollup_state VALUES (?, ?)", (tier.name, until)
+        )
+
+    def _query_sync(
+        self, tier: RollupTier, service: str, start: float, end: float
+    ) -> List[Tuple]:
+        """Read a tier's buckets for a service."""
+        with self._lock:
+            if self._conn is None:
+                return []
+            return self._conn.execute(
+                "SELECT bucket_start, count, failures, latency_min, latency_avg, "
+                "latency_max, latency_p95 FROM rollups "
+                "WHERE tier = ? AND service = ? AND bucket_start >= ? AND bucket_start < ? "
+                "ORDER BY bucket_start",
+                (tier.name, service, int(start // tier.bucket_s) * tier.bucket_s, end),
+            ).fetchall()
+
+    async def _flush_loop(self):
+        """Flush every interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Health store flush failed: {e}")
+
+    async def start(self):
+        """Open the database and start periodic flushing."""
+        if not self.enabled:
+            logger.info("Durable health history disabled")
+            return
+        try:
+            await asyncio.to_thread(self._open_sync)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Could not open health store {self.path}, history disabled: {e}")
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Durable health history in {self.path}")
+
+    async def stop(self):
+        """Stop flushing, write remaining samples and close the database."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+
+        if self._conn is not None:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Final health store flush failed: {e}")
+            # New calls see no connection; running ones finish before the close
+            conn, self._conn = self._conn, None
+            await asyncio.to_thread(self._close_sync, conn)
+
+
+# Global store instance
+_health_store: Optional[HealthStore] = None
+
+
+def get_health_store() -> HealthStore:
+    """Get the shared health store."""
+    global _health_store
+    if _health_store is None:
+        _health_store = HealthStore()
+    return _health_store
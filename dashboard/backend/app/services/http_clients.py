@@ -0,0 +1,97 @@
+"""
+Upstream HTTP Client Registry
+
+Keeps one pooled httpx.AsyncClient per upstream so repeated health checks
+and trace fetches reuse keep-alive connections instead of paying a new
+TCP/TLS handshake on every call.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Upstreams the dashboard backend talks to
+UPSTREAMS = ("aiai", "mli", "mcp_proxy", "jaeger")
+
+
+def _http2_available() -> bool:
+    """Check whether the optional h2 package required for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HTTPClientRegistry:
+    """Registry of pooled HTTP clients, one per upstream."""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._http2 = self.settings.http2_enabled and _http2_available()
+        if self.settings.http2_enabled and not self._http2:
+            logger.info("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+
+    def get(self, upstream: str) -> httpx.AsyncClient:
+        """
+        Get the pooled client for an upstream, creating it on first use.
+
+        Args:
+            upstream: Upstream name (e.g., "jaeger", "mli")
+
+        Returns:
+            Shared httpx.AsyncClient for that upstream
+        """
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed:
+            client = self._create_client(upstream)
+            self._clients[upstream] = client
+        return client
+
+    def _create_client(self, upstream: str) -> httpx.AsyncClient:
+        """Create a keep-alive client with per-upstream connection limits."""
+        logger.debug(f"Creating pooled HTTP client for {upstream} (http2={self._http2})")
+        limits = httpx.Limits(
+            max_connections=self.settings.http_max_connections,
+            max_keepalive_connections=self.settings.http_max_keepalive_connections,
+            keepalive_expiry=self.settings.http_keepalive_expiry,
+        )
+        # Don't follow redirects - services rely on seeing 302s for SSO detection
+        return httpx.AsyncClient(
+            limits=limits,
+            http2=self._http2,
+            timeout=self.settings.health_check_timeout,
+            follow_redirects=False,
+        )
+
+    def open(self):
+        """Create clients for all known upstreams."""
+        for upstream in UPSTREAMS:
+            self.get(upstream)
+        logger.info(f"HTTP client pool ready for: {', '.join(UPSTREAMS)}")
+
+    async def aclose(self):
+        """Close all pooled clients."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+        logger.info("HTTP client pool closed")
+
+
+# Global instance
+_http_clients: Optional[HTTPClientRegistry] = None
+
+
+def get_http_clients() -> HTTPClientRegistry:
+    """Get the global HTTP client registry."""
+    global _http_clients
+    if _http_clients is None:
+        _http_clients = HTTPClientRegistry()
+    return _http_clients
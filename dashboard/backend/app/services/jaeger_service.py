@@ -4,52 +4,240 @@ Jaeger Service
 Integrates with Jaeger API to fetch OpenTelemetry traces.
 """
 
+import asyncio
+import json
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+import re
+import time
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from operator import itemgetter
+from typing import (
+    Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Set, Tuple,
+)
 
 import httpx
+from cachetools import LRUCache
 
 from ..config import get_settings
 from ..models.traces import (
     TraceResponse,
-    TraceStep,
+    TraceAnalytics,
     TraceSearchParams,
     TraceSearchResult,
+    TraceView,
     StepStatus,
 )
+from .circuit_breaker import CircuitOpenError, get_circuit_breaker
+from .critical_path import annotate_critical_path
+from .http_clients import HTTPClientRegistry, get_http_clients
+from .json_stream import iter_json_array
+from .metrics import JAEGER_QUERY_DURATION, TRACE_CACHE
+from .single_flight import SingleFlight
+from .span_columns import SpanColumns, group_stats, span_columns_from_trace
+from .parse_pool import ParsePool, get_parse_pool
+from .trace_index import TraceIndex, get_trace_index
+from .trace_parser import (
+    convert_search_json,
+    convert_search_traces,
+    parse_trace,
+    parse_trace_json,
+    split_search_json,
+    summarize_trace,
+    trace_start_us,
+)
 
 logger = logging.getLogger(__name__)
 
+# Jaeger trace IDs are up to 32 hex digits; anything else is a request ID
+_TRACE_ID = re.compile(r"^[0-9a-fA-F]{1,32}$")
+
+# Memory of a parsed trace, measured on CPython 3.11 with pydantic 2: fixed
+# cost per trace, per step (model, datetimes, IDs) and per tag, plus the
+# characters of the strings held. Parsed traces take about 4x their Jaeger
+# JSON size, so the JSON length is no measure of the cache's memory.
+_TRACE_BYTES = 2000
+_STEP_BYTES = 1600
+_TAG_BYTES = 100
+
+
+class CachedTrace(NamedTuple):
+    """A parsed trace and its approximate size in bytes."""
+    trace: TraceResponse
+    size: int
+
+
+def estimate_trace_size(trace: TraceResponse) -> int:
+    """Approximate memory of a parsed trace in bytes (within about 15%)."""
+    size = _TRACE_BYTES
+    for step in trace.steps:
+        size += _STEP_BYTES + len(step.name) + len(step.error or "")
+        for key, value in (step.data or {}).items():
+            size += _TAG_BYTES + len(key)
+            if isinstance(value, str):
+                size += len(value)
+    return size
+
+
+def _epoch_us(value: datetime) -> int:
+    """Microseconds since the epoch; naive datetimes are UTC (like datetime.utcnow)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1_000_000)
+
+
+class SearchPage:
+    """Pagination state filled in while a search walks the time range."""
+
+    def __init__(self):
+        self.next_cursor: Optional[str] = None
+
 
 class JaegerService:
     """Service for fetching traces from Jaeger."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        clients: Optional[HTTPClientRegistry] = None,
+        parse_pool: Optional[ParsePool] = None,
+        trace_index: Optional[TraceIndex] = None,
+    ):
         self.settings = get_settings()
+        self.clients = clients or get_http_clients()
+        self.parse_pool = parse_pool or get_parse_pool()
+        self.trace_index = trace_index or get_trace_index()
         self.base_url = self.settings.jaeger_base_url
         self.service_name = self.settings.jaeger_service_name
         self.timeout = self.settings.trace_fetch_timeout
+        self._single_flight = SingleFlight()
+        self.breaker = get_circuit_breaker("jaeger")
 
-    async def get_trace(self, trace_id: str) -> Optional[TraceResponse]:
+        # Completed traces are immutable: keep parsed ones, bounded by bytes
+        self._trace_cache: LRUCache = LRUCache(
+            maxsize=self.settings.trace_cache_max_bytes,
+            getsizeof=lambda entry: entry.size,
+        )
+
+    async def _get(self, url: str, query: str, **kwargs) -> httpx.Response:
         """
-        Fetch a single trace by trace ID.
+        GET from Jaeger through the shared circuit breaker.
+
+        Connection errors, timeouts and 5xx responses count as failures.
+        While the circuit is open, calls fail fast with CircuitOpenError.
 
         Args:
-            trace_id: The Jaeger trace ID
+            url: Jaeger API URL
+            query: Query kind for metrics (trace, search, services, operations)
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(self.breaker)
+
+        client = self.clients.get("jaeger")
+        start_time = time.perf_counter()
+        try:
+            response = await client.get(url, timeout=self.timeout, **kwargs)
+        except httpx.TransportError:
+            self._record_outcome(query, start_time, None)
+            raise
+        self._record_outcome(query, start_time, response.status_code)
+        return response
+
+    @asynccontextmanager
+    async def _stream(self, url: str, query: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """
+        Streaming GET from Jaeger through the shared circuit breaker.
+
+        Like _get, but the body is left unread for the caller to consume
+        incrementally. The outcome is recorded once the headers arrive.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(self.breaker)
+
+        client = self.clients.get("jaeger")
+        start_time = time.perf_counter()
+        recorded = False
+        try:
+            async with client.stream("GET", url, timeout=self.timeout, **kwargs) as response:
+                self._record_outcome(query, start_time, response.status_code)
+                recorded = True
+                yield response
+        except httpx.TransportError:
+            if not recorded:
+                self._record_outcome(query, start_time, None)
+            raise
+
+    def _record_outcome(self, query: str, start_time: float, status_code: Optional[int]):
+        """Update the circuit breaker and query metrics (status None: transport error)."""
+        failed = status_code is None or status_code >= 500
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        JAEGER_QUERY_DURATION.observe(
+            time.perf_counter() - start_time,
+            query=query,
+            outcome="error" if failed else "ok",
+        )
+
+    async def get_trace(
+        self, trace_id: str, critical_path: bool = False
+    ) -> Optional[TraceResponse]:
+        """
+        Fetch a single trace by trace ID or request ID.
+
+        IDs that are not Jaeger trace IDs, and trace IDs Jaeger does not
+        know, are looked up as request IDs in the local trace index.
+
+        Args:
+            trace_id: The Jaeger trace ID or a request ID
+            critical_path: Mark each step's self time and whether it is on
+                the critical path (on a copy; cached traces stay as parsed)
 
         Returns:
             TraceResponse or None if not found
         """
+        trace = await self._lookup_trace(trace_id) if _TRACE_ID.match(trace_id) else None
+        if trace is None:
+            resolved = await self.trace_index.find_trace_id(trace_id)
+            if resolved is not None and resolved != trace_id:
+                trace = await self._lookup_trace(resolved)
+        if trace is not None and critical_path:
+            trace = annotate_critical_path(trace)
+        return trace
+
+    async def _lookup_trace(self, trace_id: str) -> Optional[TraceResponse]:
+        """A trace from the cache, or fetched once for concurrent callers."""
+        cached = self._trace_cache.get(trace_id)
+        if cached is not None:
+            TRACE_CACHE.inc(result="hit")
+            return cached.trace
+        TRACE_CACHE.inc(result="miss")
+
+        # Concurrent requests for the same trace share one Jaeger fetch
+        return await self._single_flight.do(
+            ("get_trace", trace_id),
+            lambda: self._fetch_trace(trace_id),
+        )
+
+    async def _fetch_trace(self, trace_id: str) -> Optional[TraceResponse]:
+        """Fetch and parse a single trace from Jaeger (large ones in the parse pool)."""
         url = f"{self.base_url}/api/traces/{trace_id}"
         logger.info(f"Fetching trace: {trace_id}")
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                return self._parse_trace(data)
+            response = await self._get(url, "trace")
+            response.raise_for_status()
+            if self.parse_pool.offloads(len(response.content)):
+                trace = await self.parse_pool.run(
+                    parse_trace_json, response.content, self.service_name
+                )
+            else:
+                trace = self._parse_trace(response.json())
+            if trace is not None:
+                self.trace_index.add(trace)
+                self._cache_trace(trace_id, trace)
+            return trace
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 logger.warning(f"Trace not found: {trace_id}")
@@ -60,79 +248,401 @@ class JaegerService:
             logger.error(f"Error fetching trace {trace_id}: {e}")
             raise
 
+    def _cache_trace(self, trace_id: str, trace: TraceResponse):
+        """
+        Cache a parsed trace if it is complete.
+
+        Traces that ended less than trace_cache_min_age seconds ago may still
+        receive spans, so they are not cached. Entries are weighted by the
+        estimated memory of the parsed trace.
+        """
+        ended_at = trace.timestamp.timestamp() + trace.duration_ms / 1000
+        if time.time() - ended_at < self.settings.trace_cache_min_age:
+            return
+        size = estimate_trace_size(trace)
+        if size > self._trace_cache.maxsize:
+            logger.debug(f"Trace {trace_id} too large to cache ({size} bytes)")
+            return
+        self._trace_cache[trace_id] = CachedTrace(trace, size)
+
     async def search_traces(self, params: TraceSearchParams) -> TraceSearchResult:
         """
         Search for traces matching the given parameters.
 
+        Status and user filters are pushed down to Jaeger as tag queries
+        where possible. Whatever Jaeger cannot filter is applied here, and
+        the range is walked backwards in time (newest first) until limit
+        traces match or the fetch budget runs out, so sparse matches still
+        come back in one call. Pass next_cursor as params.cursor to
+        continue with older traces.
+
         Args:
             params: Search parameters
 
+        With view=summary, traces are reduced to TraceSummary without
+        building any TraceStep.
+
         Returns:
-            TraceSearchResult with matching traces
+            TraceSearchResult with matching traces, newest first
         """
-        url = f"{self.base_url}/api/traces"
+        page = SearchPage()
+        traces = [
+            trace async for trace in self._walk_search(params, self._converter(params), page)
+        ]
+        return TraceSearchResult(
+            total=len(traces),
+            traces=traces,
+            has_more=page.next_cursor is not None,
+            next_cursor=page.next_cursor,
+        )
 
-        # Build query parameters for Jaeger API
-        query_params = {
-            "service": self.service_name,
-            "limit": params.limit,
-        }
+    async def iter_search_traces(
+        self, params: TraceSearchParams, page: SearchPage
+    ) -> AsyncIterator[TraceResponse]:
+        """
+        Stream the traces of search_traces as Jaeger responses arrive.
 
-        # Time range
-        if params.end_time:
-            query_params["end"] = int(params.end_time.timestamp() * 1_000_000)
-        else:
-            query_params["end"] = int(datetime.utcnow().timestamp() * 1_000_000)
+        Each trace is yielded as soon as it is decoded and parsed, so memory
+        stays proportional to one trace. Once iteration ends, page holds the
+        cursor for the next page.
 
-        if params.start_time:
-            query_params["start"] = int(params.start_time.timestamp() * 1_000_000)
-        else:
-            # Default to last 1 hour
-            start = datetime.utcnow() - timedelta(hours=1)
-            query_params["start"] = int(start.timestamp() * 1_000_000)
+        Args:
+            params: Search parameters
+            page: Receives the cursor for the next page, if any
 
+        Yields:
+            TraceResponse, or TraceSummary for view=summary
+        """
+        async for trace in self._walk_search(params, self._converter(params), page, stream=True):
+            yield trace
+
+    def _converter(self, params: TraceSearchParams) -> Callable[[Dict[str, Any]], Any]:
+        """Conversion for raw search results, per the requested view."""
+        if params.view == TraceView.SUMMARY:
+            return partial(summarize_trace, service_name=self.service_name)
+        return partial(parse_trace, service_name=self.service_name)
+
+    def _search_query(self, params: TraceSearchParams) -> Tuple[Dict[str, Any], bool]:
+        """
+        Build the Jaeger search query for the filters it can evaluate.
+
+        FAILED maps to the error=true span tag and user_id to the user_id
+        tag; Jaeger matches a tag on any span of the trace, so results are
+        still filtered locally. Other statuses cannot be expressed as tags.
+
+        Returns:
+            Query parameters (without time range and limit), and whether
+            every filter was pushed down
+        """
+        query_params: Dict[str, Any] = {"service": self.service_name}
         if params.operation:
             query_params["operation"] = params.operation
 
-        logger.info(f"Searching traces with params: {query_params}")
+        tags = {}
+        pushed_down = True
+        if params.status == StepStatus.FAILED:
+            tags["error"] = "true"
+        elif params.status:
+            pushed_down = False
+        if params.user_id:
+            tags["user_id"] = params.user_id
+        if tags:
+            query_params["tags"] = json.dumps(tags)
+
+        return query_params, pushed_down
+
+    async def _fetch_search_batch(
+        self,
+        window: Dict[str, Any],
+        convert: Callable[[Dict[str, Any]], Any],
+        stream: bool,
+    ) -> AsyncIterator[Tuple[str, int, Any]]:
+        """
+        Yield the traces of one Jaeger search call, converted.
+
+        Buffered batches come newest first and are converted lazily, or
+        split across the parse pool when the response is large; streamed
+        ones come in Jaeger's order.
 
+        Yields:
+            (trace ID, start in microseconds, converted trace) tuples
+        """
+        url = f"{self.base_url}/api/traces"
+        logger.info(f"Searching traces with params: {window}")
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, params=query_params)
-                response.raise_for_status()
-                data = response.json()
-
-                traces = []
-                for trace_data in data.get("data", []):
-                    trace = self._parse_trace({"data": [trace_data]})
-                    if trace:
-                        # Filter by status if specified
-                        if params.status and trace.status != params.status:
-                            continue
-                        # Filter by user_id if specified
-                        if params.user_id and trace.user_id != params.user_id:
-                            continue
-                        traces.append(trace)
-
-                return TraceSearchResult(
-                    total=len(traces),
-                    traces=traces[:params.limit],
-                    has_more=len(traces) > params.limit,
-                )
+            if stream:
+                async with self._stream(url, "search", params=window) as response:
+                    response.raise_for_status()
+                    async for trace_data in iter_json_array(response.aiter_bytes(), "data"):
+                        yield (
+                            trace_data.get("traceID"),
+                            trace_start_us(trace_data),
+                            convert(trace_data),
+                        )
+                return
+
+            response = await self._get(url, "search", params=window)
+            response.raise_for_status()
+            pooled = self.parse_pool.offloads(len(response.content))
+            if pooled:
+                batch = await self._convert_in_pool(response.content, convert)
+            else:
+                raw = response.json().get("data") or []
         except Exception as e:
             logger.error(f"Error searching traces: {e}")
             raise
 
+        if pooled:
+            for item in batch:
+                yield item
+            return
+
+        raw.sort(key=trace_start_us, reverse=True)
+        for trace_data in raw:
+            yield trace_data.get("traceID"), trace_start_us(trace_data), convert(trace_data)
+
+    async def _convert_in_pool(
+        self, body: bytes, convert: Callable[[Dict[str, Any]], Any]
+    ) -> List[Tuple[str, int, Any]]:
+        """
+        Convert a search response in the pool workers, newest first.
+
+        The body is cut into per-trace JSON without decoding it, and each
+        worker gets every n-th trace, so every trace is decoded once and
+        large and small traces spread evenly. A body that cannot be cut is
+        converted whole by one worker.
+        """
+        traces = split_search_json(body)
+        if traces is None:
+            logger.warning("Unexpected Jaeger search response layout, converting it whole")
+            batch = await self.parse_pool.run(convert_search_json, body, convert)
+        else:
+            parts = min(self.parse_pool.workers, len(traces))
+            shares = await asyncio.gather(*(
+                self.parse_pool.run(convert_search_traces, traces[part::parts], convert)
+                for part in range(parts)
+            ))
+            batch = [item for share in shares for item in share]
+        batch.sort(key=itemgetter(1), reverse=True)
+        return batch
+
+    def _search_range(self, params: TraceSearchParams) -> Tuple[int, int]:
+        """
+        Search range [start, end] in microseconds, narrowed by the cursor.
+
+        Naive times are UTC, like query parameters without an offset and
+        the datetime.utcnow() ranges of the shortcut endpoints.
+        """
+        # Default to last 1 hour
+        end_time = params.end_time or datetime.utcnow()
+        start_time = params.start_time or datetime.utcnow() - timedelta(hours=1)
+        end = _epoch_us(end_time)
+        if params.cursor:
+            end = min(end, int(params.cursor))
+        return _epoch_us(start_time), end
+
+    def _matches(self, trace: Any, params: TraceSearchParams) -> bool:
+        """Apply the status and user filters to a parsed trace."""
+        if params.status and trace.status != params.status:
+            return False
+        if params.user_id and trace.user_id != params.user_id:
+            return False
+        return True
+
+    async def _walk_search(
+        self,
+        params: TraceSearchParams,
+        convert: Callable[[Dict[str, Any]], Any],
+        page: SearchPage,
+        stream: bool = False,
+    ) -> AsyncIterator[Any]:
+        """
+        Yield matching traces, newest first, walking back through the range.
+
+        Each Jaeger call asks for the traces still needed (times
+        trace_search_overfetch when a filter is applied only locally) and
+        the next window ends just before the oldest trace seen. The walk
+        stops at params.limit matches, when a short batch shows the range
+        is exhausted, or after trace_search_max_fetches calls.
+
+        In streaming mode each Jaeger response is decoded incrementally and
+        traces are yielded in arrival order, so only one raw trace is held
+        at a time. Batches cannot be sorted then, so over-fetching is off
+        (a batch never holds more matches than are still needed) and every
+        batch is consumed whole before the next window is chosen.
+
+        Args:
+            params: Search parameters
+            convert: Turns one raw Jaeger trace into a TraceResponse or
+                TraceSummary (None to skip it), and must be picklable for
+                the parse pool; every converted trace is also indexed
+            page: Receives the cursor for the next page, if any
+            stream: Decode Jaeger responses incrementally
+        """
+        query_params, pushed_down = self._search_query(params)
+        overfetch = 1 if pushed_down or stream else self.settings.trace_search_overfetch
+        start, end = self._search_range(params)
+
+        matched = 0
+        seen: Set[str] = set()
+        for _ in range(self.settings.trace_search_max_fetches):
+            if end <= start:
+                return
+            fetch = min((params.limit - matched) * overfetch, self.settings.trace_search_fetch_limit)
+            window = {**query_params, "start": start, "end": end, "limit": fetch}
+
+            consumed = 0
+            batch = self._fetch_search_batch(window, convert, stream)
+            async with aclosing(batch):
+                async for trace_id, trace_start, trace in batch:
+                    consumed += 1
+                    end = min(end, trace_start - 1)
+                    if trace_id in seen:
+                        continue
+                    seen.add(trace_id)
+
+                    if trace is None:
+                        continue
+                    self.trace_index.add(trace)
+                    if not self._matches(trace, params):
+                        continue
+                    matched += 1
+                    yield trace
+
+                    if matched >= params.limit:
+                        # Only a short batch that is fully consumed ends the range
+                        more = consumed >= fetch
+                        async for _ in batch:
+                            more = True
+                            break
+                        if more:
+                            page.next_cursor = str(end)
+                        return
+
+            if consumed < fetch:
+                return
+
+        # Budget exhausted with the range not fully searched
+        page.next_cursor = str(end)
+
+    async def fetch_span_columns(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        operation: Optional[str] = None,
+    ) -> Tuple[SpanColumns, bool]:
+        """
+        Fetch every trace in a time window as one columnar span table.
+
+        Walks the window backwards like search_traces, with up to
+        trace_search_max_fetches Jaeger calls of trace_search_fetch_limit
+        traces each. Large responses are converted in the parse pool. An
+        operation is passed to Jaeger to narrow the search, but Jaeger also
+        returns traces where only a child span has it, so those are dropped.
+
+        Args:
+            start_time: Window start (naive means UTC)
+            end_time: Window end (naive means UTC)
+            operation: Only traces whose root has this operation
+
+        Returns:
+            The span table, and whether the whole window was read (False
+            when the fetch budget ran out first)
+        """
+        query_params: Dict[str, Any] = {"service": self.service_name}
+        if operation:
+            query_params["operation"] = operation
+        start = _epoch_us(start_time)
+        end = _epoch_us(end_time)
+        fetch = self.settings.trace_search_fetch_limit
+
+        parts: List[SpanColumns] = []
+        seen: Set[str] = set()
+        for _ in range(self.settings.trace_search_max_fetches):
+            if end <= start:
+                return SpanColumns.concat(parts), True
+            window = {**query_params, "start": start, "end": end, "limit": fetch}
+
+            consumed = 0
+            async for trace_id, trace_start, columns in self._fetch_search_batch(
+                window, span_columns_from_trace, stream=False
+            ):
+                consumed += 1
+                end = min(end, trace_start - 1)
+                if columns is None or trace_id in seen:
+                    continue
+                seen.add(trace_id)
+                # Jaeger's operation filter matches any span; keep root matches
+                if operation and columns.operations[columns.root_operations()[0]] != operation:
+                    continue
+                parts.append(columns)
+
+            if consumed < fetch:
+                return SpanColumns.concat(parts), True
+
+        return SpanColumns.concat(parts), False
+
+    async def get_analytics(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        operation: Optional[str] = None,
+    ) -> TraceAnalytics:
+        """
+        Latency percentiles and failure rates over a time window.
+
+        Spans of every trace in the window are loaded into one columnar
+        table and aggregated in bulk: whole-request stats per root
+        operation, and span stats per step name. Concurrent requests for
+        the same window share one computation.
+
+        Args:
+            start_time: Window start
+            end_time: Window end
+            operation: Only traces whose root has this operation
+
+        Returns:
+            TraceAnalytics for the window
+        """
+        return await self._single_flight.do(
+            ("get_analytics", start_time, end_time, operation),
+            lambda: self._compute_analytics(start_time, end_time, operation),
+        )
+
+    async def _compute_analytics(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        operation: Optional[str],
+    ) -> TraceAnalytics:
+        """Fetch the window's spans and aggregate them."""
+        columns, complete = await self.fetch_span_columns(start_time, end_time, operation)
+        return TraceAnalytics(
+            start_time=start_time,
+            end_time=end_time,
+            traces=columns.trace_count,
+            spans=len(columns),
+            complete=complete,
+            operations=group_stats(
+                columns.root_operations(),
+                columns.trace_durations_us(),
+                columns.trace_failed(),
+                columns.operations,
+            ),
+            steps=group_stats(
+                columns.operation, columns.duration_us, columns.failed, columns.operations
+            ),
+        )
+
     async def get_services(self) -> List[str]:
         """Get list of available services in Jaeger."""
         url = f"{self.base_url}/api/services"
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                return data.get("data", [])
+            response = await self._get(url, "services")
+            response.raise_for_status()
+            data = response.json()
+            return data.get("data", [])
         except Exception as e:
             logger.error(f"Error fetching services: {e}")
             raise
@@ -140,14 +650,20 @@ class JaegerService:
     async def get_operations(self, service: Optional[str] = None) -> List[str]:
         """Get list of operations for a service."""
         service = service or self.service_name
+        return await self._single_flight.do(
+            ("get_operations", service),
+            lambda: self._fetch_operations(service),
+        )
+
+    async def _fetch_operations(self, service: str) -> List[str]:
+        """Fetch the operation names for a service from Jaeger."""
         url = f"{self.base_url}/api/services/{service}/operations"
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                return data.get("data", [])
+            response = await self._get(url, "operations")
+            response.raise_for_status()
+            data = response.json()
+            return data.get("data", [])
         except Exception as e:
             logger.error(f"Error fetching operations: {e}")
             raise
@@ -165,117 +681,4 @@ class JaegerService:
         data = jaeger_response.get("data", [])
         if not data:
             return None
-
-        trace_data = data[0]
-        trace_id = trace_data.get("traceID", "")
-        spans = trace_data.get("spans", [])
-
-        if not spans:
-            return None
-
-        # Find root span
-        root_span = self._find_root_span(spans)
-        if not root_span:
-            root_span = spans[0]
-
-        # Extract request_id from tags if available
-        request_id = self._extract_tag(root_span, "request_id") or trace_id
-
-        # Extract user_id from tags
-        user_id = self._extract_tag(root_span, "user_id") or self._extract_tag(root_span, "user")
-
-        # Parse all spans into steps
-        steps = self._parse_spans_to_steps(spans, trace_data.get("processes", {}))
-
-        # Calculate overall status
-        overall_status = StepStatus.OK
-        for step in steps:
-            if step.status == StepStatus.FAILED:
-                overall_status = StepStatus.FAILED
-                break
-
-        # Calculate total duration
-        start_time = min(s.start_time for s in steps) if steps else datetime.utcnow()
-        end_time = max(s.end_time for s in steps if s.end_time) if steps else start_time
-        duration_ms = int((end_time - start_time).total_seconds() * 1000)
-
-        return TraceResponse(
-            request_id=request_id,
-            trace_id=trace_id,
-            timestamp=start_time,
-            status=overall_status,
-            user_id=user_id,
-            duration_ms=duration_ms,
-            steps=steps,
-            service=self.service_name,
-            operation=root_span.get("operationName"),
-        )
-
-    def _find_root_span(self, spans: List[Dict]) -> Optional[Dict]:
-        """Find the root span (no parent references)."""
-        span_ids = {s["spanID"] for s in spans}
-        for span in spans:
-            refs = span.get("references", [])
-            if not refs:
-                return span
-            # Check if parent is in this trace
-            parent_refs = [r for r in refs if r.get("refType") == "CHILD_OF"]
-            if not parent_refs or parent_refs[0].get("spanID") not in span_ids:
-                return span
-        return None
-
-    def _parse_spans_to_steps(
-        self,
-        spans: List[Dict],
-        processes: Dict[str, Any]
-    ) -> List[TraceStep]:
-        """Convert Jaeger spans to TraceStep objects."""
-        steps = []
-
-        # Sort spans by start time
-        sorted_spans = sorted(spans, key=lambda s: s.get("startTime", 0))
-
-        for span in sorted_spans:
-            start_time = datetime.fromtimestamp(span.get("startTime", 0) / 1_000_000)
-            duration_us = span.get("duration", 0)
-            end_time = datetime.fromtimestamp(
-                (span.get("startTime", 0) + duration_us) / 1_000_000
-            )
-
-            # Determine status from tags
-            status = StepStatus.OK
-            error_msg = None
-
-            tags = {t["key"]: t["value"] for t in span.get("tags", [])}
-            if tags.get("error") == True or tags.get("otel.status_code") == "ERROR":
-                status = StepStatus.FAILED
-                error_msg = tags.get("otel.status_description") or tags.get("error.message")
-
-            # Extract logs for error details
-            logs = span.get("logs", [])
-            for log in logs:
-                log_fields = {f["key"]: f["value"] for f in log.get("fields", [])}
-                if "error" in log_fields or "exception" in log_fields:
-                    status = StepStatus.FAILED
-                    error_msg = error_msg or log_fields.get("message") or log_fields.get("error")
-
-            steps.append(TraceStep(
-                name=span.get("operationName", "unknown"),
-                status=status,
-                start_time=start_time,
-                end_time=end_time,
-                duration_ms=duration_us // 1000,
-                error=error_msg,
-                data=tags,
-                span_id=span.get("spanID"),
-            ))
-
-        return steps
-
-    def _extract_tag(self, span: Dict, tag_name: str) -> Optional[str]:
-        """Extract a tag value from a span."""
-        tags = span.get("tags", [])
-        for tag in tags:
-            if tag.get("key") == tag_name:
-                return str(tag.get("value"))
-        return None
+        return parse_trace(data[0], self.service_name)
@@ -0,0 +1,87 @@
+"""
+JSON Streaming
+
+Incremental decoding of the array inside a streamed JSON response, so a
+large Jaeger result can be converted one element at a time instead of
+being loaded whole with response.json().
+"""
+
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator
+
+_DECODER = json.JSONDecoder()
+_SEPARATOR = re.compile(r"[\s,]*")
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes], key: str) -> AsyncIterator[Any]:
+    """
+    Yield the elements of the array under a top-level key as they arrive.
+
+    The key must appear before any nested occurrence of the same name,
+    which holds for Jaeger's {"data": [...], "total": ...} envelope.
+    Memory is bounded by the largest element plus one chunk. An element
+    that is still incomplete is retried only once its pending text has
+    doubled, so a large element costs amortized linear decode time.
+
+    Args:
+        chunks: Response body chunks (e.g. httpx Response.aiter_bytes())
+        key: Name of the top-level key holding the array
+
+    Raises:
+        ValueError: If the body ends before the array is closed
+    """
+    opening = re.compile(r'"%s"\s*:\s*(\[|null)' % re.escape(key))
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    in_array = False
+    retry_len = 0
+
+    iterator = chunks.__aiter__()
+    finished = False
+    while not finished:
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            chunk, finished = b"", True
+        buf += text.decode(chunk, final=finished)
+        if not in_array:
+            match = opening.search(buf)
+            if match is None:
+                continue
+            if match.group(1) == "null":
+                return
+            in_array = True
+            buf = buf[match.end():]
+            pos = 0
+        if len(buf) < retry_len and not finished:
+            continue
+
+        while True:
+            pos = _SEPARATOR.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = _DECODER.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                end = None
+            # A number at the very end of the buffer may continue in the next chunk
+            incomplete = end is None or (
+                end == len(buf) and not finished and not isinstance(item, (dict, list, str))
+            )
+            if incomplete:
+                retry_len = 2 * (len(buf) - pos)
+                break
+            retry_len = 0
+            yield item
+            pos = end
+
+        buf = buf[pos:]
+        pos = 0
+
+    if in_array:
+        raise ValueError(f"Truncated JSON: array under {key!r} not closed")
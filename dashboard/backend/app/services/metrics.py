@@ -0,0 +1,208 @@
+"""
+Metrics
+
+Minimal Prometheus-compatible counters, gauges and histograms for the
+/metrics endpoint. Updates are plain dict/list operations on the event
+loop thread, so the hot path takes no locks.
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Latency buckets in seconds, from fast local hops to slow SSO round-trips
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a {name="value",...} label set."""
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value (integers without a trailing .0)."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """Base class for a named metric family with fixed label names."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Label values in label-name order."""
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        """Exposition lines for the metric's samples."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Full exposition block including HELP and TYPE."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        """Increase the counter for a label set."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str):
+        """Set the gauge for a label set."""
+        self._values[self._key(labels)] = value
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        """Record one observation for a label set."""
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = ([0] * (len(self.buckets) + 1), [0.0])
+            self._values[key] = entry
+        counts, total = entry
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric to the registry."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+# Global registry and the dashboard's metrics
+REGISTRY = MetricsRegistry()
+
+PROBE_LATENCY = REGISTRY.register(Histogram(
+    "dashboard_probe_latency_seconds",
+    "Upstream health probe latency.",
+    ["upstream"],
+))
+PROBE_PHASE = REGISTRY.register(Histogram(
+    "dashboard_probe_phase_seconds",
+    "Upstream health probe latency by connection phase.",
+    ["upstream", "phase"],
+))
+PROBES = REGISTRY.register(Counter(
+    "dashboard_probes_total",
+    "Upstream health probes by resulting status.",
+    ["upstream", "status"],
+))
+UPSTREAM_STATUS = REGISTRY.register(Gauge(
+    "dashboard_upstream_status",
+    "Current upstream health status (1 for the current status, 0 otherwise).",
+    ["upstream", "status"],
+))
+JAEGER_QUERY_DURATION = REGISTRY.register(Histogram(
+    "dashboard_jaeger_query_duration_seconds",
+    "Jaeger query API request duration.",
+    ["query", "outcome"],
+))
+PASSPORT_LOGINS = REGISTRY.register(Counter(
+    "dashboard_passport_logins_total",
+    "3DPassport login attempts.",
+    ["result"],
+))
+PASSPORT_SESSION_CACHE = REGISTRY.register(Counter(
+    "dashboard_passport_session_cache_total",
+    "3DPassport session cache lookups.",
+    ["result"],
+))
+TRACE_CACHE = REGISTRY.register(Counter(
+    "dashboard_trace_cache_total",
+    "Parsed trace cache lookups.",
+    ["result"],
+))
@@ -5,6 +5,9 @@ Integrates with the Dassault Systemes MLI (Machine Learning Interface) service
 to check health status.
 """
 
+import asyncio
+import base64
+import json
 import logging
 import time
 from typing import Optional, Dict, Any
@@ -13,6 +16,8 @@ import httpx
 
 from ..config import get_settings
 from ..models.health import ServiceHealth, ServiceStatus
+from .http_clients import HTTPClientRegistry, get_http_clients
+from .probe_timing import probe_extensions
 
 logger = logging.getLogger(__name__)
 
@@ -20,17 +25,23 @@ logger = logging.getLogger(__name__)
 class MLIService:
     """Service for checking MLI health status."""
 
-    def __init__(self):
+    def __init__(self, clients: Optional[HTTPClientRegistry] = None):
         self.settings = get_settings()
+        self.clients = clients or get_http_clients()
         self.base_url = self.settings.mli_base_url
         self.timeout = self.settings.health_check_timeout
 
+        # Cached auth token (expiry on the monotonic clock)
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+
     async def check_health(self) -> ServiceHealth:
         """
         Check MLI service health.
 
         The MLI health check requires:
-        1. Get auth token from /auth/token
+        1. Get auth token from /auth/token (cached until shortly before expiry)
         2. Call /health with Bearer token
 
         If we get a 302 redirect, the server is reachable but requires
@@ -39,13 +50,13 @@ class MLIService:
         Returns:
             ServiceHealth with current status
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
             # Step 1: Try to get auth token (or check reachability)
             token, auth_required = await self._get_auth_token()
 
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = int((time.perf_counter() - start_time) * 1000)
 
             # If we got a redirect, server is reachable but requires auth
             if auth_required:
@@ -65,7 +76,7 @@ class MLIService:
             # Step 2: Check health endpoint
             health_data = await self._call_health_endpoint(token)
 
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = int((time.perf_counter() - start_time) * 1000)
 
             if health_data:
                 return ServiceHealth(
@@ -81,12 +92,13 @@ class MLIService:
                 )
 
         except httpx.TimeoutException:
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = int((time.perf_counter() - start_time) * 1000)
             logger.warning(f"MLI health check timed out after {latency_ms}ms")
             return ServiceHealth(
                 status=ServiceStatus.DEGRADED,
                 latency_ms=latency_ms,
                 message="Health check timed out",
+                timed_out=True,
             )
         except httpx.ConnectError as e:
             logger.error(f"MLI connection error: {e}")
@@ -101,55 +113,148 @@ class MLIService:
                 message=f"Health check failed: {str(e)}",
             )
 
-    async def _get_auth_token(self) -> tuple[Optional[str], bool]:
+    async def _get_auth_token(self, force_refresh: bool = False) -> tuple[Optional[str], bool]:
         """
-        Get authentication token from MLI.
+        Get a cached authentication token, fetching a new one when needed.
+
+        The token is reused until shortly before it expires. Only one refresh
+        runs at a time; concurrent callers wait for it and share the result.
+
+        Args:
+            force_refresh: Ignore the cached token and fetch a new one
 
         Returns:
             Tuple of (token, auth_required):
             - token: Bearer token string or None if failed
             - auth_required: True if server returned 302 (requires SSO auth)
         """
+        if not force_refresh and self._token_is_fresh():
+            return self._token, False
+
+        async with self._token_lock:
+            # Another caller may have refreshed while we waited for the lock
+            if not force_refresh and self._token_is_fresh():
+                return self._token, False
+
+            token, auth_required, expires_in = await self._request_auth_token()
+            if token:
+                ttl = self._token_ttl(token, expires_in)
+                self._token = token
+                self._token_expires_at = time.monotonic() + ttl
+                logger.debug(f"Cached MLI auth token for {int(ttl)}s")
+            return token, auth_required
+
+    def _token_is_fresh(self) -> bool:
+        """Whether the cached token is valid beyond the refresh margin."""
+        if not self._token:
+            return False
+        margin = self.settings.mli_token_refresh_margin
+        return time.monotonic() < self._token_expires_at - margin
+
+    def _invalidate_token(self, token: Optional[str]):
+        """Drop the cached token if it is the one that was rejected."""
+        if token and token == self._token:
+            logger.info("MLI rejected cached auth token, invalidating")
+            self._token = None
+            self._token_expires_at = 0.0
+
+    def _token_ttl(self, token: str, expires_in: Optional[float]) -> float:
+        """
+        Determine how long a token stays valid, in seconds.
+
+        Uses the token response's expires_in, then the JWT exp claim, then
+        the configured default.
+        """
+        if expires_in:
+            return float(expires_in)
+
+        exp = _jwt_exp(token)
+        if exp:
+            return max(0.0, exp - time.time())
+
+        return float(self.settings.mli_token_default_ttl)
+
+    async def _request_auth_token(self) -> tuple[Optional[str], bool, Optional[float]]:
+        """
+        Request a new authentication token from MLI.
+
+        Returns:
+            Tuple of (token, auth_required, expires_in):
+            - token: Bearer token string or None if failed
+            - auth_required: True if server returned 302 (requires SSO auth)
+            - expires_in: Token lifetime in seconds, if the server sent one
+        """
         url = f"{self.base_url}/auth/token"
         logger.debug(f"Getting MLI auth token from {url}")
 
         try:
-            # Don't follow redirects - 302 means requires SSO auth
-            async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=False) as client:
-                response = await client.get(
-                    url,
-                    headers={"accept": "application/json"},
-                )
+            # Pooled client doesn't follow redirects - 302 means requires SSO auth
+            client = self.clients.get("mli")
+            response = await client.get(
+                url,
+                headers={"accept": "application/json"},
+                timeout=self.timeout,
+                extensions=probe_extensions(),
+            )
 
-                # Check for redirect (SSO auth required)
-                if response.status_code in (301, 302, 303, 307, 308):
-                    logger.debug("MLI requires SSO authentication (redirect)")
-                    return None, True
+            # Check for redirect (SSO auth required)
+            if response.status_code in (301, 302, 303, 307, 308):
+                logger.debug("MLI requires SSO authentication (redirect)")
+                return None, True, None
 
-                response.raise_for_status()
-                data = response.json()
+            response.raise_for_status()
+            data = response.json()
 
-                # Token might be in different fields depending on API version
-                token = (
-                    data.get("access_token") or
-                    data.get("token") or
-                    data.get("data", {}).get("token")
-                )
+            # If response is just the token string
+            if isinstance(data, str):
+                return data, False, None
 
-                if token:
-                    logger.debug("Successfully obtained MLI auth token")
-                    return token, False
+            # Token might be in different fields depending on API version
+            token = (
+                data.get("access_token") or
+                data.get("token") or
+                data.get("data", {}).get("token")
+            )
 
-                # If response is just the token string
-                if isinstance(data, str):
-                    return data, False
+            if token:
+                logger.debug("Successfully obtained MLI auth token")
+                return token, False, data.get("expires_in")
 
-                logger.warning(f"Unexpected token response format: {data}")
-                return None, False
+            logger.warning(f"Unexpected token response format: {data}")
+            return None, False, None
 
         except Exception as e:
             logger.error(f"Failed to get MLI auth token: {e}")
-            return None, False
+            return None, False, None
+
+    async def _authorized_get(self, url: str, token: str) -> httpx.Response:
+        """
+        GET a URL with a Bearer token.
+
+        If MLI answers 401 the cached token is invalidated and the request
+        is retried once with a fresh token.
+        """
+        client = self.clients.get("mli")
+        for attempt in range(2):
+            response = await client.get(
+                url,
+                headers={
+                    "accept": "application/json",
+                    "Authorization": f"Bearer {token}",
+                },
+                timeout=self.timeout,
+                extensions=probe_extensions(),
+            )
+            if response.status_code != 401 or attempt:
+                break
+
+            self._invalidate_token(token)
+            fresh_token, _ = await self._get_auth_token()
+            if not fresh_token:
+                break
+            token = fresh_token
+
+        return response
 
     async def _call_health_endpoint(self, token: str) -> Optional[Dict[str, Any]]:
         """
@@ -165,16 +270,9 @@ class MLIService:
         logger.debug(f"Checking MLI health at {url}")
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        "accept": "application/json",
-                        "Authorization": f"Bearer {token}",
-                    },
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self._authorized_get(url, token)
+            response.raise_for_status()
+            return response.json()
 
         except httpx.HTTPStatusError as e:
             logger.error(f"MLI health check HTTP error: {e.response.status_code}")
@@ -204,16 +302,29 @@ class MLIService:
         url = f"{self.base_url}/models"
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        "accept": "application/json",
-                        "Authorization": f"Bearer {token}",
-                    },
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self._authorized_get(url, token)
+            response.raise_for_status()
+            return response.json()
         except Exception as e:
             logger.error(f"Failed to get MLI models: {e}")
             return {"error": str(e)}
+
+
+def _jwt_exp(token: str) -> Optional[float]:
+    """
+    Read the exp claim from a JWT without verifying it.
+
+    Returns:
+        Expiry as a Unix timestamp, or None if the token is not a JWT
+    """
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        exp = claims.get("exp")
+        return float(exp) if exp is not None else None
+    except (ValueError, TypeError, AttributeError):
+        return None
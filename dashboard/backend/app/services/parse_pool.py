@@ -0,0 +1,104 @@
+"""
+Parse Pool
+
+Process pool for CPU-heavy trace parsing, so large Jaeger responses do not
+block the event loop (and health polling) while they are converted. Jobs
+receive raw response bytes; responses below a size threshold are parsed
+inline, where process hand-off would cost more than it saves.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ParsePool:
+    """Optional process pool for trace parsing."""
+
+    def __init__(self, workers: Optional[int] = None, inline_bytes: Optional[int] = None):
+        """
+        Initialize the pool (processes start with start()).
+
+        Args:
+            workers: Worker processes (defaults to settings; 0 disables the pool)
+            inline_bytes: Response size below which parsing stays inline
+        """
+        settings = get_settings()
+        self.workers = settings.trace_parse_workers if workers is None else workers
+        self.inline_bytes = (
+            settings.trace_parse_inline_bytes if inline_bytes is None else inline_bytes
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def offloads(self, size: int) -> bool:
+        """Whether a response of size bytes should be parsed in the pool."""
+        return self._executor is not None and size >= self.inline_bytes
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a module-level function in a worker process.
+
+        Arguments and results are pickled. If the pool broke (e.g. a worker
+        was killed), it is restarted and this call runs in a thread
+        instead, off the event loop.
+        """
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            self._restart(executor)
+            return await asyncio.to_thread(func, *args)
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """
+        Replace a broken executor once.
+
+        Every job of a broken pool fails at the same time; only the first
+        to get here restarts it. The others find a new executor in place
+        and must not shut it down, which would cancel other callers' jobs.
+        """
+        if self._executor is not broken:
+            return
+        logger.error("Trace parse pool broken, restarting it")
+        self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    def start(self):
+        """Create the worker pool (workers are spawned on first use)."""
+        if self.workers <= 0:
+            logger.info("Trace parse pool disabled, parsing inline")
+            return
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"Trace parse pool with {self.workers} workers")
+
+    def stop(self):
+        """Shut the pool down without waiting for running jobs."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global pool instance
+_parse_pool: Optional[ParsePool] = None
+
+
+def get_parse_pool() -> ParsePool:
+    """Get the shared trace parse pool."""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ParsePool()
+    return _parse_pool
@@ -12,6 +12,8 @@ from urllib.parse import quote_plus
 import httpx
 from cachetools import TTLCache
 
+from .metrics import PASSPORT_LOGINS, PASSPORT_SESSION_CACHE
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,19 +52,24 @@ class PassportAuthService:
         # Check cache for existing session
         if cache_key in self._session_cache:
             logger.debug(f"Using cached session for {username}")
+            PASSPORT_SESSION_CACHE.inc(result="hit")
             return self._session_cache[cache_key], True
 
         # If no credentials provided, return unauthenticated client
+        # (not a cache miss: anonymous sessions are never cached)
         if not username or not password:
             return httpx.AsyncClient(timeout=30, follow_redirects=False), False
+        PASSPORT_SESSION_CACHE.inc(result="miss")
 
         # Authenticate and cache
         try:
             client = await self._authenticate(aiai_url, username, password)
             self._session_cache[cache_key] = client
+            PASSPORT_LOGINS.inc(result="success")
             return client, True
         except Exception as e:
             logger.error(f"Authentication failed: {e}")
+            PASSPORT_LOGINS.inc(result="failure")
             return httpx.AsyncClient(timeout=30, follow_redirects=False), False
 
     async def _authenticate(
@@ -0,0 +1,101 @@
+"""
+Probe Timing
+
+Breaks upstream probe latency into connection phases (connect, TLS,
+time-to-first-byte, body) using httpx/httpcore request trace events and
+the monotonic clock.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+# Timing phases, as (name, start event, end event)
+PHASES = (
+    ("connect_ms", "connect_tcp.started", "connect_tcp.complete"),  # includes DNS
+    ("tls_ms", "start_tls.started", "start_tls.complete"),
+    ("ttfb_ms", "send_request_headers.started", "receive_response_headers.complete"),
+    ("body_ms", "receive_response_headers.complete", "receive_response_body.complete"),
+)
+PHASE_NAMES = tuple(name for name, _, _ in PHASES)
+
+
+class ProbeTimer:
+    """
+    Collects trace event timestamps for the requests made by one probe.
+
+    Phases describe the probe's last request. A probe that makes several
+    (MLI fetches a token, then calls /health) would otherwise mix the
+    connect and TLS events of one request with the TTFB of another.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._events: Dict[str, float] = {}
+
+    def start_request(self):
+        """Forget the events of earlier requests; a new one is about to be sent."""
+        self._events = {}
+
+    async def trace(self, event_name: str, info: Dict[str, Any]):
+        """httpcore trace callback; keeps the latest time of each event."""
+        # Drop the "connection." / "http11." / "http2." prefix
+        self._events[event_name.split(".", 1)[-1]] = time.perf_counter()
+
+    def elapsed_ms(self) -> int:
+        """Milliseconds since the timer started."""
+        return int((time.perf_counter() - self.started_at) * 1000)
+
+    def phases(self) -> Optional[Dict[str, Any]]:
+        """
+        Phase durations in milliseconds.
+
+        Phases are those of the last request; total_ms covers the whole
+        probe. Connection phases are only present when that request opened
+        a new connection; connect_ms includes DNS resolution, which
+        httpcore does not report separately.
+
+        Returns:
+            Dict of phase durations, or None if no request was traced
+        """
+        if not self._events:
+            return None
+
+        timing: Dict[str, Any] = {}
+        for name, start, end in PHASES:
+            # A phase that raised ends with ".failed" instead of ".complete"
+            end_at = self._events.get(end) or self._events.get(end.replace(".complete", ".failed"))
+            if start in self._events and end_at is not None:
+                timing[name] = round((end_at - self._events[start]) * 1000, 1)
+        timing["connection_reused"] = "connect_tcp.started" not in self._events
+        timing["total_ms"] = round((time.perf_counter() - self.started_at) * 1000, 1)
+        return timing
+
+
+_current_timer: ContextVar[Optional[ProbeTimer]] = ContextVar("probe_timer", default=None)
+
+
+@contextmanager
+def probe_timer() -> Iterator[ProbeTimer]:
+    """Time the upstream requests made inside this block (including subtasks)."""
+    timer = ProbeTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+def probe_extensions() -> Dict[str, Any]:
+    """
+    httpx request extensions reporting to the current probe timer, if any.
+
+    Call once per request, right before sending it: the timer starts
+    over, so its phases belong to the last request made.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        return {}
+    timer.start_request()
+    return {"trace": timer.trace}
@@ -0,0 +1,54 @@
+"""
+Single-Flight Request Coalescing
+
+Lets concurrent callers asking for the same thing share one in-flight
+upstream call instead of each issuing their own.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run func once for all concurrent callers using the same key.
+
+        Args:
+            key: Identifies the call, e.g. ("get_trace", trace_id)
+            func: Zero-argument coroutine function performing the call
+
+        Returns:
+            The result of func, shared by every caller waiting on the key
+
+        Raises:
+            Whatever func raises, re-raised in every waiting caller
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            logger.debug(f"Joining in-flight call for {key}")
+
+        # Shield so one caller cancelling does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        """Drop a finished call so the next caller starts a fresh one."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,231 @@
+"""
+Span Columns
+
+Struct-of-arrays representation of the spans of many traces: NumPy
+arrays for start time, duration, failure, interned operation and service
+IDs and parent indices. Cross-trace statistics become vectorized array
+operations instead of Python loops over span dicts.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .trace_parser import find_root_span, resolve_parents, span_failure
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class SpanColumns:
+    """
+    Spans of a set of traces as parallel arrays, one row per span.
+
+    Rows are grouped by trace: trace i owns rows
+    trace_offsets[i]:trace_offsets[i + 1]. Operation and service columns
+    index into the operations and services tables.
+    """
+    trace_ids: List[str]
+    trace_offsets: np.ndarray  # int64, len(trace_ids) + 1
+    start_us: np.ndarray  # int64
+    duration_us: np.ndarray  # int64
+    failed: np.ndarray  # bool
+    operation: np.ndarray  # int32 into operations
+    service: np.ndarray  # int32 into services
+    parent: np.ndarray  # int32 row of the parent span, -1 for roots
+    root: np.ndarray  # bool, the one root span of each trace
+    operations: List[str]
+    services: List[str]
+
+    def __len__(self) -> int:
+        return len(self.start_us)
+
+    @property
+    def trace_count(self) -> int:
+        """Number of traces."""
+        return len(self.trace_ids)
+
+    @classmethod
+    def empty(cls) -> "SpanColumns":
+        """A table without spans."""
+        return cls(
+            trace_ids=[],
+            trace_offsets=np.zeros(1, dtype=np.int64),
+            start_us=np.zeros(0, dtype=np.int64),
+            duration_us=np.zeros(0, dtype=np.int64),
+            failed=np.zeros(0, dtype=bool),
+            operation=np.zeros(0, dtype=np.int32),
+            service=np.zeros(0, dtype=np.int32),
+            parent=np.zeros(0, dtype=np.int32),
+            root=np.zeros(0, dtype=bool),
+            operations=[],
+            services=[],
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence["SpanColumns"]) -> "SpanColumns":
+        """
+        Combine tables, merging their operation and service tables.
+
+        Each part's interned IDs are remapped with one array lookup and
+        parent rows are shifted by the part's row offset.
+        """
+        parts = [p for p in parts if p.trace_count]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+
+        operations: Dict[str, int] = {}
+        services: Dict[str, int] = {}
+        operation_cols, service_cols, parent_cols, offsets = [], [], [], [np.zeros(1, np.int64)]
+        row = 0
+        for part in parts:
+            op_map = np.array(
+                [operations.setdefault(name, len(operations)) for name in part.operations],
+                dtype=np.int32,
+            )
+            svc_map = np.array(
+                [services.setdefault(name, len(services)) for name in part.services],
+                dtype=np.int32,
+            )
+            operation_cols.append(op_map[part.operation])
+            service_cols.append(svc_map[part.service])
+            parent_cols.append(np.where(part.parent >= 0, part.parent + row, -1).astype(np.int32))
+            offsets.append(part.trace_offsets[1:] + row)
+            row += len(part)
+
+        return cls(
+            trace_ids=[trace_id for part in parts for trace_id in part.trace_ids],
+            trace_offsets=np.concatenate(offsets),
+            start_us=np.concatenate([p.start_us for p in parts]),
+            duration_us=np.concatenate([p.duration_us for p in parts]),
+            failed=np.concatenate([p.failed for p in parts]),
+            operation=np.concatenate(operation_cols),
+            service=np.concatenate(service_cols),
+            parent=np.concatenate(parent_cols),
+            root=np.concatenate([p.root for p in parts]),
+            operations=list(operations),
+            services=list(services),
+        )
+
+    def trace_index(self) -> np.ndarray:
+        """Trace number of every row."""
+        return np.repeat(
+            np.arange(self.trace_count, dtype=np.int32), np.diff(self.trace_offsets)
+        )
+
+    def trace_durations_us(self) -> np.ndarray:
+        """Per trace: latest span end minus earliest span start."""
+        if not self.trace_count:
+            return np.zeros(0, dtype=np.int64)
+        starts = self.trace_offsets[:-1]
+        first = np.minimum.reduceat(self.start_us, starts)
+        last = np.maximum.reduceat(self.start_us + self.duration_us, starts)
+        return last - first
+
+    def trace_failed(self) -> np.ndarray:
+        """Per trace: whether any span failed."""
+        if not self.trace_count:
+            return np.zeros(0, dtype=bool)
+        return np.logical_or.reduceat(self.failed, self.trace_offsets[:-1])
+
+    def root_operations(self) -> np.ndarray:
+        """Per trace: operation ID of the root span."""
+        return self.operation[self.root]
+
+
+def span_columns_from_trace(trace_data: Dict[str, Any]) -> Optional[SpanColumns]:
+    """
+    Convert one raw Jaeger trace into a single-trace SpanColumns.
+
+    Uses the same parent resolution, root choice and failure rules as the
+    trace parser. Module level so it can run in the parse pool.
+    """
+    spans = trace_data.get("spans") or []
+    if not spans:
+        return None
+
+    parents = resolve_parents(spans)
+    root_id = (find_root_span(spans, parents) or spans[0])["spanID"]
+    processes = trace_data.get("processes") or {}
+    rows = {span["spanID"]: row for row, span in enumerate(spans)}
+
+    operations: Dict[str, int] = {}
+    services: Dict[str, int] = {}
+    operation = []
+    service = []
+    parent = []
+    for span in spans:
+        name = span.get("operationName", "unknown")
+        operation.append(operations.setdefault(name, len(operations)))
+        process = processes.get(span.get("processID")) or {}
+        name = process.get("serviceName", "unknown")
+        service.append(services.setdefault(name, len(services)))
+        parent_id = parents.get(span["spanID"])
+        parent.append(-1 if parent_id is None else rows[parent_id])
+
+    count = len(spans)
+    root = np.zeros(count, dtype=bool)
+    root[rows[root_id]] = True
+    return SpanColumns(
+        trace_ids=[trace_data.get("traceID", "")],
+        trace_offsets=np.array([0, count], dtype=np.int64),
+        start_us=np.fromiter((s.get("startTime", 0) for s in spans), np.int64, count),
+        duration_us=np.fromiter((s.get("duration", 0) for s in spans), np.int64, count),
+        failed=np.fromiter((span_failure(s)[0] for s in spans), bool, count),
+        operation=np.array(operation, dtype=np.int32),
+        service=np.array(service, dtype=np.int32),
+        parent=np.array(parent, dtype=np.int32),
+        root=root,
+        operations=list(operations),
+        services=list(services),
+    )
+
+
+def group_stats(
+    keys: np.ndarray,
+    durations_us: np.ndarray,
+    failed: np.ndarray,
+    names: Sequence[str],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Count, failure rate and duration percentiles per group.
+
+    Rows are sorted by key once and split into groups, so the cost is one
+    sort plus a vectorized percentile per group.
+
+    Args:
+        keys: Group ID of every row (index into names)
+        durations_us: Duration of every row in microseconds
+        failed: Failure flag of every row
+        names: Group names by ID
+
+    Returns:
+        Stats by group name, largest groups first
+    """
+    if not len(keys):
+        return {}
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    durations_ms = durations_us[order] / 1000.0
+    failed = failed[order]
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+    starts = np.concatenate(([0], bounds))
+    counts = np.diff(np.concatenate((starts, [len(keys)])))
+    failures = np.add.reduceat(failed.astype(np.int64), starts)
+
+    stats = {}
+    for key, start, count, failure_count in zip(keys[starts], starts, counts, failures):
+        p50, p95, p99 = np.percentile(durations_ms[start:start + count], PERCENTILES)
+        stats[names[key]] = {
+            "count": int(count),
+            "failures": int(failure_count),
+            "failure_rate": round(int(failure_count) / int(count), 4),
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+            "p99_ms": round(float(p99), 1),
+        }
+    return dict(sorted(stats.items(), key=lambda item: -item[1]["count"]))
+
@@ -0,0 +1,307 @@
+"""
+Trace Index Service
+
+Local SQLite index (WAL mode) from request ID, conversation ID, user,
+operation, status and error fingerprint to trace IDs and start times.
+Every trace the backend parses is recorded, so lookups by these keys are
+indexed point queries instead of Jaeger time-window scans. Entries older
+than the retention are pruned. All SQLite work runs in a worker thread.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple, Union
+
+from ..config import get_settings
+from ..models.traces import StepStatus, TraceIndexEntry, TraceResponse, TraceSummary
+
+logger = logging.getLogger(__name__)
+
+# Lookup keys, each backed by a (key, ts) index
+INDEXED_KEYS = (
+    "request_id",
+    "conversation_id",
+    "user_id",
+    "operation",
+    "status",
+    "error_fingerprint",
+)
+
+_COLUMNS = (
+    "trace_id",
+    "ts",
+    "request_id",
+    "conversation_id",
+    "user_id",
+    "operation",
+    "status",
+    "duration_ms",
+    "error_fingerprint",
+    "error",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS traces (
+    trace_id TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    request_id TEXT NOT NULL,
+    conversation_id TEXT,
+    user_id TEXT,
+    operation TEXT,
+    status TEXT NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    error_fingerprint TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS traces_ts ON traces (ts);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS traces_{key} ON traces ({key}, ts);\n"
+    for key in INDEXED_KEYS
+)
+
+# IDs, hex strings and numbers (also with units, as in 3000ms) that differ
+# between occurrences of one error
+_VOLATILE = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+    r"|\b(?:0x)?[0-9a-f]*\d[0-9a-f]*\b"
+    r"|\d+(?:\.\d+)?",
+    re.IGNORECASE,
+)
+
+
+def error_fingerprint(step: Optional[str], error: Optional[str]) -> str:
+    """
+    Stable identifier for a kind of failure.
+
+    Hashes the failed step name and its error message with IDs and numbers
+    masked, so repeats of one error share a fingerprint.
+    """
+    normalized = _VOLATILE.sub("#", error or "")
+    return hashlib.sha1(f"{step}\n{normalized}".encode()).hexdigest()[:16]
+
+
+def _index_row(trace: Union[TraceResponse, TraceSummary]) -> Tuple:
+    """Index row for a parsed trace or summary (in _COLUMNS order)."""
+    if isinstance(trace, TraceSummary):
+        failed_step, error = trace.failed_step, trace.error
+    else:
+        failed = next((s for s in trace.steps if s.status == StepStatus.FAILED), None)
+        failed_step, error = (failed.name, failed.error) if failed else (None, None)
+    fingerprint = None
+    if trace.status == StepStatus.FAILED:
+        fingerprint = error_fingerprint(failed_step, error)
+    return (
+        trace.trace_id,
+        # Parsed timestamps are aware UTC, so this is the Unix time
+        trace.timestamp.timestamp(),
+        trace.request_id,
+        trace.conversation_id,
+        trace.user_id,
+        trace.operation,
+        trace.status.value,
+        trace.duration_ms,
+        fingerprint,
+        error,
+    )
+
+
+def _index_entry(row: Tuple) -> TraceIndexEntry:
+    """TraceIndexEntry for a row read in _COLUMNS order."""
+    values = dict(zip(_COLUMNS, row))
+    values["timestamp"] = datetime.fromtimestamp(values.pop("ts"), tz=timezone.utc)
+    return TraceIndexEntry(**values)
+
+
+class TraceIndex:
+    """SQLite index of trace keys to trace IDs."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the index.
+
+        Args:
+            path: SQLite database path (defaults to settings; empty disables)
+        """
+        settings = get_settings()
+        self.path = settings.trace_index_path if path is None else path
+        self.flush_interval = settings.trace_index_flush_interval
+        self.retention = settings.trace_index_retention
+
+        self._pending: Dict[str, Tuple] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a database path is configured."""
+        return bool(self.path)
+
+    def add(self, trace: Union[TraceResponse, TraceSummary]):
+        """Queue a parsed trace or summary for the next flush (once opened)."""
+        if self._conn is None:
+            return
+        self._pending[trace.trace_id] = _index_row(trace)
+
+    async def flush(self):
+        """Write queued entries and prune expired ones."""
+        if self._conn is None:
+            return
+        rows, self._pending = list(self._pending.values()), {}
+        await asyncio.to_thread(self._flush_sync, rows, time.time())
+
+    async def lookup(
+        self,
+        filters: Dict[str, str],
+        limit: int,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[TraceIndexEntry]:
+        """
+        Find indexed traces matching all filters, newest first.
+
+        Queued entries are flushed first, so traces parsed moments ago are
+        found too.
+
+        Args:
+            filters: Values by key (from INDEXED_KEYS); at least one
+            limit: Maximum number of traces
+            start: Only traces that started at or after (Unix seconds)
+            end: Only traces that started before (Unix seconds)
+
+        Returns:
+            Matching index entries
+        """
+        unknown = set(filters) - set(INDEXED_KEYS)
+        if unknown or not filters:
+            raise ValueError(f"Lookup needs keys from {INDEXED_KEYS}, got {sorted(filters)}")
+        if self._conn is None:
+            return []
+        if self._pending:
+            await self.flush()
+
+        rows = await asyncio.to_thread(self._lookup_sync, filters, limit, start, end)
+        return [_index_entry(row) for row in rows]
+
+    async def find_trace_id(self, request_id: str) -> Optional[str]:
+        """Trace ID of the latest trace with a request ID, if indexed."""
+        entries = await self.lookup({"request_id": request_id}, 1)
+        return entries[0].trace_id if entries else None
+
+    def _open_sync(self):
+        """Open the database and create the schema."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        self._conn = conn
+
+    def _close_sync(self, conn: sqlite3.Connection):
+        """Close the connection once no flush or lookup is using it."""
+        with self._lock:
+            conn.close()
+
+    def _flush_sync(self, rows: List[Tuple], now: float):
+        """Upsert entries and delete those past the retention."""
+        with self._lock:
+            conn = self._conn
+            if conn is None:
+                return
+            with conn:
+                if rows:
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO traces ({', '.join(_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                        rows,
+                    )
+                conn.execute("DELETE FROM traces WHERE ts < ?", (now - self.retention,))
+
+    def _lookup_sync(
+        self,
+        filters: Dict[str, str],
+        limit: int,
+        start: Optional[float],
+        end: Optional[float],
+    ) -> List[Tuple]:
+        """Read matching rows (keys are validated by lookup)."""
+        clauses = [f"{key} = ?" for key in filters]
+        args: List = list(filters.values())
+        if start is not None:
+            clauses.append("ts >= ?")
+            args.append(start)
+        if end is not None:
+            clauses.append("ts < ?")
+            args.append(end)
+        with self._lock:
+            if self._conn is None:
+                return []
+            return self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM traces "
+                f"WHERE {' AND '.join(clauses)} ORDER BY ts DESC LIMIT ?",
+                (*args, limit),
+            ).fetchall()
+
+    async def _flush_loop(self):
+        """Flush every interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Trace index flush failed: {e}")
+
+    async def start(self):
+        """Open the database and start periodic flushing."""
+        if not self.enabled:
+            logger.info("Trace index disabled")
+            return
+        try:
+            await asyncio.to_thread(self._open_sync)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Could not open trace index {self.path}, index disabled: {e}")
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Trace index in {self.path}")
+
+    async def stop(self):
+        """Stop flushing, write remaining entries and close the database."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+
+        if self._conn is not None:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Final trace index flush failed: {e}")
+            # New calls see no connection; running ones finish before the close
+            conn, self._conn = self._conn, None
+            await asyncio.to_thread(self._close_sync, conn)
+
+
+# Global index instance
+_trace_index: Optional[TraceIndex] = None
+
+
+def get_trace_index() -> TraceIndex:
+    """Get the shared trace index."""
+    global _trace_index
+    if _trace_index is None:
+        _trace_index = TraceIndex()
+    return _trace_index
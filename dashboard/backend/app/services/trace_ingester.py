@@ -0,0 +1,99 @@
+"""
+Trace Ingester Service
+
+Keeps the local trace index current: every interval, searches Jaeger for
+traces that started since the previous run and indexes their summaries,
+so lookups also find traces nobody has opened through the dashboard.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from ..config import get_settings
+from ..models.traces import TraceSearchParams, TraceView
+from .jaeger_service import JaegerService
+
+logger = logging.getLogger(__name__)
+
+# Jaeger search pages (of 100 traces) per run; the oldest traces of a
+# busier window are left to on-demand indexing
+MAX_PAGES = 20
+
+
+class TraceIngester:
+    """Background indexing of new Jaeger traces."""
+
+    def __init__(self, jaeger_service: JaegerService, interval: Optional[int] = None):
+        """
+        Initialize the ingester.
+
+        Args:
+            jaeger_service: Service used to search Jaeger (it indexes what it parses)
+            interval: Seconds between runs (0 disables ingestion)
+        """
+        settings = get_settings()
+        self.jaeger_service = jaeger_service
+        self.interval = settings.trace_index_ingest_interval if interval is None else interval
+        self._since: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def ingest(self) -> int:
+        """
+        Index the summaries of traces that started since the previous run.
+
+        Windows overlap by one interval because spans reach Jaeger late;
+        re-indexing a trace just replaces its entry. The first run covers
+        the last hour.
+
+        Returns:
+            Number of traces indexed
+        """
+        # Naive UTC, like the search range defaults
+        now = datetime.utcnow()
+        since = self._since or now - timedelta(hours=1)
+        params = TraceSearchParams(
+            start_time=since, end_time=now, limit=100, view=TraceView.SUMMARY
+        )
+
+        indexed = 0
+        for _ in range(MAX_PAGES):
+            result = await self.jaeger_service.search_traces(params)
+            indexed += result.total
+            if not result.has_more:
+                break
+            params = params.model_copy(update={"cursor": result.next_cursor})
+        self._since = now - timedelta(seconds=self.interval)
+        return indexed
+
+    async def _ingest_loop(self):
+        """Ingest every interval until cancelled."""
+        while True:
+            try:
+                indexed = await self.ingest()
+                logger.debug(f"Indexed {indexed} traces")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Trace ingestion failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start background ingestion."""
+        if self.interval <= 0 or not self.jaeger_service.trace_index.enabled:
+            logger.info("Background trace ingestion disabled")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._ingest_loop())
+            logger.info(f"Background trace ingestion every {self.interval}s")
+
+    async def stop(self):
+        """Stop background ingestion."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
@@ -0,0 +1,381 @@
+"""
+Trace Parser
+
+Converts Jaeger trace JSON into TraceResponse and TraceSummary models
+with timezone-aware UTC timestamps. Spans are walked once in start-time
+order into plain step dicts, and the whole trace is validated in a
+single pydantic-core call; with pydantic 2 that is cheaper than per-step
+model_construct, which loops in Python. The functions hold no service
+state, so they can also run in worker processes.
+"""
+
+import gc
+import json
+import re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..models.traces import StepStatus, TraceResponse, TraceSummary
+
+_OK = StepStatus.OK
+_FAILED = StepStatus.FAILED
+_UTC = timezone.utc
+
+# Byte markers of Jaeger's compact search JSON (see split_search_json)
+_TRACE_OPEN = b'{"traceID":"'
+_SPANS_KEY = b'","spans":'
+_TRACE_ID_RUN = re.compile(rb"[0-9a-fA-F]*")
+_DATA_END = b'],"total":'
+
+
+def _start_of(span: Dict[str, Any]) -> int:
+    """Span start time in microseconds."""
+    return span.get("startTime", 0)
+
+
+def trace_start_us(trace_data: Dict[str, Any]) -> int:
+    """Start of a raw Jaeger trace (its earliest span) in microseconds."""
+    return min((_start_of(s) for s in trace_data.get("spans") or ()), default=0)
+
+
+def parse_trace_json(body: bytes, service_name: str) -> Optional[TraceResponse]:
+    """
+    Parse a Jaeger /api/traces/{id} response body.
+
+    Entry point for worker processes, which receive the raw bytes.
+    """
+    data = json.loads(body).get("data") or []
+    return parse_trace(data[0], service_name) if data else None
+
+
+def split_search_json(body: bytes) -> Optional[List[bytes]]:
+    """
+    Cut a Jaeger search response body into the JSON of each trace.
+
+    Only scans bytes, nothing is decoded, so each pool worker can be sent
+    just its own traces to decode. Relies on Jaeger's compact encoding,
+    where every trace object starts with {"traceID":"...","spans": (spans
+    have spanID as their second key, and string values cannot hold an
+    unescaped quote) and the data array is followed by "total".
+
+    Returns:
+        The traces' JSON in response order, or None if the body does not
+        have that layout
+    """
+    starts = []
+    pos = body.find(_SPANS_KEY)
+    while pos >= 0:
+        start = body.rfind(_TRACE_OPEN, 0, pos)
+        if start < 0 or not _TRACE_ID_RUN.fullmatch(body, start + len(_TRACE_OPEN), pos):
+            return None
+        starts.append(start)
+        pos = body.find(_SPANS_KEY, pos + len(_SPANS_KEY))
+
+    end = body.rfind(_DATA_END)
+    if not starts or end < starts[-1]:
+        return None
+    bounds = starts + [end]
+    traces = [body[a:b].rstrip(b",") for a, b in zip(bounds, bounds[1:])]
+    if not all(trace.endswith(b"}") for trace in traces):
+        return None
+    return traces
+
+
+def convert_search_traces(
+    traces: List[bytes], convert: Callable[[Dict[str, Any]], Any]
+) -> List[Tuple[str, int, Any]]:
+    """
+    Decode and convert traces cut out by split_search_json.
+
+    Entry point for worker processes, each of which gets a share of the
+    traces of one search response.
+
+    Returns:
+        (trace ID, start in microseconds, converted trace) tuples
+    """
+    converted = []
+    for raw in traces:
+        trace_data = json.loads(raw)
+        converted.append(
+            (trace_data.get("traceID"), trace_start_us(trace_data), convert(trace_data))
+        )
+    return converted
+
+
+def convert_search_json(
+    body: bytes, convert: Callable[[Dict[str, Any]], Any]
+) -> List[Tuple[str, int, Any]]:
+    """
+    Decode and convert every trace in a Jaeger search response body.
+
+    Entry point for a worker process when the body cannot be split.
+
+    Returns:
+        (trace ID, start in microseconds, converted trace) tuples
+    """
+    data = json.loads(body).get("data") or []
+    return [
+        (trace_data.get("traceID"), trace_start_us(trace_data), convert(trace_data))
+        for trace_data in data
+    ]
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Pause cyclic garbage collection.
+
+    Parsing allocates a few containers per span and frees none of them,
+    so on large traces the collector repeatedly rescans the whole input
+    and output for cycles that cannot exist. Reference counting still
+    frees memory as usual.
+    """
+    if not gc.isenabled():
+        yield
+        return
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def parse_trace(trace_data: Dict[str, Any], service_name: str) -> Optional[TraceResponse]:
+    """
+    Parse one Jaeger trace into a TraceResponse.
+
+    Args:
+        trace_data: One element of a Jaeger response's data array
+        service_name: Service name reported on the trace
+
+    Returns:
+        Parsed TraceResponse, or None if the trace has no spans
+    """
+    spans = trace_data.get("spans") or []
+    if not spans:
+        return None
+    with _gc_paused():
+        return _parse_spans(spans, trace_data.get("traceID", ""), service_name)
+
+
+def _parse_spans(
+    spans: List[Dict[str, Any]], trace_id: str, service_name: str
+) -> TraceResponse:
+    """Build the TraceResponse for a non-empty span list (see parse_trace)."""
+    # Link spans to their parents, then find the root span
+    parents = resolve_parents(spans)
+    root_span = find_root_span(spans, parents) or spans[0]
+    root_id = root_span.get("spanID")
+
+    ordered = sorted(spans, key=_start_of)
+    trace_start = _start_of(ordered[0])
+    trace_end = trace_start
+    fromtimestamp = datetime.fromtimestamp
+
+    steps: List[Dict[str, Any]] = []
+    root_tags: Dict[str, Any] = {}
+    overall_status = _OK
+    for span in ordered:
+        start = span.get("startTime", 0)
+        duration_us = span.get("duration", 0)
+        end = start + duration_us
+        if end > trace_end:
+            trace_end = end
+
+        # Determine status from tags
+        status = _OK
+        error_msg = None
+        tags = {t["key"]: t["value"] for t in span.get("tags", ())}
+        if tags.get("error") == True or tags.get("otel.status_code") == "ERROR":
+            status = _FAILED
+            error_msg = tags.get("otel.status_description") or tags.get("error.message")
+
+        # Extract logs for error details
+        for log in span.get("logs", ()):
+            log_fields = {f["key"]: f["value"] for f in log.get("fields", ())}
+            if "error" in log_fields or "exception" in log_fields:
+                status = _FAILED
+                error_msg = error_msg or log_fields.get("message") or log_fields.get("error")
+
+        if status is _FAILED:
+            overall_status = _FAILED
+        span_id = span.get("spanID")
+        if span_id == root_id:
+            root_tags = tags
+
+        steps.append({
+            "name": span.get("operationName", "unknown"),
+            "status": status,
+            "start_time": fromtimestamp(start / 1_000_000, _UTC),
+            "end_time": fromtimestamp(end / 1_000_000, _UTC),
+            "duration_ms": duration_us // 1000,
+            "error": error_msg,
+            "data": tags,
+            "span_id": span_id,
+            "parent_span_id": parents.get(span_id),
+        })
+
+    return TraceResponse.model_validate({
+        "request_id": _tag_str(root_tags, "request_id") or trace_id,
+        "trace_id": trace_id,
+        "timestamp": fromtimestamp(trace_start / 1_000_000, _UTC),
+        "status": overall_status,
+        "user_id": _tag_str(root_tags, "user_id") or _tag_str(root_tags, "user"),
+        "conversation_id": _tag_str(root_tags, "conversation_id"),
+        "duration_ms": (trace_end - trace_start) // 1000,
+        "steps": steps,
+        "service": service_name,
+        "operation": root_span.get("operationName"),
+    })
+
+
+def summarize_trace(trace_data: Dict[str, Any], service_name: str) -> Optional[TraceSummary]:
+    """
+    Reduce one Jaeger trace to a TraceSummary.
+
+    Reads root tags and scans spans once for time bounds and the first
+    failure, without building tag dicts or TraceStep objects. Status,
+    root span and error match what parse_trace would produce.
+
+    Args:
+        trace_data: One element of a Jaeger response's data array
+        service_name: Service name reported on the trace
+
+    Returns:
+        TraceSummary, or None if the trace has no spans
+    """
+    spans = trace_data.get("spans") or []
+    if not spans:
+        return None
+    trace_id = trace_data.get("traceID", "")
+
+    # Spans without references are roots; resolve links only for orphans
+    unreferenced = [s for s in spans if not s.get("references")]
+    if unreferenced:
+        root_span = min(unreferenced, key=_start_of)
+    else:
+        root_span = find_root_span(spans, resolve_parents(spans)) or spans[0]
+
+    start_us = end_us = _start_of(spans[0])
+    failed_span = None
+    failed_error = None
+    for span in spans:
+        span_start = span.get("startTime", 0)
+        span_end = span_start + span.get("duration", 0)
+        if span_start < start_us:
+            start_us = span_start
+        if span_end > end_us:
+            end_us = span_end
+        if failed_span is not None and span_start >= _start_of(failed_span):
+            continue
+        failed, error = span_failure(span)
+        if failed:
+            failed_span, failed_error = span, error
+
+    return TraceSummary(
+        request_id=extract_tag(root_span, "request_id") or trace_id,
+        trace_id=trace_id,
+        timestamp=datetime.fromtimestamp(start_us / 1_000_000, _UTC),
+        status=_FAILED if failed_span is not None else _OK,
+        user_id=extract_tag(root_span, "user_id") or extract_tag(root_span, "user"),
+        conversation_id=extract_tag(root_span, "conversation_id"),
+        duration_ms=(end_us - start_us) // 1000,
+        service=service_name,
+        operation=root_span.get("operationName"),
+        span_count=len(spans),
+        failed_step=failed_span.get("operationName", "unknown") if failed_span else None,
+        error=failed_error,
+    )
+
+
+def span_failure(span: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    """Whether a span failed and its error message, as parse_trace decides."""
+    failed = False
+    description = None
+    message = None
+    for tag in span.get("tags", ()):
+        key = tag.get("key")
+        value = tag.get("value")
+        if (key == "error" and value == True) or (key == "otel.status_code" and value == "ERROR"):
+            failed = True
+        elif key == "otel.status_description":
+            description = value
+        elif key == "error.message":
+            message = value
+    error_msg = (description or message) if failed else None
+
+    for log in span.get("logs", ()):
+        log_fields = {f["key"]: f["value"] for f in log.get("fields", ())}
+        if "error" in log_fields or "exception" in log_fields:
+            failed = True
+            error_msg = error_msg or log_fields.get("message") or log_fields.get("error")
+    return failed, error_msg
+
+
+def resolve_parents(spans: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """
+    Map each span ID to its parent span ID within the trace.
+
+    Uses one span ID index, so this is O(n). CHILD_OF references win
+    over FOLLOWS_FROM; spans whose parent is not in the trace (orphans)
+    become roots, and reference cycles are broken so the result is
+    always a forest.
+    """
+    span_ids = {s["spanID"] for s in spans}
+    parents: Dict[str, Optional[str]] = {}
+    for span in spans:
+        parent = None
+        for ref in span.get("references", ()):
+            ref_id = ref.get("spanID")
+            if ref_id not in span_ids or ref_id == span["spanID"]:
+                continue
+            if ref.get("refType") == "CHILD_OF":
+                parent = ref_id
+                break
+            if parent is None:
+                parent = ref_id
+        parents[span["spanID"]] = parent
+
+    # Break cycles: walk up from each span, stopping at spans seen on an
+    # earlier walk, so every span is visited once
+    visited: Dict[str, int] = {}
+    for walk, span_id in enumerate(parents):
+        node = span_id
+        while node is not None and node not in visited:
+            visited[node] = walk
+            node = parents[node]
+        if node is not None and visited[node] == walk:
+            parents[node] = None
+
+    return parents
+
+
+def find_root_span(
+    spans: List[Dict[str, Any]],
+    parents: Dict[str, Optional[str]],
+) -> Optional[Dict[str, Any]]:
+    """
+    Find the root span.
+
+    Prefers spans without any references over orphans whose parent is
+    missing; among several roots the earliest one wins.
+    """
+    roots = [s for s in spans if parents.get(s["spanID"]) is None]
+    if not roots:
+        return None
+    return min(roots, key=lambda s: (bool(s.get("references")), _start_of(s)))
+
+
+def extract_tag(span: Dict[str, Any], tag_name: str) -> Optional[str]:
+    """Extract a tag value from a span."""
+    for tag in span.get("tags", ()):
+        if tag.get("key") == tag_name:
+            return str(tag.get("value"))
+    return None
+
+
+def _tag_str(tags: Dict[str, Any], tag_name: str) -> Optional[str]:
+    """A tag value from an already built tag dict, as a string."""
+    value = tags.get(tag_name)
+    return None if value is None else str(value)
@@ -0,0 +1,60 @@
+"""Shared pytest fixtures."""
+
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.config import get_settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.jaeger_service import JaegerService
+from app.services.parse_pool import ParsePool
+from app.services.trace_index import TraceIndex
+
+from .jaeger_payloads import FakeJaeger
+
+
+@pytest.fixture
+def anyio_backend():
+    """Run async tests (marked anyio) on asyncio, like the app."""
+    return "asyncio"
+
+
+@pytest.fixture
+def non_utc_host(monkeypatch):
+    """Run with the process in a timezone far from UTC."""
+    monkeypatch.setenv("TZ", "America/Los_Angeles")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture
+def jaeger():
+    """Fake Jaeger query API; tests fill in its traces."""
+    return FakeJaeger()
+
+
+@pytest.fixture
+async def jaeger_service(jaeger):
+    """
+    JaegerService talking to the fake Jaeger, with default search
+    settings, a fresh circuit breaker, inline parsing and no trace index.
+    """
+    client = httpx.AsyncClient(transport=httpx.MockTransport(jaeger.handler))
+    service = JaegerService(
+        clients=SimpleNamespace(get=lambda upstream: client),
+        parse_pool=ParsePool(workers=0),
+        trace_index=TraceIndex(path=""),
+    )
+    defaults = {
+        name: field.default
+        for name, field in type(service.settings).model_fields.items()
+        if name.startswith(("trace_search_", "trace_cache_"))
+    }
+    service.settings = get_settings().model_copy(update=defaults)
+    service.breaker = CircuitBreaker("jaeger", 5, 30, 300)
+    yield service
+    await client.aclose()
@@ -0,0 +1,149 @@
+"""
+Synthetic Jaeger Payloads
+
+Builders for Jaeger API trace JSON shaped like agent requests, and a fake
+Jaeger query API serving them, shared by the parser benchmarks and the
+Jaeger service tests.
+"""
+
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.services.trace_parser import trace_start_us
+
+OPERATIONS = ("classifier", "llm_call", "mcp_tool", "retrieval", "guardrail")
+
+
+def make_trace(span_count: int, seed: int = 0, start_us: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build a Jaeger trace shaped like an agent request.
+
+    Spans hang off random earlier spans (mostly CHILD_OF, some
+    FOLLOWS_FROM), every 20th span fails, and spans are shuffled the way
+    Jaeger returns them.
+
+    Args:
+        span_count: Number of spans, including the root
+        seed: Seed for the span layout; also used for the trace ID
+        start_us: Root start in microseconds (defaults to an hour ago)
+    """
+    rnd = random.Random(seed)
+    trace_id = f"{seed:032x}"
+    if start_us is None:
+        start_us = int((time.time() - 3600) * 1_000_000)
+    spans = [{
+        "traceID": trace_id,
+        "spanID": "0" * 16,
+        "operationName": "POST /submit",
+        "references": [],
+        "startTime": start_us,
+        "duration": 30_000_000,
+        "processID": "p1",
+        "tags": [
+            {"key": "request_id", "type": "string", "value": f"req-{seed}"},
+            {"key": "user_id", "type": "string", "value": "user-1"},
+            {"key": "http.method", "type": "string", "value": "POST"},
+        ],
+        "logs": [],
+    }]
+    for i in range(1, span_count):
+        parent = spans[rnd.randrange(len(spans))]
+        offset = rnd.randint(0, max(1, parent["duration"] // 2))
+        tags = [
+            {"key": "component", "type": "string", "value": "aiai"},
+            {"key": "otel.library.name", "type": "string", "value": "opentelemetry"},
+            {"key": "span.kind", "type": "string", "value": "internal"},
+        ]
+        if i % 20 == 0:
+            tags.append({"key": "error", "type": "bool", "value": True})
+            tags.append({"key": "otel.status_description", "type": "string", "value": "timeout"})
+        spans.append({
+            "traceID": trace_id,
+            "spanID": f"{i:016x}",
+            "operationName": rnd.choice(OPERATIONS),
+            "references": [{
+                "refType": "CHILD_OF" if rnd.random() < 0.9 else "FOLLOWS_FROM",
+                "traceID": trace_id,
+                "spanID": parent["spanID"],
+            }],
+            "startTime": parent["startTime"] + offset,
+            "duration": rnd.randint(1, max(2, parent["duration"] - offset)),
+            "processID": "p1",
+            "tags": tags,
+            "logs": [],
+        })
+    rnd.shuffle(spans)
+    return {"traceID": trace_id, "spans": spans, "processes": {"p1": {"serviceName": "aiai"}}}
+
+
+def search_response(traces: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Jaeger /api/traces envelope around raw traces."""
+    return {"data": traces, "total": len(traces), "limit": 0, "offset": 0, "errors": None}
+
+
+def mark_failed(trace: Dict[str, Any], message: str = "boom") -> Dict[str, Any]:
+    """Add an error tag to a trace's root span (its first unreferenced span)."""
+    root = next(s for s in trace["spans"] if not s["references"])
+    root["tags"].append({"key": "error", "type": "bool", "value": True})
+    root["tags"].append({"key": "otel.status_description", "type": "string", "value": message})
+    return trace
+
+
+def _has_tags(trace: Dict[str, Any], tags: Dict[str, str]) -> bool:
+    """Whether every tag matches on some span, the way Jaeger filters."""
+    values = {
+        (tag["key"], str(tag["value"]).lower())
+        for span in trace["spans"]
+        for tag in span["tags"]
+    }
+    return all((key, value.lower()) in values for key, value in tags.items())
+
+
+class FakeJaeger:
+    """
+    Jaeger query API over a list of raw traces, for httpx.MockTransport.
+
+    Searches return the newest traces in [start, end] matching the service,
+    operation and tags, up to limit, in shuffled order like Jaeger does.
+    Every search's query parameters are recorded.
+    """
+
+    def __init__(self, traces: Optional[List[Dict[str, Any]]] = None):
+        self.traces = traces or []
+        self.searches: List[Dict[str, str]] = []
+        self.error_status: Optional[int] = None
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        """Answer one Jaeger API request."""
+        if self.error_status is not None:
+            return httpx.Response(self.error_status, json={"errors": ["unavailable"]})
+        path = request.url.path
+        if path == "/api/traces":
+            return self._search(dict(request.url.params))
+
+        trace_id = path.rsplit("/", 1)[-1]
+        found = [t for t in self.traces if t["traceID"] == trace_id]
+        if not found:
+            return httpx.Response(404, json={"data": None, "errors": [{"code": 404}]})
+        return httpx.Response(200, json=search_response(found))
+
+    def _search(self, query: Dict[str, str]) -> httpx.Response:
+        self.searches.append(query)
+        start, end = int(query["start"]), int(query["end"])
+        tags = json.loads(query.get("tags", "{}"))
+        operation = query.get("operation")
+        found = [
+            trace for trace in self.traces
+            if start <= trace_start_us(trace) <= end
+            and _has_tags(trace, tags)
+            and (operation is None
+                 or any(s["operationName"] == operation for s in trace["spans"]))
+        ]
+        found.sort(key=trace_start_us, reverse=True)
+        batch = found[:int(query["limit"])]
+        random.Random(len(self.searches)).shuffle(batch)
+        return httpx.Response(200, json=search_response(batch))
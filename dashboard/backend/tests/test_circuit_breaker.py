@@ -0,0 +1,112 @@
+"""Tests for the per-upstream circuit breaker."""
+
+import pytest
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+class FakeClock:
+    """Monotonic clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("jaeger", failure_threshold=3, backoff_base=10, backoff_max=40)
+
+
+def _fail(breaker: CircuitBreaker, times: int):
+    for _ in range(times):
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    _fail(breaker, 2)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+
+def test_success_resets_failure_count(breaker):
+    _fail(breaker, 2)
+    breaker.record_success()
+    _fail(breaker, 2)
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_lets_one_probe_through(breaker, clock):
+    _fail(breaker, 3)
+    clock.now += 9.9
+    assert not breaker.allow_request()
+    assert breaker.retry_in == pytest.approx(0.1)
+
+    clock.now += 0.1
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow_request()
+
+
+def test_stuck_probe_is_replaced_after_base_backoff(breaker, clock):
+    _fail(breaker, 3)
+    clock.now += 10
+    assert breaker.allow_request()
+    clock.now += 10.1
+    assert breaker.allow_request()
+
+
+def test_successful_probe_closes(breaker, clock):
+    _fail(breaker, 3)
+    clock.now += 10
+    breaker.allow_request()
+    breaker.record_success()
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failures == 0
+    assert breaker.allow_request()
+
+
+def test_failed_probes_double_backoff_up_to_max(breaker, clock):
+    _fail(breaker, 3)
+    for expected in (20, 40, 40):
+        clock.now += breaker.retry_in
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.retry_in == pytest.approx(expected)
+
+
+def test_backoff_restarts_at_base_after_closing(breaker, clock):
+    _fail(breaker, 3)
+    clock.now += 10
+    breaker.allow_request()
+    breaker.record_failure()
+    clock.now += 20
+    breaker.allow_request()
+    breaker.record_success()
+
+    _fail(breaker, 3)
+    assert breaker.retry_in == pytest.approx(10)
+
+
+def test_open_error_reports_retry_time(breaker):
+    _fail(breaker, 3)
+    error = CircuitOpenError(breaker)
+    assert error.breaker is breaker
+    assert "retry in 10s" in str(error)
+    assert breaker.snapshot() == {"state": "open", "failures": 3, "retry_in_s": 10.0}
@@ -0,0 +1,106 @@
+"""Tests for self time and critical path annotation."""
+
+from typing import Dict, List, Optional, Tuple
+
+from app.services.critical_path import annotate_critical_path
+from app.services.trace_parser import parse_trace
+
+BASE_US = 1_700_000_000_000_000
+
+# name: (parent, start ms, end ms)
+Layout = Dict[str, Tuple[Optional[str], int, int]]
+
+
+def _trace(layout: Layout):
+    """Parsed trace whose span IDs are the step names."""
+    spans = [
+        {
+            "traceID": "t1",
+            "spanID": name,
+            "operationName": name,
+            "references": [{"refType": "CHILD_OF", "spanID": parent}] if parent else [],
+            "startTime": BASE_US + start * 1000,
+            "duration": (end - start) * 1000,
+            "tags": [],
+            "logs": [],
+        }
+        for name, (parent, start, end) in layout.items()
+    ]
+    return parse_trace({"traceID": "t1", "spans": spans}, "aiai")
+
+
+def _annotated(layout: Layout):
+    steps = annotate_critical_path(_trace(layout)).steps
+    return {s.name: (s.self_time_ms, s.on_critical_path) for s in steps}
+
+
+def _path(layout: Layout) -> List[str]:
+    return sorted(name for name, (_, on_path) in _annotated(layout).items() if on_path)
+
+
+def test_sequential_children_are_all_on_the_path():
+    result = _annotated({
+        "root": (None, 0, 100),
+        "a": ("root", 0, 40),
+        "b": ("root", 50, 100),
+    })
+    assert result == {"root": (10, True), "a": (40, True), "b": (50, True)}
+
+
+def test_parallel_child_that_finished_earlier_is_off_the_path():
+    result = _annotated({
+        "root": (None, 0, 100),
+        "a": ("root", 10, 90),
+        "b": ("root", 20, 50),
+    })
+    assert result == {"root": (20, True), "a": (80, True), "b": (30, False)}
+
+
+def test_path_descends_into_grandchildren():
+    assert _path({
+        "root": (None, 0, 100),
+        "llm": ("root", 0, 58),
+        "tool": ("root", 60, 100),
+        "fetch": ("tool", 65, 80),
+        "parse": ("tool", 82, 95),
+        "retry": ("tool", 66, 70),
+    }) == ["fetch", "llm", "parse", "root", "tool"]
+
+
+def test_children_are_clipped_to_their_parent():
+    result = _annotated({
+        "root": (None, 0, 50),
+        "late": ("root", 10, 80),
+    })
+    assert result == {"root": (10, True), "late": (40, True)}
+
+
+def test_overlapping_children_count_once_in_self_time():
+    result = _annotated({
+        "root": (None, 0, 100),
+        "a": ("root", 10, 60),
+        "b": ("root", 30, 70),
+        "c": ("root", 80, 90),
+    })
+    assert result["root"] == (30, True)
+
+
+def test_original_trace_is_not_changed():
+    trace = _trace({"root": (None, 0, 10), "a": ("root", 0, 5)})
+
+    annotated = annotate_critical_path(trace)
+
+    assert annotated is not trace
+    assert all(s.self_time_ms is None and s.on_critical_path is None for s in trace.steps)
+
+
+def test_deep_chain_does_not_recurse():
+    depth = 5000
+    layout: Layout = {"s0": (None, 0, 2 * depth)}
+    for i in range(1, depth):
+        layout[f"s{i}"] = (f"s{i - 1}", i, 2 * depth - i)
+
+    result = _annotated(layout)
+
+    assert all(on_path for _, on_path in result.values())
+    assert result[f"s{depth - 1}"][0] == 2
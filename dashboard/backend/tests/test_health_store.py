@@ -0,0 +1,129 @@
+"""Tests for the SQLite health store and its rollups."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.health import ServiceHealth, ServiceStatus
+from app.services import health_store
+from app.services.health_store import HealthStore
+
+pytestmark = pytest.mark.anyio
+
+# An hour boundary, so bucket starts are easy to read
+BASE = 1_700_002_800
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = SimpleNamespace(now=float(BASE))
+    monkeypatch.setattr(health_store, "time", SimpleNamespace(time=lambda: fake.now))
+    return fake
+
+
+@pytest.fixture
+async def store(tmp_path, clock):
+    store = HealthStore(str(tmp_path / "health.db"))
+    await store.start()
+    yield store
+    await store.stop()
+
+
+def _sample(store: HealthStore, ts: float, status=ServiceStatus.OK, latency=None):
+    store.add("jaeger", ServiceHealth(
+        status=status,
+        latency_ms=latency,
+        last_checked=datetime.fromtimestamp(ts, tz=timezone.utc),
+    ))
+
+
+async def _points(store: HealthStore, start: float, end: float, max_points: int = 500):
+    return await store.query("jaeger", start, end, max_points)
+
+
+async def test_minute_rollup_aggregates_samples(store, clock):
+    for offset, latency in enumerate((100, 200, 300, 400)):
+        _sample(store, BASE + offset * 10, latency=latency)
+    _sample(store, BASE + 45, ServiceStatus.DOWN)
+    clock.now = BASE + 60 + store.rollup_delay
+    await store.flush()
+
+    result = await _points(store, BASE, BASE + 600)
+    assert result["tier"] == "1m"
+    assert result["points"] == [{
+        "timestamp": datetime.fromtimestamp(BASE, tz=timezone.utc).isoformat(),
+        "count": 5,
+        "failures": 1,
+        "uptime_pct": 80.0,
+        "latency_min_ms": 100,
+        "latency_avg_ms": 250.0,
+        "latency_max_ms": 400,
+        "latency_p95_ms": 385,
+    }]
+
+
+async def test_buckets_wait_for_late_samples(store, clock):
+    _sample(store, BASE + 5, latency=100)
+    clock.now = BASE + 60 + store.rollup_delay - 1
+    await store.flush()
+    assert (await _points(store, BASE, BASE + 600))["points"] == []
+
+    # A check that started in the bucket reports after it ended
+    _sample(store, BASE + 55, ServiceStatus.DOWN)
+    clock.now += 1
+    await store.flush()
+
+    [point] = (await _points(store, BASE, BASE + 600))["points"]
+    assert (point["count"], point["failures"]) == (2, 1)
+
+
+async def test_coarser_tiers_for_longer_ranges(store, clock):
+    for minute in range(120):
+        _sample(store, BASE + minute * 60, latency=minute)
+    clock.now = BASE + 2 * 3600 + store.rollup_delay
+    await store.flush()
+
+    five = await _points(store, BASE, BASE + 2 * 3600, max_points=30)
+    assert five["tier"] == "5m"
+    assert len(five["points"]) == 24
+    assert all(p["count"] == 5 for p in five["points"])
+
+    hourly = await _points(store, BASE, BASE + 2 * 3600, max_points=2)
+    assert hourly["tier"] == "1h"
+    assert [(p["count"], p["latency_max_ms"]) for p in hourly["points"]] == [(60, 59), (60, 119)]
+
+
+async def test_rollups_run_once_per_bucket(store, clock):
+    _sample(store, BASE, latency=10)
+    clock.now = BASE + 60 + store.rollup_delay
+    await store.flush()
+    await store.flush()
+
+    [point] = (await _points(store, BASE, BASE + 600))["points"]
+    assert point["count"] == 1
+
+
+async def test_retention_prunes_samples_and_rollups(store, clock):
+    _sample(store, BASE, latency=10)
+    clock.now = BASE + 60 + store.rollup_delay
+    await store.flush()
+
+    clock.now = BASE + store.tiers[0].retention_s + 60
+    await store.flush()
+    assert store._conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0] == 0
+    assert store._conn.execute(
+        "SELECT COUNT(*) FROM rollups WHERE tier = '1m'"
+    ).fetchone()[0] == 0
+
+
+async def test_unwritable_path_disables_store(tmp_path, clock):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    store = HealthStore(str(blocker / "health.db"))
+    await store.start()
+
+    _sample(store, BASE, latency=10)
+    assert store._pending == []
+    assert (await _points(store, BASE, BASE + 600))["points"] == []
+    await store.stop()
@@ -0,0 +1,69 @@
+"""Tests for incremental decoding of a streamed JSON array."""
+
+import json
+
+import pytest
+
+from app.services.json_stream import iter_json_array
+
+pytestmark = pytest.mark.anyio
+
+
+async def _chunks(body: bytes, size: int):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+async def _decode(body: bytes, size: int, key: str = "data"):
+    return [item async for item in iter_json_array(_chunks(body, size), key)]
+
+
+DOCUMENT = {
+    "data": [
+        {"traceID": "a", "spans": [{"data": [1, 2]}], "note": "café ☃ ]},"},
+        12345,
+        -0.5e3,
+        "text with \"quotes\" and ]",
+        [1, [2, [3]]],
+        True,
+        None,
+    ],
+    "total": 7,
+}
+
+
+@pytest.mark.parametrize("size", (1, 2, 3, 7, 64, 1 << 20))
+async def test_elements_survive_any_chunking(size):
+    body = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+    assert await _decode(body, size) == DOCUMENT["data"]
+
+
+async def test_number_split_across_chunks_is_not_cut():
+    body = b'{"data": [12, 3456789]}'
+    for size in range(1, len(body)):
+        assert await _decode(body, size) == [12, 3456789]
+
+
+async def test_key_after_other_fields_and_whitespace():
+    body = b'{"total": 2, "errors": null,\n  "data" :\n [ {"x": 1} ,\n {"x": 2} ] }'
+    assert await _decode(body, 5) == [{"x": 1}, {"x": 2}]
+
+
+@pytest.mark.parametrize("body", (b'{"data": null}', b'{"data": []}', b'{"total": 0}'))
+async def test_empty_results(body):
+    assert await _decode(body, 4) == []
+
+
+async def test_large_element_across_many_chunks():
+    element = {"spans": [{"spanID": f"{i:016x}", "tags": ["x" * 50]} for i in range(2000)]}
+    body = json.dumps({"data": [element, element]}).encode()
+    assert await _decode(body, 1000) == [element, element]
+
+
+async def test_truncated_body_raises():
+    body = b'{"data": [{"a": 1}, {"b": '
+    items = []
+    with pytest.raises(ValueError, match="not closed"):
+        async for item in iter_json_array(_chunks(body, 4), "data"):
+            items.append(item)
+    assert items == [{"a": 1}]
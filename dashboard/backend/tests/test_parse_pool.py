@@ -0,0 +1,90 @@
+"""Tests for parsing search responses in the process pool."""
+
+import json
+import os
+import threading
+from functools import partial
+
+import pytest
+
+from app.services.parse_pool import ParsePool
+from app.services.trace_parser import parse_trace, split_search_json
+
+from .jaeger_payloads import make_trace, search_response
+
+pytestmark = pytest.mark.anyio
+
+
+def _compact(data) -> bytes:
+    """JSON the way Jaeger (Go encoding/json) writes it."""
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def _tricky_traces():
+    traces = [make_trace(5, seed=i) for i in range(6)]
+    tricky = traces[2]["spans"][0]["tags"]
+    tricky.append({"key": "body", "type": "string", "value": '{"traceID":"ab","spans":[]}'})
+    tricky.append({"key": "tail", "type": "string", "value": '],"total":3'})
+    return traces
+
+
+@pytest.fixture
+async def pool():
+    pool = ParsePool(workers=2, inline_bytes=0)
+    pool.start()
+    yield pool
+    pool.stop()
+
+
+def test_split_cuts_each_trace():
+    traces = _tricky_traces()
+
+    parts = split_search_json(_compact(search_response(traces)))
+
+    assert [json.loads(part) for part in parts] == traces
+
+
+@pytest.mark.parametrize("body", (
+    json.dumps(search_response([make_trace(3)]), indent=2).encode(),
+    _compact({"data": [make_trace(3)]}),
+    b'{"data":[],"total":0}',
+))
+def test_split_rejects_other_layouts(body):
+    assert split_search_json(body) is None
+
+
+async def test_pool_matches_inline_conversion(jaeger_service, pool):
+    jaeger_service.parse_pool = pool
+    traces = _tricky_traces()
+    convert = partial(parse_trace, service_name="aiai")
+
+    batch = await jaeger_service._convert_in_pool(_compact(search_response(traces)), convert)
+
+    expected = sorted(
+        ((t["traceID"], min(s["startTime"] for s in t["spans"]), convert(t)) for t in traces),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    assert batch == expected
+
+
+async def test_unsplittable_body_is_converted_whole(jaeger_service, pool):
+    jaeger_service.parse_pool = pool
+    traces = [make_trace(3, seed=i) for i in range(3)]
+    body = json.dumps(search_response(traces), indent=1).encode()
+
+    batch = await jaeger_service._convert_in_pool(body, partial(parse_trace, service_name="aiai"))
+
+    assert sorted(trace_id for trace_id, _, _ in batch) == sorted(t["traceID"] for t in traces)
+
+
+def _exit_in_worker(parent_pid: int) -> bool:
+    """Kill the worker process; in the parent, report whether off the main thread."""
+    if os.getpid() != parent_pid:
+        os._exit(1)
+    return threading.current_thread() is not threading.main_thread()
+
+
+async def test_broken_pool_falls_back_to_a_thread(pool):
+    assert await pool.run(_exit_in_worker, os.getpid()) is True
+    assert pool._executor is not None
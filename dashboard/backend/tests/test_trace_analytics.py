@@ -0,0 +1,61 @@
+"""Tests for trace analytics over a time window."""
+
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.main import app
+from app.routers import traces as traces_router
+
+from .jaeger_payloads import make_trace, mark_failed
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client(jaeger_service, monkeypatch):
+    monkeypatch.setattr(traces_router, "jaeger_service", jaeger_service)
+    traces_router._analytics_cache.clear()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_window_is_utc_on_any_host(client, jaeger, jaeger_service, non_utc_host):
+    now_us = int(time.time() * 1_000_000)
+    jaeger.traces = [
+        make_trace(5, seed=i, start_us=now_us - (i + 2) * 60_000_000) for i in range(5)
+    ]
+    bucket = jaeger_service.settings.trace_analytics_bucket
+
+    response = await client.get("/api/traces/analytics?minutes=30")
+
+    assert response.status_code == 200
+    assert response.json()["traces"] == 5
+    window_end = int(time.time() // bucket) * bucket * 1_000_000
+    assert int(jaeger.searches[0]["end"]) in (window_end, window_end - bucket * 1_000_000)
+    assert int(jaeger.searches[0]["start"]) == int(jaeger.searches[0]["end"]) - 30 * 60_000_000
+
+
+async def test_naive_window_means_utc(jaeger, jaeger_service, non_utc_host):
+    await jaeger_service.fetch_span_columns(
+        datetime(2023, 11, 14, 22, 0), datetime(2023, 11, 14, 23, 0)
+    )
+
+    assert jaeger.searches[0]["start"] == str(1_699_999_200_000_000)
+    assert jaeger.searches[0]["end"] == str(1_700_002_800_000_000)
+
+
+async def test_operation_and_failure_stats(client, jaeger):
+    now_us = int(time.time() * 1_000_000)
+    jaeger.traces = [
+        make_trace(4, seed=i, start_us=now_us - (i + 2) * 60_000_000) for i in range(4)
+    ]
+    mark_failed(jaeger.traces[0])
+
+    response = await client.get("/api/traces/analytics?minutes=30")
+
+    root = response.json()["operations"]["POST /submit"]
+    assert (root["count"], root["failures"]) == (4, 1)
@@ -0,0 +1,44 @@
+"""Tests for the parsed trace cache sizing."""
+
+import gc
+import json
+import sys
+from enum import Enum
+
+import pytest
+
+from app.services.jaeger_service import JaegerService, estimate_trace_size
+from app.services.trace_parser import parse_trace, parse_trace_json
+
+from .jaeger_payloads import make_trace
+
+
+def _deep_size(obj) -> int:
+    """Bytes of every object reachable from obj, shared singletons excluded."""
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or item is None or isinstance(item, (type, bool, Enum)):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        stack.extend(gc.get_referents(item))
+    return total
+
+
+@pytest.mark.parametrize("size", (1, 10, 2000))
+def test_estimate_tracks_parsed_memory(size):
+    # Decoded from JSON like Jaeger responses, so no strings are shared
+    trace = parse_trace_json(json.dumps({"data": [make_trace(size)]}).encode(), "aiai")
+    assert estimate_trace_size(trace) == pytest.approx(_deep_size(trace), rel=0.2)
+
+
+def test_cache_weighs_entries_by_parsed_size():
+    service = JaegerService()
+    trace = parse_trace(make_trace(200), "aiai")
+    service._cache_trace(trace.trace_id, trace)
+
+    assert service._trace_cache.currsize == estimate_trace_size(trace)
+    assert service._trace_cache[trace.trace_id].trace is trace
@@ -0,0 +1,118 @@
+"""Tests for the local trace index and indexed lookups."""
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.traces import StepStatus
+from app.routers import traces as traces_router
+from app.services.trace_index import TraceIndex, error_fingerprint
+from app.services.trace_parser import parse_trace, summarize_trace
+
+from .jaeger_payloads import make_trace, mark_failed
+
+pytestmark = pytest.mark.anyio
+
+# 2023-11-14T22:13:20Z
+BASE_US = 1_700_000_000_000_000
+
+
+def _trace(seed: int, minutes: int = 0, failed: bool = False):
+    raw = make_trace(4, seed=seed, start_us=BASE_US + minutes * 60_000_000)
+    return mark_failed(raw, f"timeout after {seed}ms") if failed else raw
+
+
+@pytest.fixture
+async def index(tmp_path):
+    index = TraceIndex(str(tmp_path / "traces.db"))
+    # Keep the fixed 2023 test traces
+    index.retention = 10 ** 10
+    await index.start()
+    yield index
+    await index.stop()
+
+
+@pytest.fixture
+async def client(jaeger, jaeger_service, index, monkeypatch):
+    jaeger_service.trace_index = index
+    monkeypatch.setattr(traces_router, "jaeger_service", jaeger_service)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+def test_fingerprint_ignores_ids_and_numbers():
+    first = error_fingerprint("llm_call", "timeout after 3000ms for req 9f1c2ab3")
+    second = error_fingerprint("llm_call", "timeout after 12ms for req 77aa01ff")
+    assert first == second
+    assert first != error_fingerprint("mcp_tool", "timeout after 3000ms for req 9f1c2ab3")
+
+
+async def test_lookup_by_keys_newest_first(index):
+    for seed in range(3):
+        index.add(parse_trace(_trace(seed, minutes=seed), "aiai"))
+    index.add(summarize_trace(_trace(9, minutes=5, failed=True), "aiai"))
+
+    entries = await index.lookup({"user_id": "user-1"}, 10)
+    assert [e.request_id for e in entries] == ["req-9", "req-2", "req-1", "req-0"]
+
+    [failed] = await index.lookup({"status": StepStatus.FAILED.value}, 10)
+    assert failed.error == "timeout after 9ms"
+    assert await index.find_trace_id("req-1") == _trace(1)["traceID"]
+
+
+async def test_timestamps_are_utc_epochs(index, non_utc_host):
+    index.add(parse_trace(_trace(0), "aiai"))
+
+    [entry] = await index.lookup({"request_id": "req-0"}, 1)
+
+    assert entry.timestamp.timestamp() == BASE_US / 1e6
+    row = index._conn.execute("SELECT ts FROM traces").fetchone()
+    assert row[0] == BASE_US / 1e6
+
+
+async def test_lookup_range_from_naive_query_is_utc(client, index, non_utc_host):
+    for seed in range(3):
+        index.add(parse_trace(_trace(seed, minutes=seed * 10), "aiai"))
+
+    response = await client.get(
+        "/api/traces/search?user_id=user-1"
+        "&start_time=2023-11-14T22:20:00&end_time=2023-11-14T22:30:00"
+    )
+
+    assert response.status_code == 200
+    assert [t["request_id"] for t in response.json()["traces"]] == ["req-1"]
+
+
+async def test_request_id_resolves_through_index(client, jaeger, index):
+    raw = _trace(4)
+    jaeger.traces = [raw]
+    index.add(summarize_trace(raw, "aiai"))
+
+    response = await client.get("/api/traces/req-4")
+
+    assert response.status_code == 200
+    assert response.json()["trace_id"] == raw["traceID"]
+
+
+async def test_lookup_needs_a_filter(client):
+    response = await client.get("/api/traces/search")
+    assert response.status_code == 400
+
+
+async def test_retention_prunes_old_entries(index):
+    index.retention = 86400
+    index.add(parse_trace(_trace(0), "aiai"))
+
+    assert await index.lookup({"request_id": "req-0"}, 1) == []
+
+
+async def test_unwritable_path_disables_index(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    index = TraceIndex(str(blocker / "traces.db"))
+    await index.start()
+
+    index.add(parse_trace(_trace(0), "aiai"))
+    assert await index.lookup({"request_id": "req-0"}, 1) == []
+    await index.stop()
@@ -0,0 +1,74 @@
+"""
+Trace Parser Benchmarks
+
+Times parse_trace and summarize_trace on synthetic Jaeger traces of 10,
+1k and 50k spans with pytest-benchmark and fails when the best round
+falls below a minimum throughput.
+
+Run from dashboard/backend:
+    python -m pytest tests/test_trace_parser_benchmark.py
+"""
+
+import pytest
+
+from app.services.trace_parser import parse_trace, summarize_trace
+
+from .jaeger_payloads import make_trace
+
+SIZES = (10, 1_000, 50_000)
+
+# Minimum spans per second by (function, trace size). Roughly 60% of what a
+# single slow core reaches, so only real regressions fail.
+TARGETS = {
+    ("parse_trace", 10): 60_000,
+    ("parse_trace", 1_000): 100_000,
+    ("parse_trace", 50_000): 60_000,
+    ("summarize_trace", 10): 250_000,
+    ("summarize_trace", 1_000): 1_500_000,
+    ("summarize_trace", 50_000): 500_000,
+}
+
+_TRACES = {}
+
+
+def _trace(size: int):
+    """Synthetic trace of a size, built once per session."""
+    if size not in _TRACES:
+        _TRACES[size] = make_trace(size)
+    return _TRACES[size]
+
+
+def _rounds(size: int) -> int:
+    """Fewer rounds for the big trace."""
+    return 5 if size >= 50_000 else 50
+
+
+def _assert_throughput(benchmark, func, size: int):
+    """Check the best round against the target (skipped with --benchmark-disable)."""
+    if benchmark.disabled:
+        return
+    rate = size / benchmark.stats.stats.min
+    target = TARGETS[(func.__name__, size)]
+    assert rate >= target, f"{func.__name__} on {size} spans: {rate:,.0f} spans/s < {target:,}"
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_parse_trace_throughput(benchmark, size):
+    trace = _trace(size)
+    benchmark.group = "parse_trace"
+    result = benchmark.pedantic(
+        parse_trace, args=(trace, "aiai"), rounds=_rounds(size), warmup_rounds=1
+    )
+    assert len(result.steps) == size
+    _assert_throughput(benchmark, parse_trace, size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_summarize_trace_throughput(benchmark, size):
+    trace = _trace(size)
+    benchmark.group = "summarize_trace"
+    result = benchmark.pedantic(
+        summarize_trace, args=(trace, "aiai"), rounds=_rounds(size), warmup_rounds=1
+    )
+    assert result.span_count == size
+    _assert_throughput(benchmark, summarize_trace, size)
@@ -0,0 +1,145 @@
+"""Tests for the trace search walk and its cursor pagination."""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.traces import StepStatus, TraceSearchParams
+from app.services.jaeger_service import SearchPage
+
+from .jaeger_payloads import make_trace, mark_failed
+
+pytestmark = pytest.mark.anyio
+
+BASE_US = 1_700_000_000_000_000
+
+
+def _traces(count: int, failed=lambda i: False):
+    """count traces one second apart, oldest first."""
+    traces = []
+    for i in range(count):
+        trace = make_trace(3, seed=i, start_us=BASE_US + i * 1_000_000)
+        traces.append(mark_failed(trace) if failed(i) else trace)
+    return traces
+
+
+def _params(count: int, **kwargs) -> TraceSearchParams:
+    """Search over the whole range of _traces(count)."""
+    return TraceSearchParams(
+        start_time=datetime.fromtimestamp(BASE_US / 1e6 - 60, tz=timezone.utc),
+        end_time=datetime.fromtimestamp(BASE_US / 1e6 + count + 60, tz=timezone.utc),
+        **kwargs,
+    )
+
+
+def _ids(traces):
+    return [t["traceID"] if isinstance(t, dict) else t.trace_id for t in traces]
+
+
+async def _all_pages(service, params):
+    """Follow next_cursor to the end; list of pages of trace IDs."""
+    pages = []
+    while True:
+        result = await service.search_traces(params)
+        pages.append(_ids(result.traces))
+        if not result.has_more:
+            return pages
+        params = params.model_copy(update={"cursor": result.next_cursor})
+
+
+async def test_pages_walk_back_without_gaps(jaeger, jaeger_service):
+    jaeger.traces = _traces(25)
+
+    pages = await _all_pages(jaeger_service, _params(25, limit=10))
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sum(pages, []) == _ids(reversed(jaeger.traces))
+
+
+async def test_failed_status_is_pushed_down(jaeger, jaeger_service):
+    jaeger.traces = _traces(20, failed=lambda i: i % 2 == 0)
+
+    params = _params(20, status=StepStatus.FAILED, user_id="user-1")
+    result = await jaeger_service.search_traces(params)
+
+    assert _ids(result.traces) == _ids(reversed(jaeger.traces[::2]))
+    assert not result.has_more
+    [search] = jaeger.searches
+    assert json.loads(search["tags"]) == {"error": "true", "user_id": "user-1"}
+    assert search["limit"] == "20"
+
+
+async def test_local_filter_overfetches_and_pages(jaeger, jaeger_service):
+    jaeger.traces = _traces(30, failed=lambda i: i % 3 != 0)
+    expected = _ids(reversed(jaeger.traces[::3]))
+
+    first = await jaeger_service.search_traces(_params(30, status=StepStatus.OK, limit=5))
+
+    assert _ids(first.traces) == expected[:5]
+    assert first.has_more
+    assert jaeger.searches[0]["limit"] == "15"
+    assert "tags" not in jaeger.searches[0]
+
+    rest = await _all_pages(
+        jaeger_service,
+        _params(30, status=StepStatus.OK, limit=5, cursor=first.next_cursor),
+    )
+    assert sum(rest, []) == expected[5:]
+
+
+async def test_exhausted_fetch_budget_returns_cursor(jaeger, jaeger_service):
+    jaeger.traces = _traces(20, failed=lambda i: i >= 10)
+    jaeger_service.settings = jaeger_service.settings.model_copy(update={
+        "trace_search_max_fetches": 2,
+        "trace_search_fetch_limit": 4,
+    })
+    params = _params(20, status=StepStatus.OK, limit=5)
+
+    result = await jaeger_service.search_traces(params)
+
+    assert result.traces == []
+    assert result.has_more
+    assert len(jaeger.searches) == 2
+    # The eight newest traces were read; the cursor ends just before them
+    assert int(result.next_cursor) == BASE_US + 12 * 1_000_000 - 1
+
+    params = params.model_copy(update={"cursor": result.next_cursor})
+    pages = await _all_pages(jaeger_service, params)
+    assert sum(pages, []) == _ids(reversed(jaeger.traces[:10]))
+
+
+async def test_stream_walk_finds_the_buffered_page(jaeger, jaeger_service):
+    jaeger.traces = _traces(25)
+    params = _params(25, limit=10)
+
+    buffered = await jaeger_service.search_traces(params)
+    page = SearchPage()
+    streamed = [t async for t in jaeger_service.iter_search_traces(params, page)]
+
+    # Streamed traces come in Jaeger's order, not sorted
+    assert sorted(_ids(streamed)) == sorted(_ids(buffered.traces))
+    assert page.next_cursor == buffered.next_cursor
+
+
+async def test_summary_view(jaeger, jaeger_service):
+    jaeger.traces = _traces(3, failed=lambda i: i == 1)
+
+    result = await jaeger_service.search_traces(_params(3, view="summary"))
+
+    assert [(t.status, t.span_count, t.error) for t in result.traces] == [
+        (StepStatus.OK, 3, None),
+        (StepStatus.FAILED, 3, "boom"),
+        (StepStatus.OK, 3, None),
+    ]
+
+
+async def test_naive_range_means_utc(jaeger, jaeger_service, non_utc_host):
+    params = TraceSearchParams(
+        start_time=datetime(2023, 11, 14, 22, 0), end_time=datetime(2023, 11, 14, 23, 0)
+    )
+
+    await jaeger_service.search_traces(params)
+
+    assert jaeger.searches[0]["start"] == str(1_699_999_200_000_000)
+    assert jaeger.searches[0]["end"] == str(1_700_002_800_000_000)
@@ -0,0 +1,82 @@
+"""Tests for NDJSON streaming of trace search results."""
+
+import json
+
+import httpx
+import pytest
+
+from app.main import app
+from app.routers import traces as traces_router
+
+from .jaeger_payloads import make_trace, mark_failed
+
+pytestmark = pytest.mark.anyio
+
+BASE_US = 1_700_000_000_000_000
+RANGE = "start_time=2023-11-14T22:00:00Z&end_time=2023-11-14T23:00:00Z"
+
+
+@pytest.fixture
+async def client(jaeger, jaeger_service, monkeypatch):
+    jaeger.traces = [
+        mark_failed(trace) if i % 2 else trace
+        for i, trace in (
+            (i, make_trace(3, seed=i, start_us=BASE_US + i * 1_000_000)) for i in range(20)
+        )
+    ]
+    monkeypatch.setattr(traces_router, "jaeger_service", jaeger_service)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+def _lines(response: httpx.Response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def test_stream_writes_traces_then_pagination(client):
+    response = await client.get(f"/api/traces/?{RANGE}&stream=true&limit=5")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    *traces, last = _lines(response)
+    assert len(traces) == 5
+    assert last["has_more"] and last["next_cursor"]
+
+
+async def test_open_circuit_fails_before_streaming(client, jaeger_service):
+    for _ in range(jaeger_service.breaker.failure_threshold):
+        jaeger_service.breaker.record_failure()
+
+    response = await client.get(f"/api/traces/?{RANGE}&stream=true")
+
+    assert response.status_code == 503
+    assert response.json()["circuit_breaker"]["state"] == "open"
+
+
+async def test_upstream_error_fails_before_streaming(client, jaeger):
+    jaeger.error_status = 500
+
+    response = await client.get(f"/api/traces/?{RANGE}&stream=true")
+
+    assert response.status_code == 502
+    assert response.json() == (await client.get(f"/api/traces/?{RANGE}")).json()
+
+
+async def test_error_after_first_trace_ends_with_error_line(client, jaeger):
+    search = jaeger._search
+
+    def fail_after_first(query):
+        if jaeger.searches:
+            return httpx.Response(500)
+        return search(query)
+
+    jaeger._search = fail_after_first
+
+    response = await client.get(f"/api/traces/?{RANGE}&stream=true&status=ok&limit=5")
+
+    assert response.status_code == 200
+    *traces, last = _lines(response)
+    assert traces and all(t["status"] == "ok" for t in traces)
+    assert "500" in last["error"]
+    assert "has_more" not in last
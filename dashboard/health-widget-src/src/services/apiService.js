@@ -304,6 +304,27 @@ export const healthService = {
      */
     async checkAll(backendUrl) {
         return await callBackendProxy(backendUrl, '/api/health/all', { method: 'GET' });
+    },
+
+    /**
+     * Subscribe to health changes pushed by the backend (Server-Sent Events)
+     *
+     * The backend sends a full snapshot on connect, then only the services
+     * whose status or latency bucket changed. EventSource reconnects on its own.
+     *
+     * @param {string} backendUrl - Backend URL
+     * @param {Function} onSnapshot - Called with the full health payload
+     * @param {Function} onUpdate - Called with { overall, timestamp, services } diffs
+     * @returns {Function} Unsubscribe function
+     */
+    subscribe(backendUrl, onSnapshot, onUpdate) {
+        const source = new EventSource(`${backendUrl}/api/health/stream`);
+
+        source.addEventListener('snapshot', (event) => onSnapshot(JSON.parse(event.data)));
+        source.addEventListener('update', (event) => onUpdate(JSON.parse(event.data)));
+        source.onerror = (error) => console.warn('[ApiService] Health stream error:', error);
+
+        return () => source.close();
     }
 };
 